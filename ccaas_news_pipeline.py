@@ -1,15 +1,30 @@
 import requests
-from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
 import json
 import datetime
-import pandas as pd
-from dateutil import parser as dateparser
 from urllib.parse import urlparse
-import warnings
 import time
 
-# Silence XML/HTML parsing warning noise
-warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+from news_priority import (
+    order_by_priority, llm_deadline, deadline_passed, pending_analysis,
+)
+from news_dedup import group_near_duplicates
+from news_urls import canonical_url, unique_by_url
+from news_discovery import discover_from_feeds
+from news_dates import latest_date_from_url, scan_html_for_date, is_too_old, parse_date
+from news_links import rank_links, log_link_outcomes
+from news_counter import fold_daily_file
+from news_manifest import record_daily_file
+from news_fetch import (
+    fetch_article_html, fetch_html, parse_html, crawl_deadline, fetch_totals, post_with_deadline,
+)
+from news_profiles import source_profile
+from news_records import Article, Analysis, NewsRow, write_rows
+from news_schedule import due_sources, mark_polled, carried_over_rows
+from news_store import save_daily_rows
+from news_yield import (
+    new_source_stats, count_rejection, count_outcomes, count_in_window,
+    count_results, allocate_budgets, print_budgets, record_source_yield,
+)
 
 # ============================
 # CONFIGURATION
@@ -26,6 +41,14 @@ SOURCES = {
     "NoJitter": "https://www.nojitter.com/contact-centers/ccaas",
 }
 
+# RSS/Atom feeds or news sitemaps per source (cheaper than scraping the
+# landing page). Sources without an entry, or whose feed fails, fall back
+# to HTML link scraping.
+FEEDS = {
+    "CXToday": "https://www.cxtoday.com/contact-center/feed/",
+    "NoJitter": "https://www.nojitter.com/rss.xml",
+}
+
 # Keep dated articles from the last N hours
 # (undated articles are always kept)
 MAX_AGE_HOURS = 48  # <-- changed to 48 hours for today only
@@ -33,6 +56,33 @@ MAX_AGE_HOURS = 48  # <-- changed to 48 hours for today only
 # Limit how many articles we scrape per source (avoid going crazy)
 MAX_ARTICLES_PER_SOURCE = 20
 
+# Link filters and content selectors for every source, unless
+# source_profiles.json overrides them for a source (see news_profiles.py)
+EXTRACTION_DEFAULTS = {
+    # Category / listing pages that aren't articles (substring match)
+    "exclude_url": [
+        r"guides|definitions|opinions|podcasts|quizzes|techaccelerators|tutorials|videos",
+        r"news|blog|category|tag|author|archive",
+        r"/contributor/",
+    ],
+    # e.g. /contact-center/some-article-slug
+    "min_depth": 2,
+    # Articles have longer, descriptive slugs; short or ALL-CAPS = category
+    "min_slug_length": 10,
+    "reject_upper_slug": True,
+    "title_selectors": ["h1", "h2"],
+    "body_selector": "p",
+    "paragraphs": 3,
+    "snippet_chars": 500,
+}
+
+# Relative weight of each source when ordering the LLM queue (default 1.0)
+SOURCE_WEIGHTS = {
+    "CXToday": 1.5,
+    "NoJitter": 1.2,
+    "TechTarget": 1.0,
+}
+
 
 # ============================
 # DATE PARSING HELPERS
@@ -63,10 +113,9 @@ def extract_published_date_from_jsonld(soup):
                 continue
             for key in ["datePublished", "dateModified", "uploadDate"]:
                 if key in obj and obj[key]:
-                    try:
-                        return dateparser.parse(obj[key])
-                    except Exception:
-                        continue
+                    dt = parse_date(obj[key])
+                    if dt:
+                        return dt
     return None
 
 
@@ -74,6 +123,7 @@ def extract_published_date(soup):
     """
     Try to extract a publication date from the article HTML.
     Returns datetime (maybe tz-aware) or None.
+    DOM fallback for pages where news_dates.scan_html_for_date found nothing.
     """
 
     # 0) JSON-LD first (often the best)
@@ -88,10 +138,9 @@ def extract_published_date(soup):
             text = time_tag["datetime"]
         else:
             text = time_tag.get_text(strip=True)
-        try:
-            return dateparser.parse(text)
-        except Exception:
-            pass
+        dt = parse_date(text)
+        if dt:
+            return dt
 
     # 2) Meta tags
     meta_candidates = [
@@ -107,10 +156,9 @@ def extract_published_date(soup):
         tag = soup.find(tag_name, attrs=attrs)
         if tag and tag.get("content"):
             text = tag["content"]
-            try:
-                return dateparser.parse(text)
-            except Exception:
-                continue
+            dt = parse_date(text)
+            if dt:
+                return dt
 
     # 3) Fallback: span/div with "date" in the class name
     def looks_like_date(tag):
@@ -122,10 +170,9 @@ def extract_published_date(soup):
     date_like = soup.find(looks_like_date)
     if date_like:
         text = date_like.get_text(strip=True)
-        try:
-            return dateparser.parse(text)
-        except Exception:
-            pass
+        dt = parse_date(text)
+        if dt:
+            return dt
 
     # If all fails, we return None (and will still keep the article)
     return None
@@ -143,25 +190,27 @@ def same_domain(url, base_url):
         return False
 
 
-def extract_articles(source_name, url):
+def scrape_index_links(source_name, url, deadline=None):
     """
-    Extract article URLs + content from a source homepage.
+    Fallback link discovery: collect article URLs from a source homepage.
     - filters out home/category pages based on path depth
-    - DOES NOT require dates anymore (we still try to parse them)
+    - returns {"url", "anchor", "position"} dicts for news_links.rank_links,
+      or None when the page could not be fetched
     """
-    print(f"Scraping {source_name} -> {url}")
-
     try:
-        html = requests.get(url, headers=HEADERS, timeout=10).text
+        html = fetch_html(url, headers=HEADERS, timeout=10, deadline=deadline)
     except Exception as e:
         print(f"Error scraping {source_name}: {e}")
-        return []
+        return None
 
-    soup = BeautifulSoup(html, "html.parser")
-    urls = []
+    soup = parse_html(html)
+    profile = source_profile(source_name, EXTRACTION_DEFAULTS)
+    candidates = []
+    seen_keys = set()  # canonical URLs, so utm_/amp/trailing-slash variants count once
 
     # Collect candidate links
-    for a in soup.find_all("a", href=True):
+    links = soup.find_all("a", href=True)
+    for position, a in enumerate(links):
         href = a["href"]
 
         # 1) Basic filtering
@@ -172,90 +221,156 @@ def extract_articles(source_name, url):
         if not same_domain(href, url):
             continue
 
-        # 2) Filter out home/category pages:
-        #    keep URLs where the path has at least 2 segments,
-        #    e.g. /contact-center/some-article-slug
-        path = urlparse(href).path
-        segments = [s for s in path.split("/") if s]
-        if len(segments) < 2:
-            continue
-        
-        # 3) Filter out common category/page types that aren't articles
-        category_keywords = ['guides', 'definitions', 'opinions', 'podcasts', 
-                           'quizzes', 'techaccelerators', 'tutorials', 'videos',
-                           'news', 'blog', 'category', 'tag', 'author', 'archive']
-        if any(keyword in href.lower() for keyword in category_keywords):
-            continue
-        
-        # 4) Filter out contributor/author pages
-        if '/contributor/' in href.lower():
-            continue
-        
-        # 5) Filter out single-segment category pages (e.g., /HR, /CreatorWorkflows)
-        # These are usually category landing pages, not articles
-        if len(segments) == 1:
-            continue
-        
-        # 6) Filter out URLs that look like category pages (short segments, no article-like structure)
-        # Articles usually have longer, more descriptive slugs
-        last_segment = segments[-1] if segments else ""
-        if len(last_segment) < 10 or last_segment.isupper():  # Short or all caps = likely category
+        # 2) Source profile: include/exclude patterns, path depth, slug shape
+        if not profile.accepts_url(href):
             continue
 
-        if href not in urls:
-            urls.append(href)
+        key = canonical_url(href)
+        if key not in seen_keys:
+            seen_keys.add(key)
+            candidates.append({
+                "url": href,
+                "anchor": a.get_text(" ", strip=True),
+                "position": position / len(links),  # 0 = top of the page
+            })
+
+    return candidates
+
+
+def extract_articles(source_name, url, deadline=None, budget=MAX_ARTICLES_PER_SOURCE, stats=None):
+    """
+    Extract article URLs + content for a source.
+    - prefers the source's RSS/Atom feed or news sitemap (FEEDS): entries
+      come with title/date, stale ones are dropped before any fetch, and
+      entries with a usable description need no article fetch at all
+    - falls back to scraping the homepage (scrape_index_links)
+    - DOES NOT require dates anymore (we still try to parse them)
+    - stops early when the run's crawl deadline expires
+    - accepts at most `budget` articles; fills `stats` (news_yield) if given
+    """
+    print(f"Scraping {source_name} -> {url}")
+    if stats is None:
+        stats = new_source_stats(source_name)
+    profile = source_profile(source_name, EXTRACTION_DEFAULTS)
+
+    candidates = discover_from_feeds(
+        source_name, FEEDS.get(source_name), MAX_AGE_HOURS, headers=HEADERS, timeout=10,
+        deadline=deadline,
+    )
+    stats["reached"] = candidates is not None
+    if candidates is None:
+        links = scrape_index_links(source_name, url, deadline)
+        stats["reached"] = links is not None
+        candidates = rank_links(source_name, links or [])
+
+    stats["links_found"] = len(candidates)
 
     articles = []
     processed_count = 0
+    stale_count = 0  # rejected by date before snippet extraction / budget
+    outcomes = []  # (candidate, outcome) per fetched link, for news_links
 
-    for article_url in urls:
-        if processed_count >= MAX_ARTICLES_PER_SOURCE:
+    for candidate in candidates:
+        if processed_count >= budget:
             break
+        if deadline is not None and deadline.expired():
+            print(f"   ⏱️ Crawl deadline reached, keeping {len(articles)} articles from {source_name}")
+            break
+
+        article_url = candidate["url"]
+        title = candidate.get("title", "")
+        snippet = candidate.get("snippet", "")[:profile.snippet_chars]
+        published_dt = candidate.get("published_dt")
+
+        # Date-first: reject links whose URL date is already out of window,
+        # before they cost a fetch or count toward the source's budget
+        if published_dt is None and is_too_old(latest_date_from_url(article_url), MAX_AGE_HOURS):
+            stale_count += 1
+            count_rejection(stats, "stale_url")
+            continue
 
         try:
-            art_html = requests.get(article_url, headers=HEADERS, timeout=10).text
-            art_soup = BeautifulSoup(art_html, "html.parser")
+            # Feed entries with a title and a real description are enough
+            # for the LLM; everything else needs the article page
+            if not title or len(snippet) < 100:
+                # Streamed: stops after the head, headline and first paragraphs
+                stats["fetched"] += 1
+                art_html = fetch_article_html(
+                    article_url, headers=HEADERS, timeout=10,
+                    need_title=not title, min_paragraphs=profile.paragraphs, deadline=deadline,
+                    title_selectors=profile.title_selectors, body_selector=profile.body_selector,
+                    date_selector=profile.date_selector,
+                )
+
+                # Regex date scan (JSON-LD, meta, <time>) before building the
+                # DOM; extract_published_date only runs if it finds nothing
+                if published_dt is None:
+                    published_dt = scan_html_for_date(art_html)
+                if is_too_old(published_dt, MAX_AGE_HOURS):
+                    stale_count += 1
+                    outcomes.append((candidate, "stale"))
+                    continue
+
+                art_soup = parse_html(art_html)
+
+                if published_dt is None:
+                    # Source-specific date selector first, then the generic walk
+                    published_dt = profile.find_date(art_soup) or extract_published_date(art_soup)
+                    if is_too_old(published_dt, MAX_AGE_HOURS):
+                        stale_count += 1
+                        outcomes.append((candidate, "stale"))
+                        continue
 
-            title_tag = art_soup.find("h1") or art_soup.find("h2")
-            if not title_tag:
-                continue
+                if not title:
+                    title_tag = profile.find_title(art_soup)
+                    if not title_tag:
+                        outcomes.append((candidate, "no_title"))
+                        continue
+                    title = title_tag.get_text(strip=True)
+
+                paragraphs = profile.find_paragraphs(art_soup)
+                if not paragraphs:
+                    outcomes.append((candidate, "no_paragraphs"))
+                    continue
+
+                snippet = profile.snippet(paragraphs)
 
-            title = title_tag.get_text(strip=True)
-            
             # Skip if title looks like a category/author page
             if len(title) < 20 or title.lower() in ['home', 'categories', 'authors', 'about']:
+                outcomes.append((candidate, "short_title"))
                 continue
             
-            paragraphs = art_soup.find_all("p")
-            if not paragraphs:
-                continue
-
-            snippet = " ".join([p.get_text(strip=True) for p in paragraphs[:3]])[:500]
-            
             # Skip if snippet is too short (likely not a real article)
             if len(snippet) < 100:
+                outcomes.append((candidate, "short_snippet"))
                 continue
 
-            published_dt = extract_published_date(art_soup)
-
-            articles.append({
-                "source": source_name,
-                "title": title,
-                "url": article_url,
-                "snippet": snippet,
-                "published_dt": published_dt,  # may be None
-            })
+            articles.append(Article(
+                source=source_name,
+                title=title,
+                url=article_url,
+                snippet=snippet,
+                published_dt=published_dt,  # may be None
+            ))
             processed_count += 1
+            outcomes.append((candidate, "article"))
             print(f"   ✅ Found article: {title[:60]}")
 
         except requests.exceptions.HTTPError as e:
+            outcomes.append((candidate, "http_error"))
             if e.response.status_code == 403:
                 print(f"   ⚠️ Skipping (403 Forbidden): {article_url}")
             continue
         except Exception as e:
+            outcomes.append((candidate, "error"))
             print(f"   ⚠️ Error scraping {article_url}: {type(e).__name__}")
             continue
 
+    log_link_outcomes(source_name, outcomes)
+    count_outcomes(stats, outcomes)
+    if stale_count:
+        print(f"   ⏭️ {source_name}: {stale_count} out-of-window articles rejected early")
+
     return articles
 
 
@@ -269,9 +384,9 @@ You are a contact center / CCaaS market analyst.
 
 Analyze the following article for relevance to the Contact Center / CCaaS / CX space:
 
-TITLE: {article['title']}
-URL: {article['url']}
-SNIPPET: {article['snippet']}
+TITLE: {article.title}
+URL: {article.url}
+SNIPPET: {article.snippet}
 
 1. Write a 3-sentence summary.
 
@@ -333,7 +448,7 @@ Respond ONLY with valid JSON, no surrounding text, in this exact shape:
         print(f"   🔄 Calling LLM API: {ZENDESK_AI_URL}")
         print(f"   🔑 Using API key: {ZENDESK_AI_KEY[:10]}...{ZENDESK_AI_KEY[-4:] if len(ZENDESK_AI_KEY) > 14 else '***'}")
         
-        response = requests.post(
+        response = post_with_deadline(
             ZENDESK_AI_URL,
             headers={
                 "Authorization": f"Bearer {ZENDESK_AI_KEY}",
@@ -346,7 +461,7 @@ Respond ONLY with valid JSON, no surrounding text, in this exact shape:
         print(f"   📡 Response status: {response.status_code}")
         
     except requests.exceptions.RequestException as e:
-        print(f"❌ LLM network error on: {article['url']}")
+        print(f"❌ LLM network error on: {article.url}")
         print(f"   Error type: {type(e).__name__}")
         print(f"   Error message: {str(e)}")
         return {"summary": "", "engagement": "LOW", "hook": "", "is_ai_cs_relevant": False}
@@ -357,7 +472,7 @@ Respond ONLY with valid JSON, no surrounding text, in this exact shape:
         return {"summary": "", "engagement": "LOW", "hook": "", "is_ai_cs_relevant": False}
 
     if response.status_code != 200:
-        print(f"❌ LLM API error on: {article['url']}")
+        print(f"❌ LLM API error on: {article.url}")
         print(f"   Status: {response.status_code}")
         print(f"   Response headers: {dict(response.headers)}")
         print(f"   Response body: {response.text[:500]}")
@@ -435,13 +550,13 @@ Respond ONLY with valid JSON, no surrounding text, in this exact shape:
                     print(f"   ❌ Failed to parse extracted JSON: {e}")
 
         # If parsing totally fails, fall back to safe defaults
-        print(f"❌ LLM parse error on: {article['url']}")
+        print(f"❌ LLM parse error on: {article.url}")
         print(f"   Raw content snippet: {text[:500]}")
         print("   ⚠️ LLM did not return valid JSON. Using default LOW engagement.")
         return {"summary": "", "engagement": "LOW", "hook": "", "is_ai_cs_relevant": False}
 
     except Exception as e:
-        print("LLM unexpected error on:", article["url"], "| Error:", e)
+        print("LLM unexpected error on:", article.url, "| Error:", e)
         return {"summary": "", "engagement": "LOW", "hook": "", "is_ai_cs_relevant": False}
 
 
@@ -452,13 +567,42 @@ Respond ONLY with valid JSON, no surrounding text, in this exact shape:
 def run_pipeline():
     all_articles = []
 
-    # Scrape each source
+    # Scrape each source, within a hard wall-clock budget
+    crawl_budget = crawl_deadline()
+
+    # Busy sources are polled more often than quiet ones (news_schedule);
+    # quiet ones at least every MAX_AGE_HOURS / 2 so nothing ages out unseen
+    due, schedule = due_sources("ccaas_news", SOURCES, max_interval_hours=MAX_AGE_HOURS / 2)
+    if not due:
+        print("No source is due for polling yet.")
+        return []
+
+    # Article budgets follow each source's recent yield (news_yield)
+    budgets, flagged = allocate_budgets("ccaas_news", SOURCES, MAX_ARTICLES_PER_SOURCE)
+    print_budgets(budgets, flagged, MAX_ARTICLES_PER_SOURCE)
+    source_stats = {}
+
     for name, url in SOURCES.items():
-        articles = extract_articles(name, url)
+        if name not in due:
+            continue
+        if crawl_budget.expired():
+            print(f"⏱️ Crawl deadline reached, skipping {name} and remaining sources")
+            break
+        stats = source_stats[name] = new_source_stats(name)
+        started, bytes_before = time.monotonic(), fetch_totals()["bytes"]
+        articles = extract_articles(
+            name, url, deadline=crawl_budget, budget=budgets[name], stats=stats
+        )
+        stats["seconds"] = time.monotonic() - started
+        stats["bytes"] = fetch_totals()["bytes"] - bytes_before
         all_articles.extend(articles)
 
+    # Sources whose feed and landing page both failed stay due for the next run
+    mark_polled(schedule, "ccaas_news", [name for name, stats in source_stats.items() if stats["reached"]])
+
     if not all_articles:
         print("No articles found at all.")
+        record_source_yield("ccaas_news", source_stats, budgets, flagged)
         return []
 
     now = datetime.datetime.now(datetime.timezone.utc)
@@ -467,7 +611,7 @@ def run_pipeline():
     nodate_articles = []
 
     for art in all_articles:
-        pub_dt = art["published_dt"]
+        pub_dt = art.published_dt
 
         if pub_dt is None:
             # Keep undated articles (e.g., some NoJitter stories)
@@ -482,58 +626,87 @@ def run_pipeline():
         age_hours = (now - pub_dt).total_seconds() / 3600
 
         if 0 <= age_hours <= MAX_AGE_HOURS:
-            art["published_dt"] = pub_dt
+            art.published_dt = pub_dt
             dated_recent.append(art)
 
     combined = dated_recent + nodate_articles
+    count_in_window(source_stats, combined)
 
     if not combined:
         print("No recent (or undated) articles after filtering.")
+        record_source_yield("ccaas_news", source_stats, budgets, flagged)
         return []
 
     # Deduplicate by URL
-    df = pd.DataFrame(combined).drop_duplicates(subset="url")
-    
-    print(f"Found {len(df)} unique articles after deduplication. Sending to LLM...")
+    unique = unique_by_url(combined)
 
-    processed_rows = []
+    # Analyze likely-HIGH stories first, so a run that hits its time budget
+    # still contains the articles that matter
+    queue = order_by_priority(unique, source_weights=SOURCE_WEIGHTS)
+    deadline = llm_deadline()
 
-    for idx, (_, row) in enumerate(df.iterrows(), 1):
-        print(f"\n[{idx}/{len(df)}] Processing: {row['title'][:60]}...")
-        print(f"   URL: {row['url']}")
-        ai = analyze_with_llm(row)
-        
-        # Log detailed results
-        engagement = ai.get("engagement", "LOW")
-        has_summary = bool(ai.get("summary", "").strip())
-        has_hook = bool(ai.get("hook", "").strip())
-        
-        if not has_summary and not has_hook:
-            print(f"   ⚠️ LLM returned EMPTY values - likely failed!")
+    # Group syndicated copies (same press release on several sites) and
+    # follow-ups of stories from previous days, so each story is analyzed once
+    reused = group_near_duplicates(queue, file_prefix="ccaas_news")
+
+    print(f"Found {len(queue)} unique articles after deduplication "
+          f"({reused} near-duplicates can reuse another analysis). Sending to LLM...")
+
+    processed_rows = []
+    pending_count = 0
+    reuse_count = 0
+    analyzed = {}  # url -> LLM result, for near-duplicate copies
+
+    for idx, row in enumerate(queue, 1):
+        print(f"\n[{idx}/{len(queue)}] Processing: {row.title[:60]}...")
+        print(f"   URL: {row.url}")
+
+        if row.duplicate_of in analyzed:
+            # Syndicated copy: reuse the representative's analysis
+            print(f"   🔁 Near-duplicate of {row.duplicate_of}")
+            ai = analyzed[row.duplicate_of]
+            reuse_count += 1
+        elif row.history_analysis:
+            # Same URL was analyzed on a previous day or an earlier run today
+            print("   🔁 Analyzed by an earlier run")
+            ai = Analysis.from_dict(row.history_analysis)
+            reuse_count += 1
+        elif deadline_passed(deadline):
+            # Out of time: keep the article, but mark it as not analyzed yet
+            print("   ⏱️ LLM deadline reached - writing as PENDING")
+            ai = Analysis.from_dict(pending_analysis())
+            pending_count += 1
         else:
-            print(f"   ✅ LLM analysis: engagement={engagement}, summary={has_summary}, hook={has_hook}")
+            ai = Analysis.from_dict(analyze_with_llm(row))
+            analyzed[row.url] = ai
 
-        pub_dt = row["published_dt"]
-        published_str = (
-            pub_dt.isoformat() if isinstance(pub_dt, datetime.datetime) else ""
-        )
+            # Log detailed results
+            engagement = ai.engagement
+            has_summary = bool(ai.summary.strip())
+            has_hook = bool(ai.hook.strip())
+
+            if not has_summary and not has_hook:
+                print(f"   ⚠️ LLM returned EMPTY values - likely failed!")
+            else:
+                print(f"   ✅ LLM analysis: engagement={engagement}, summary={has_summary}, hook={has_hook}")
+
+        processed_rows.append(NewsRow.build(row, ai))
+
+    count_results(source_stats, processed_rows)
+    record_source_yield("ccaas_news", source_stats, budgets, flagged)
 
-        processed_rows.append({
-            "date_scraped": datetime.date.today().isoformat(),
-            "source": row["source"],
-            "title": row["title"],
-            "url": row["url"],
-            "published": published_str,
-            "summary": ai.get("summary", ""),
-            "engagement": ai.get("engagement", "LOW"),
-            "hook": ai.get("hook", ""),
-            "is_ai_cs_relevant": ai.get("is_ai_cs_relevant", False),
-        })
-
-    out_df = pd.DataFrame(processed_rows)
+    # Keep rows an earlier run saved today (e.g. sources not due this run)
     filename = f"ccaas_news_{datetime.date.today().isoformat()}.csv"
-    out_df.to_csv(filename, index=False, encoding="utf-8")
+    saved = [row.as_dict() for row in processed_rows]
+    out_rows = saved + carried_over_rows(filename, saved)
+    write_rows(filename, out_rows)
+    save_daily_rows("ccaas_news", datetime.date.today().isoformat(), out_rows, filename)
+    record_daily_file(filename, out_rows, total_articles=fold_daily_file(filename, out_rows))
     print(f"Saved {len(processed_rows)} rows to {filename}")
+    if reuse_count:
+        print(f"🔁 {reuse_count} articles reused an earlier analysis")
+    if pending_count:
+        print(f"⏱️ {pending_count} articles left PENDING (LLM deadline reached)")
 
     return processed_rows
 
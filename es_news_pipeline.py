@@ -1,15 +1,34 @@
 import requests
-from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
 import json
 import datetime
-import pandas as pd
-from dateutil import parser as dateparser
 from urllib.parse import urlparse
 import os
-import warnings
 import time
 import random
 
+from news_priority import (
+    order_by_priority, llm_deadline, deadline_passed, pending_analysis,
+)
+from news_dedup import group_near_duplicates
+from news_urls import canonical_url, unique_by_url
+from news_discovery import discover_from_feeds
+from news_dates import latest_date_from_url, scan_html_for_date, is_too_old, parse_date
+from news_links import rank_links, log_link_outcomes
+from news_counter import fold_daily_file
+from news_manifest import record_daily_file
+from news_fetch import (
+    fetch_article_html, fetch_html, parse_html, crawl_deadline, fetch_totals, post_with_deadline,
+)
+from news_profiles import source_profile
+from news_records import Article, Analysis, NewsRow, write_rows, ES_CSV_COLUMNS
+from news_tags import TermMatcher
+from news_schedule import due_sources, mark_polled, carried_over_rows
+from news_store import save_daily_rows
+from news_yield import (
+    new_source_stats, count_rejection, count_outcomes, count_in_window,
+    count_results, allocate_budgets, print_budgets, record_source_yield,
+)
+
 # ============================
 # BASIC CONFIG
 # ============================
@@ -38,6 +57,17 @@ SOURCES = {
     "ITSMTools": "https://itsm.tools/itsm/",
 }
 
+# RSS/Atom feeds or news sitemaps per source (cheaper than scraping the
+# landing page). Sources without an entry, or whose feed fails, fall back
+# to HTML link scraping.
+FEEDS = {
+    "CXToday": "https://www.cxtoday.com/feed/",
+    "JoshBersin": "https://joshbersin.com/feed/",
+    "CIO": "https://www.cio.com/feed/",
+    "HRExecutive": "https://hrexecutive.com/feed/",
+    "ITSMTools": "https://itsm.tools/feed/",
+}
+
 # Keep dated articles from the last N hours
 # (undated ones are still kept and then filtered by ES relevance)
 MAX_AGE_HOURS = int(os.getenv("MAX_AGE_HOURS", "48"))  # default 48
@@ -45,6 +75,28 @@ MAX_AGE_HOURS = int(os.getenv("MAX_AGE_HOURS", "48"))  # default 48
 # Limit number of articles per source per run (safety for very long pages)
 MAX_ARTICLES_PER_SOURCE = int(os.getenv("MAX_ARTICLES_PER_SOURCE", "25"))
 
+# Link filters and content selectors for every source, unless
+# source_profiles.json overrides them for a source (see news_profiles.py)
+EXTRACTION_DEFAULTS = {
+    "exclude_url": [r"/category/", r"/tag/"],
+    # At least two path segments: no home or broad category pages
+    "min_depth": 2,
+    "title_selectors": ["h1", "h2"],
+    "body_selector": "p",
+    "paragraphs": 4,
+    "snippet_chars": 700,
+}
+
+# Relative weight of each source when ordering the LLM queue (default 1.0)
+SOURCE_WEIGHTS = {
+    "ITSMTools": 1.5,
+    "JoshBersin": 1.2,
+    "HRExecutive": 1.2,
+    "CIO": 1.0,
+    "TechTargetNews": 1.0,
+    "CXToday": 1.0,
+}
+
 # Optional: skip undated articles to speed up runs
 SKIP_UNDATED = os.getenv("SKIP_UNDATED", "false").lower() in ("1", "true", "yes")
 
@@ -54,9 +106,6 @@ LLM_TIMEOUT = 40
 LLM_SLEEP_MIN = 0.8
 LLM_SLEEP_MAX = 1.8
 
-# Silence XML warning noise from BeautifulSoup
-warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
-
 
 # ============================
 # ES VENDOR & KEYWORD FILTERS
@@ -88,6 +137,9 @@ ES_KEYWORDS = [
     "it asset management", "itam", "service catalog",
 ]
 
+ES_VENDOR_MATCHER = TermMatcher(ES_VENDORS)
+ES_KEYWORD_MATCHER = TermMatcher(ES_KEYWORDS)
+
 
 # ============================
 # DATE PARSING HELPERS
@@ -115,10 +167,9 @@ def extract_published_date_from_jsonld(soup):
                 continue
             for key in ["datePublished", "dateModified", "uploadDate"]:
                 if key in obj and obj[key]:
-                    try:
-                        return dateparser.parse(obj[key])
-                    except Exception:
-                        continue
+                    dt = parse_date(obj[key])
+                    if dt:
+                        return dt
     return None
 
 
@@ -126,6 +177,7 @@ def extract_published_date(soup):
     """
     Try to extract a publication date from the article HTML.
     Returns datetime (maybe tz-aware) or None.
+    DOM fallback for pages where news_dates.scan_html_for_date found nothing.
     """
 
     # 0) JSON-LD first (often the cleanest)
@@ -140,10 +192,9 @@ def extract_published_date(soup):
             text = time_tag["datetime"]
         else:
             text = time_tag.get_text(strip=True)
-        try:
-            return dateparser.parse(text)
-        except Exception:
-            pass
+        dt = parse_date(text)
+        if dt:
+            return dt
 
     # 2) Meta tags
     meta_candidates = [
@@ -159,10 +210,9 @@ def extract_published_date(soup):
         tag = soup.find(tag_name, attrs=attrs)
         if tag and tag.get("content"):
             text = tag["content"]
-            try:
-                return dateparser.parse(text)
-            except Exception:
-                continue
+            dt = parse_date(text)
+            if dt:
+                return dt
 
     # 3) Fallback: span/div with "date" in the class name
     def looks_like_date(tag):
@@ -174,10 +224,9 @@ def extract_published_date(soup):
     date_like = soup.find(looks_like_date)
     if date_like:
         text = date_like.get_text(strip=True)
-        try:
-            return dateparser.parse(text)
-        except Exception:
-            pass
+        dt = parse_date(text)
+        if dt:
+            return dt
 
     return None
 
@@ -194,25 +243,27 @@ def same_domain(url, base_url):
         return False
 
 
-def extract_articles(source_name, url):
+def scrape_index_links(source_name, url, deadline=None):
     """
-    Extract article URLs + content from a source homepage/category.
+    Fallback link discovery: collect article URLs from a homepage/category.
     - Filters out obvious navigation / home links based on path depth.
-    - Does NOT require dates (but will try to parse them).
+    - Returns {"url", "anchor", "position"} dicts for news_links.rank_links,
+      or None when the page could not be fetched.
     """
-    print(f"Scraping {source_name} -> {url}")
-
     try:
-        html = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT).text
+        html = fetch_html(url, headers=HEADERS, timeout=REQUEST_TIMEOUT, deadline=deadline)
     except Exception as e:
         print(f"Error scraping {source_name}: {e}")
-        return []
+        return None
 
-    soup = BeautifulSoup(html, "html.parser")
-    urls = []
+    soup = parse_html(html)
+    profile = source_profile(source_name, EXTRACTION_DEFAULTS)
+    candidates = []
+    seen_keys = set()  # canonical URLs, so utm_/amp/trailing-slash variants count once
 
     # Collect candidate links
-    for a in soup.find_all("a", href=True):
+    links = soup.find_all("a", href=True)
+    for position, a in enumerate(links):
         href = a["href"]
 
         # Basic filtering
@@ -223,70 +274,146 @@ def extract_articles(source_name, url):
         if not same_domain(href, url):
             continue
 
-        path = urlparse(href).path
-        segments = [s for s in path.split("/") if s]
-        # Require at least two segments to avoid home and broad category pages
-        if len(segments) < 2:
-            continue
-        
-        # Filter out category pages explicitly
-        if '/category/' in href.lower() or '/tag/' in href.lower():
-            continue
-        
-        # Filter out URLs that end with just category name (e.g., /hr-technology/)
-        if len(segments) == 1 and any(cat in href.lower() for cat in ['category', 'tag', 'author', 'archive']):
+        # Source profile: include/exclude patterns and path depth
+        if not profile.accepts_url(href):
             continue
 
-        if href not in urls:
-            urls.append(href)
+        key = canonical_url(href)
+        if key not in seen_keys:
+            seen_keys.add(key)
+            candidates.append({
+                "url": href,
+                "anchor": a.get_text(" ", strip=True),
+                "position": position / len(links),  # 0 = top of the page
+            })
+
+    return candidates
+
+
+def extract_articles(source_name, url, deadline=None, budget=MAX_ARTICLES_PER_SOURCE, stats=None):
+    """
+    Extract article URLs + content for a source.
+    - Prefers the source's RSS/Atom feed or news sitemap (FEEDS): entries
+      come with title/date, stale ones are dropped before any fetch, and
+      entries with a usable description need no article fetch at all.
+    - Falls back to scraping the homepage/category (scrape_index_links).
+    - Does NOT require dates (but will try to parse them).
+    - Stops early when the run's crawl deadline expires.
+    - Accepts at most `budget` articles; fills `stats` (news_yield) if given.
+    """
+    print(f"Scraping {source_name} -> {url}")
+    if stats is None:
+        stats = new_source_stats(source_name)
+    profile = source_profile(source_name, EXTRACTION_DEFAULTS)
+
+    candidates = discover_from_feeds(
+        source_name, FEEDS.get(source_name), MAX_AGE_HOURS,
+        headers=HEADERS, timeout=REQUEST_TIMEOUT, deadline=deadline,
+    )
+    stats["reached"] = candidates is not None
+    if candidates is None:
+        links = scrape_index_links(source_name, url, deadline)
+        stats["reached"] = links is not None
+        candidates = rank_links(source_name, links or [])
+
+    stats["links_found"] = len(candidates)
 
     articles = []
     processed_count = 0
+    stale_count = 0  # rejected by date before snippet extraction / budget
+    outcomes = []  # (candidate, outcome) per fetched link, for news_links
 
-    for article_url in urls:
-        if processed_count >= MAX_ARTICLES_PER_SOURCE:
+    for candidate in candidates:
+        if processed_count >= budget:
+            break
+        if deadline is not None and deadline.expired():
+            print(f"   ⏱️ Crawl deadline reached, keeping {len(articles)} articles from {source_name}")
             break
 
+        article_url = candidate["url"]
+        title = candidate.get("title", "")
+        snippet = candidate.get("snippet", "")[:profile.snippet_chars]
+        published_dt = candidate.get("published_dt")
+
+        # Date-first: reject links whose URL date is already out of window,
+        # before they cost a fetch or count toward the source's budget
+        if published_dt is None and is_too_old(latest_date_from_url(article_url), MAX_AGE_HOURS):
+            stale_count += 1
+            count_rejection(stats, "stale_url")
+            continue
+
         try:
-            art_html = requests.get(
-                article_url, headers=HEADERS, timeout=REQUEST_TIMEOUT
-            ).text
-            art_soup = BeautifulSoup(art_html, "html.parser")
+            # Feed entries with a title and a real description are enough
+            # for the LLM; everything else needs the article page
+            if not title or len(snippet) < 100:
+                # Streamed: stops after the head, headline and first paragraphs
+                stats["fetched"] += 1
+                art_html = fetch_article_html(
+                    article_url, headers=HEADERS, timeout=REQUEST_TIMEOUT,
+                    need_title=not title, min_paragraphs=profile.paragraphs, deadline=deadline,
+                    title_selectors=profile.title_selectors, body_selector=profile.body_selector,
+                    date_selector=profile.date_selector,
+                )
+
+                # Regex date scan (JSON-LD, meta, <time>) before building the
+                # DOM; extract_published_date only runs if it finds nothing
+                if published_dt is None:
+                    published_dt = scan_html_for_date(art_html)
+                if is_too_old(published_dt, MAX_AGE_HOURS):
+                    stale_count += 1
+                    outcomes.append((candidate, "stale"))
+                    continue
+
+                art_soup = parse_html(art_html)
+
+                if published_dt is None:
+                    # Source-specific date selector first, then the generic walk
+                    published_dt = profile.find_date(art_soup) or extract_published_date(art_soup)
+                    if is_too_old(published_dt, MAX_AGE_HOURS):
+                        stale_count += 1
+                        outcomes.append((candidate, "stale"))
+                        continue
 
-            title_tag = art_soup.find("h1") or art_soup.find("h2")
-            if not title_tag:
-                continue
+                if not title:
+                    title_tag = profile.find_title(art_soup)
+                    if not title_tag:
+                        outcomes.append((candidate, "no_title"))
+                        continue
+                    title = title_tag.get_text(strip=True)
+
+                paragraphs = profile.find_paragraphs(art_soup)
+                if not paragraphs:
+                    outcomes.append((candidate, "no_paragraphs"))
+                    continue
+
+                snippet = profile.snippet(paragraphs)
 
-            title = title_tag.get_text(strip=True)
-            
             # Skip if title is just a category name (too generic)
             generic_titles = ['hr technology', 'hr tech', 'itsm', 'employee service', 
                             'category', 'tags', 'archives', 'authors']
             if title.lower() in generic_titles or len(title) < 20:
+                outcomes.append((candidate, "short_title"))
                 continue
-            
-            paragraphs = art_soup.find_all("p")
-            if not paragraphs:
-                continue
-
-            snippet = " ".join(
-                [p.get_text(strip=True) for p in paragraphs[:4]]
-            )[:700]
-
-            published_dt = extract_published_date(art_soup)
 
-            articles.append({
-                "source": source_name,
-                "title": title,
-                "url": article_url,
-                "snippet": snippet,
-                "published_dt": published_dt,  # may be None
-            })
+            articles.append(Article(
+                source=source_name,
+                title=title,
+                url=article_url,
+                snippet=snippet,
+                published_dt=published_dt,  # may be None
+            ))
             processed_count += 1
+            outcomes.append((candidate, "article"))
 
         except Exception:
+            outcomes.append((candidate, "error"))
             continue
 
+    log_link_outcomes(source_name, outcomes)
+    count_outcomes(stats, outcomes)
+    if stale_count:
+        print(f"   ⏭️ {source_name}: {stale_count} out-of-window articles rejected early")
+
     return articles
 
 
@@ -296,14 +423,11 @@ def extract_articles(source_name, url):
 
 def detect_es_vendors_and_keywords(article):
     """
-    Return (set_of_vendor_hits, set_of_keyword_hits) based on title+snippet.
+    Return (set_of_vendor_hits, set_of_keyword_hits) based on title+snippet
+    (whole words, so "sap" does not match "sapphire").
     """
-    text = f"{article['title']} {article['snippet']}".lower()
-
-    vendor_hits = {v for v in ES_VENDORS if v in text}
-    keyword_hits = {k for k in ES_KEYWORDS if k in text}
-
-    return vendor_hits, keyword_hits
+    text = f"{article.title} {article.snippet}"
+    return ES_VENDOR_MATCHER.find(text), ES_KEYWORD_MATCHER.find(text)
 
 
 def is_es_relevant(article):
@@ -356,9 +480,9 @@ You are a B2B market intelligence analyst at Zendesk.
 Analyze this Employee Service (ES) related article. ES includes ITSM, ITOM,
 ESM, HR service management, employee experience, and workflow automation.
 
-ARTICLE TITLE: {article['title']}
-ARTICLE URL: {article['url']}
-SNIPPET: {article['snippet']}
+ARTICLE TITLE: {article.title}
+ARTICLE URL: {article.url}
+SNIPPET: {article.snippet}
 
 Follow these steps:
 
@@ -418,7 +542,7 @@ Return ONLY a valid JSON object with EXACTLY these keys:
     }
 
     try:
-        response = requests.post(
+        response = post_with_deadline(
             ZENDESK_AI_URL,
             headers={
                 "Authorization": f"Bearer {ZENDESK_AI_KEY}",
@@ -428,7 +552,7 @@ Return ONLY a valid JSON object with EXACTLY these keys:
             timeout=LLM_TIMEOUT,
         )
     except requests.exceptions.RequestException as e:
-        print("LLM network error on:", article["url"], "| Error:", e)
+        print("LLM network error on:", article.url, "| Error:", e)
         return {"summary": "", "engagement": "LOW", "hook": "", "is_ai_cs_relevant": False}
 
     if response.status_code == 401:
@@ -436,7 +560,7 @@ Return ONLY a valid JSON object with EXACTLY these keys:
         return {"summary": "", "engagement": "LOW", "hook": "", "is_ai_cs_relevant": False}
 
     if response.status_code != 200:
-        print("LLM HTTP error on:", article["url"])
+        print("LLM HTTP error on:", article.url)
         print("Status:", response.status_code, "| Body:", response.text[:200])
         return {"summary": "", "engagement": "LOW", "hook": "", "is_ai_cs_relevant": False}
 
@@ -478,7 +602,7 @@ Return ONLY a valid JSON object with EXACTLY these keys:
         }
 
     except Exception as e:
-        print("LLM parse error on:", article["url"], "| Error:", e)
+        print("LLM parse error on:", article.url, "| Error:", e)
         print("Raw response snippet:", response.text[:200])
         return {"summary": "", "engagement": "LOW", "hook": "", "is_ai_cs_relevant": False}
 
@@ -490,13 +614,42 @@ Return ONLY a valid JSON object with EXACTLY these keys:
 def run_pipeline():
     all_articles = []
 
-    # 1) Scrape each source
+    # 1) Scrape each source, within a hard wall-clock budget
+    crawl_budget = crawl_deadline()
+
+    # Busy sources are polled more often than quiet ones (news_schedule);
+    # quiet ones at least every MAX_AGE_HOURS / 2 so nothing ages out unseen
+    due, schedule = due_sources("es_news", SOURCES, max_interval_hours=MAX_AGE_HOURS / 2)
+    if not due:
+        print("No source is due for polling yet.")
+        return []
+
+    # Article budgets follow each source's recent yield (news_yield)
+    budgets, flagged = allocate_budgets("es_news", SOURCES, MAX_ARTICLES_PER_SOURCE)
+    print_budgets(budgets, flagged, MAX_ARTICLES_PER_SOURCE)
+    source_stats = {}
+
     for name, url in SOURCES.items():
-        articles = extract_articles(name, url)
+        if name not in due:
+            continue
+        if crawl_budget.expired():
+            print(f"⏱️ Crawl deadline reached, skipping {name} and remaining sources")
+            break
+        stats = source_stats[name] = new_source_stats(name)
+        started, bytes_before = time.monotonic(), fetch_totals()["bytes"]
+        articles = extract_articles(
+            name, url, deadline=crawl_budget, budget=budgets[name], stats=stats
+        )
+        stats["seconds"] = time.monotonic() - started
+        stats["bytes"] = fetch_totals()["bytes"] - bytes_before
         all_articles.extend(articles)
 
+    # Sources whose feed and landing page both failed stay due for the next run
+    mark_polled(schedule, "es_news", [name for name, stats in source_stats.items() if stats["reached"]])
+
     if not all_articles:
         print("No articles found at all.")
+        record_source_yield("es_news", source_stats, budgets, flagged)
         return []
 
     now = datetime.datetime.now(datetime.timezone.utc)
@@ -505,7 +658,7 @@ def run_pipeline():
     nodate_articles = []
 
     for art in all_articles:
-        pub_dt = art["published_dt"]
+        pub_dt = art.published_dt
 
         if pub_dt is None:
             if not SKIP_UNDATED:
@@ -521,71 +674,91 @@ def run_pipeline():
         age_hours = (now - pub_dt).total_seconds() / 3600
 
         if 0 <= age_hours <= MAX_AGE_HOURS:
-            art["published_dt"] = pub_dt
+            art.published_dt = pub_dt
             dated_recent.append(art)
 
     combined = dated_recent + nodate_articles
+    count_in_window(source_stats, combined)
 
     if not combined:
         print("No recent (or undated) articles after time filtering.")
+        record_source_yield("es_news", source_stats, budgets, flagged)
         return []
 
-    # 2) Deduplicate by URL
-    df = pd.DataFrame(combined).drop_duplicates(subset="url")
-
-    # 3) Filter for ES relevance
-    es_rows = []
-    for _, row in df.iterrows():
-        art = {
-            "source": row["source"],
-            "title": row["title"],
-            "url": row["url"],
-            "snippet": row["snippet"],
-            "published_dt": row["published_dt"],
-        }
-        if is_es_relevant(art):
-            es_rows.append(art)
+    # 2) Deduplicate by URL, 3) filter for ES relevance
+    es_rows = [art for art in unique_by_url(combined) if is_es_relevant(art)]
 
     if not es_rows:
         print("No ES-relevant articles found.")
+        record_source_yield("es_news", source_stats, budgets, flagged)
         return []
 
-    print(f"Found {len(es_rows)} ES-relevant candidate articles. Sending to LLM...")
+    # Analyze likely-HIGH stories first, so a run that hits its time budget
+    # still contains the articles that matter
+    es_rows = order_by_priority(
+        es_rows,
+        source_weights=SOURCE_WEIGHTS,
+        vendors=ES_VENDOR_MATCHER,
+    )
+    deadline = llm_deadline()
+
+    # Group syndicated copies (same press release on several sites) and
+    # follow-ups of stories from previous days, so each story is analyzed once
+    reused = group_near_duplicates(es_rows, file_prefix="es_news")
+
+    print(f"Found {len(es_rows)} ES-relevant candidate articles "
+          f"({reused} near-duplicates can reuse another analysis). Sending to LLM...")
 
     processed_rows = []
+    pending_count = 0
+    reuse_count = 0
+    analyzed = {}  # url -> LLM result, for near-duplicate copies
 
     for art in es_rows:
         vendors_hit, keywords_hit = detect_es_vendors_and_keywords(art)
 
-        # Call LLM
-        ai = analyze_with_llm(art)
+        if art.duplicate_of in analyzed:
+            # Syndicated copy: reuse the representative's analysis
+            ai = analyzed[art.duplicate_of]
+            reuse_count += 1
+        elif art.history_analysis:
+            # Same URL was analyzed on a previous day or an earlier run today
+            ai = Analysis.from_dict(art.history_analysis)
+            reuse_count += 1
+        elif deadline_passed(deadline):
+            # Out of time: keep the article, but mark it as not analyzed yet
+            ai = Analysis.from_dict(pending_analysis())
+            pending_count += 1
+        else:
+            # Call LLM
+            ai = Analysis.from_dict(analyze_with_llm(art))
+            analyzed[art.url] = ai
 
-        pub_dt = art["published_dt"]
-        published_str = (
-            pub_dt.isoformat() if isinstance(pub_dt, datetime.datetime) else ""
-        )
+        processed_rows.append(NewsRow.build(
+            art, ai,
+            vendors_hit=", ".join(sorted(vendors_hit)),
+            keywords_hit=", ".join(sorted(keywords_hit)),
+        ))
+
+        # Gentle pacing for the gateway (only after a real LLM call)
+        if art.url in analyzed:
+            time.sleep(random.uniform(LLM_SLEEP_MIN, LLM_SLEEP_MAX))
+
+    count_results(source_stats, processed_rows)
+    record_source_yield("es_news", source_stats, budgets, flagged)
 
-        processed_rows.append({
-            "date_scraped": datetime.date.today().isoformat(),
-            "source": art["source"],
-            "title": art["title"],
-            "url": art["url"],
-            "published": published_str,
-            "vendors_hit": ", ".join(sorted(vendors_hit)),
-            "keywords_hit": ", ".join(sorted(keywords_hit)),
-            "summary": ai.get("summary", ""),
-            "engagement": ai.get("engagement", "LOW"),
-            "hook": ai.get("hook", ""),
-            "is_ai_cs_relevant": ai.get("is_ai_cs_relevant", False),
-        })
-
-        # Gentle pacing for the gateway
-        time.sleep(random.uniform(LLM_SLEEP_MIN, LLM_SLEEP_MAX))
-
-    out_df = pd.DataFrame(processed_rows)
+    # Keep rows an earlier run saved today (e.g. sources not due this run)
     filename = f"es_news_{datetime.date.today().isoformat()}.csv"
-    out_df.to_csv(filename, index=False, encoding="utf-8")
+    saved = [row.as_dict() for row in processed_rows]
+    out_rows = saved + carried_over_rows(filename, saved)
+    write_rows(filename, out_rows, columns=ES_CSV_COLUMNS)
+    save_daily_rows("es_news", datetime.date.today().isoformat(), out_rows, filename)
+    record_daily_file(filename, out_rows, total_articles=fold_daily_file(filename, out_rows))
     print(f"Saved {len(processed_rows)} rows to {filename}")
+    if reuse_count:
+        print(f"🔁 {reuse_count} articles reused an earlier analysis")
+    if pending_count:
+        print(f"⏱️ {pending_count} articles left PENDING (LLM deadline reached)")
 
     return processed_rows
 
@@ -0,0 +1,151 @@
+import argparse
+import calendar
+import csv
+import datetime
+import glob
+import os
+
+from news_records import read_daily_csv, write_rows
+from news_store import COLUMNS_BY_VERTICAL, parse_archive_filename, parse_daily_filename
+from news_urls import canonical_url
+
+# ============================
+# ARCHIVE CONFIG
+# ============================
+
+# Daily CSVs of closed months are compacted into one gzip CSV per vertical
+# and month (<prefix>_YYYY-MM.csv.gz, same columns), keeping one row per
+# canonical URL and scrape date, so every day reads back as it was. The
+# daily files are removed once the archive is written and read back. Every reader (store import,
+# manifest, counter, schedule, dedup history) takes archives as well.
+#
+# A month is closed once ARCHIVE_GRACE_DAYS have passed since its last day,
+# which leaves late reruns time to land. Daily files of an archived month
+# that show up later are merged into the archive on the next run.
+ARCHIVE_GRACE_DAYS = int(os.getenv("ARCHIVE_GRACE_DAYS", "2"))
+
+
+def archive_name(vertical, month):
+    return f"{vertical}_{month}.csv.gz"
+
+
+def _month_end(month):
+    year, mon = map(int, month.split("-"))
+    return datetime.date(year, mon, calendar.monthrange(year, mon)[1])
+
+
+# ============================
+# READING
+# ============================
+
+def daily_rows(file_prefix, since=None):
+    """
+    (date_scraped, row) for every row of one vertical (e.g. "es_news")
+    scraped on or after `since` (a date), from its daily CSVs and monthly
+    archives, oldest file first. For daily files the date is the file's.
+    """
+    files = []
+    for path in glob.glob(f"{file_prefix}_*.csv") + glob.glob(f"{file_prefix}_*.csv.gz"):
+        daily, archive = parse_daily_filename(path), parse_archive_filename(path)
+        if daily and daily[0] == file_prefix:
+            first = last = datetime.date.fromisoformat(daily[1])
+        elif archive and archive[0] == file_prefix:
+            first, last = datetime.date.fromisoformat(f"{archive[1]}-01"), _month_end(archive[1])
+        else:
+            continue
+        if since is None or last >= since:
+            files.append((first, not archive, path))
+
+    since_str = since.isoformat() if since else ""
+    for first, is_daily, path in sorted(files):
+        try:
+            rows = read_daily_csv(path)
+        except Exception as e:
+            print(f"   ⚠️ Could not read {path}: {e}")
+            continue
+        for row in rows:
+            date_str = first.isoformat() if is_daily else (row.get("date_scraped") or first.isoformat())
+            if date_str >= since_str:
+                yield date_str, row
+
+
+# ============================
+# COMPACTION
+# ============================
+
+def closed_months(directory=".", today=None):
+    """{(vertical, "YYYY-MM"): [daily CSV paths]} for the months ready to compact."""
+    today = today or datetime.date.today()
+    months = {}
+    for path in glob.glob(os.path.join(directory, "*_news_*.csv")):
+        parsed = parse_daily_filename(path)
+        if not parsed:
+            continue
+        vertical, date_str = parsed
+        month = date_str[:7]
+        if (today - _month_end(month)).days > ARCHIVE_GRACE_DAYS:
+            months.setdefault((vertical, month), []).append(path)
+    return months
+
+
+def compact_month(vertical, month, paths, directory=".", dry_run=False):
+    """
+    Merge the daily CSVs of one vertical and month (and its archive, if
+    there is one already) into the archive, one row per canonical URL and
+    scrape date, then remove the daily files. Returns (rows read, rows kept).
+    """
+    target = os.path.join(directory, archive_name(vertical, month))
+    sources = ([target] if os.path.exists(target) else []) + sorted(paths)
+
+    latest = {}  # (canonical URL, date_scraped) -> row, daily files over the archive
+    read = 0
+    for path in sources:
+        daily = parse_daily_filename(path)
+        for row in read_daily_csv(path):
+            read += 1
+            url = str(row.get("url") or "").strip()
+            if not url:
+                continue
+            if daily:
+                # daily_rows dates a daily file's rows by the file; keep that day
+                row["date_scraped"] = daily[1]
+            latest[(canonical_url(url), row.get("date_scraped", ""))] = row
+    rows = sorted(latest.values(), key=lambda r: r.get("date_scraped", ""))
+    if dry_run:
+        return read, len(rows)
+
+    tmp = f"{target}.tmp.gz"
+    write_rows(tmp, rows, COLUMNS_BY_VERTICAL[vertical])
+    if len(read_daily_csv(tmp)) != len(rows):
+        os.remove(tmp)
+        raise ValueError(f"{tmp} did not read back {len(rows)} rows")
+    os.replace(tmp, target)
+    for path in paths:
+        os.remove(path)
+    return read, len(rows)
+
+
+def compact(directory=".", today=None, dry_run=False):
+    """Compact every closed month. Returns the number of daily files archived."""
+    archived = 0
+    for (vertical, month), paths in sorted(closed_months(directory, today).items()):
+        try:
+            read, kept = compact_month(vertical, month, paths, directory, dry_run)
+        except (OSError, ValueError, csv.Error) as e:
+            print(f"⚠️ Could not compact {vertical} {month}: {e}")
+            continue
+        archived += len(paths)
+        name = archive_name(vertical, month)
+        size = "" if dry_run else f", {os.path.getsize(os.path.join(directory, name)) / 1024:.0f} KB"
+        print(f"🗜️ {name}: {len(paths)} daily file(s), {read} rows -> {kept} unique{size}")
+    return archived
+
+
+if __name__ == "__main__":
+    # python news_archive.py [--dry-run] [DIR] -> compact closed months of daily CSVs
+    parser = argparse.ArgumentParser(description="Compact closed months of daily CSVs into gzip archives")
+    parser.add_argument("directory", nargs="?", default=".")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be compacted")
+    args = parser.parse_args()
+    archived = compact(args.directory, dry_run=args.dry_run)
+    print(f"{'Would archive' if args.dry_run else 'Archived'} {archived} daily file(s)")
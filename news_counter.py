@@ -0,0 +1,183 @@
+import base64
+import csv
+import hashlib
+import json
+import math
+import os
+
+from news_records import open_csv
+from news_urls import canonical_url
+
+# ============================
+# DISTINCT URL COUNTER CONFIG
+# ============================
+
+# "Total News Collected": distinct canonical URLs over all daily CSVs,
+# maintained incrementally. Each daily file is folded in once (again only if
+# its mtime changes); the pipelines fold the rows they just wrote.
+COUNTER_FILE = os.getenv("URL_COUNTER_FILE", "url_counter.json")
+
+# "exact": persistent set of 64-bit URL hashes (exact up to hash collisions,
+#          ~17 bytes per URL on disk)
+# "hll":   HyperLogLog sketch, fixed 16 KB, ~0.8% standard error
+COUNTER_MODE = os.getenv("URL_COUNTER_MODE", "exact").strip().lower()
+
+HLL_PRECISION = 14  # 2^14 registers
+
+
+def url_hash(url):
+    """64-bit hash of an article's canonical URL, as 16 hex chars."""
+    return hashlib.sha1(canonical_url(url).encode("utf-8")).hexdigest()[:16]
+
+
+# ============================
+# COUNTERS
+# ============================
+
+class ExactCounter:
+    mode = "exact"
+
+    def __init__(self, state=None):
+        self.hashes = set(state or [])
+
+    def add(self, digest):
+        self.hashes.add(digest)
+
+    def count(self):
+        return len(self.hashes)
+
+    def state(self):
+        return sorted(self.hashes)
+
+
+class HyperLogLog:
+    mode = "hll"
+
+    def __init__(self, state=None, precision=HLL_PRECISION):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(base64.b64decode(state)) if state else bytearray(self.m)
+        if len(self.registers) != self.m:
+            self.registers = bytearray(self.m)
+
+    def add(self, digest):
+        x = int(digest, 16)
+        index = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        # Position of the leftmost 1-bit in the remaining 64 - p bits
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small range: linear counting
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def state(self):
+        return base64.b64encode(bytes(self.registers)).decode("ascii")
+
+
+_COUNTERS = {"exact": ExactCounter, "hll": HyperLogLog}
+
+
+def load_counter(path=None):
+    """
+    (counter, folded_files) for COUNTER_MODE. folded_files maps daily file
+    name -> mtime it was folded at. A state saved in another mode is
+    discarded, so every file gets folded again.
+    """
+    cls = _COUNTERS.get(COUNTER_MODE, ExactCounter)
+    try:
+        with open(path or COUNTER_FILE, encoding="utf-8") as f:
+            saved = json.load(f)
+    except (FileNotFoundError, ValueError):
+        saved = {}
+    if saved.get("mode") != cls.mode:
+        return cls(), {}
+    return cls(saved.get("state")), saved.get("files", {})
+
+
+def save_counter(counter, folded_files, path=None):
+    path = path or COUNTER_FILE
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"mode": counter.mode, "files": folded_files, "state": counter.state()}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ Could not save {path}: {e}")
+
+
+def _fold_rows(counter, rows):
+    for row in rows:
+        url = str(row.get("url") or "").strip()
+        if url:
+            counter.add(url_hash(url))
+
+
+# ============================
+# UPDATES
+# ============================
+
+def fold_daily_file(csv_path, rows, path=None):
+    """
+    Pipelines: fold the rows just written to a daily CSV into the counter.
+    Returns the distinct article count.
+    """
+    counter, folded = load_counter(path)
+    _fold_rows(counter, rows)
+    try:
+        folded[os.path.basename(csv_path)] = os.path.getmtime(csv_path)
+    except OSError:
+        pass
+    save_counter(counter, folded, path)
+    return counter.count()
+
+
+def sync_counter(manifest, directory=".", path=None):
+    """
+    Fold in the daily files and archives listed in the manifest that are
+    new or changed since they were last folded, reading only those. Returns the distinct
+    article count.
+    """
+    counter, folded = load_counter(path)
+    stale = [name for name, entry in manifest["files"].items() if folded.get(name) != entry.get("mtime")]
+    # Daily files compacted into an archive are gone; their URLs stay counted
+    gone = [name for name in folded if name not in manifest["files"]]
+    for name in gone:
+        del folded[name]
+    for name in stale:
+        csv_path = os.path.join(directory, name)
+        try:
+            with open_csv(csv_path) as f:
+                _fold_rows(counter, csv.DictReader(f))
+            folded[name] = manifest["files"][name]["mtime"]
+        except (OSError, EOFError, csv.Error) as e:
+            print(f"⚠️ Could not count {csv_path}: {e}")
+    if stale or gone:
+        save_counter(counter, folded, path)
+    return counter.count()
+
+
+if __name__ == "__main__":
+    # python news_counter.py -> compare the HyperLogLog estimate with the exact count
+    import glob
+
+    exact, sketch = ExactCounter(), HyperLogLog()
+    for csv_path in sorted(glob.glob("*_news_*.csv") + glob.glob("*_news_*.csv.gz")):
+        with open_csv(csv_path) as f:
+            for row in csv.DictReader(f):
+                url = str(row.get("url") or "").strip()
+                if url:
+                    digest = url_hash(url)
+                    exact.add(digest)
+                    sketch.add(digest)
+    n = exact.count()
+    error = (sketch.count() - n) / n * 100 if n else 0.0
+    print(f"exact: {n}  hll: {sketch.count()} ({error:+.2f}%)")
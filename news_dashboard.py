@@ -1,8 +1,6 @@
 import streamlit as st
 import pandas as pd
 import datetime
-from pathlib import Path
-import glob
 import json
 import subprocess
 import sys
@@ -11,6 +9,14 @@ import re
 import html
 import os
 
+from news_store import (
+    STORE_FILE, VERTICALS, HIGHLIGHT_START, HIGHLIGHT_END, connect, import_csv, query_rows, search_rows,
+)
+from news_parquet import PARQUET_DIR, refresh_from_store
+from news_manifest import load_manifest, manifest_signature, save_manifest, refresh_manifest
+from news_counter import sync_counter
+from news_views import analysis_for, load_view, merge_verticals, view_signature
+
 # Page config - ensure sidebar is always visible
 st.set_page_config(
     page_title="News Radar Dashboard",
@@ -112,6 +118,21 @@ st.markdown("""
         gap: 0.4rem;
     }
     
+    .engagement-pending {
+        background: #ffffff;
+        color: #6b7280;
+        border: 1px dashed #9ca3af;
+        padding: 0.35rem 0.85rem;
+        border-radius: 6px;
+        font-weight: 600;
+        font-size: 0.75rem;
+        text-transform: uppercase;
+        letter-spacing: 0.5px;
+        display: inline-flex;
+        align-items: center;
+        gap: 0.4rem;
+    }
+    
     .news-card {
         background: #ffffff;
         padding: 1.5rem;
@@ -160,6 +181,14 @@ st.markdown("""
         font-size: 0.95rem;
     }
     
+    /* Search matches */
+    .news-card mark {
+        background-color: #D1F46E;
+        color: inherit;
+        padding: 0 0.15rem;
+        border-radius: 3px;
+    }
+    
     .news-meta {
         font-size: 0.875rem;
         color: #6b7280;
@@ -644,243 +673,81 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+def sync_store():
+    """
+    Check the manifest of daily CSVs and import only the files that are new
+    or changed since the last rerun (e.g. after a git pull).
+    """
+    try:
+        manifest, changed = refresh_manifest()
+        if changed:
+            conn = connect()
+            for path in changed:
+                import_csv(conn, path)
+            conn.close()
+        # The URL counter is only read when the files changed since its
+        # total was last copied into the manifest
+        signature = manifest_signature(manifest)
+        if manifest["counted_signature"] != signature:
+            manifest["total_articles"] = sync_counter(manifest)
+            manifest["counted_signature"] = signature
+            save_manifest(manifest)
+    except Exception as e:
+        st.warning(f"Error updating the news store: {e}")
+        return
+    if changed:
+        print(f"🗄️ Imported {len(changed)} daily file(s) into {STORE_FILE}")
+    
+    # Keep the Parquet copy in step (no-op without pyarrow, or when the
+    # files are the same as at its last refresh)
+    try:
+        refresh_from_store(signature=signature)
+    except Exception as e:
+        print(f"⚠️ Could not refresh {PARQUET_DIR}: {e}")
+
+
 def load_news_data(date_str=None):
-    """Load news data from CSV files for a given date."""
+    """Load news data from the article store for a given scrape date."""
     if date_str is None:
         date_str = datetime.date.today().isoformat()
     
-    base_path = Path(".")
-    ccaas_file = base_path / f"ccaas_news_{date_str}.csv"
-    es_file = base_path / f"es_news_{date_str}.csv"
-    cx_ai_file = base_path / f"cx_ai_news_{date_str}.csv"
-    
-    ccaas_df = None
-    es_df = None
-    cx_ai_df = None
-    
-    if ccaas_file.exists():
-        try:
-            ccaas_df = pd.read_csv(ccaas_file)
-            ccaas_df['category'] = 'CCaaS'
-        except Exception as e:
-            st.warning(f"Error loading CCaaS data: {e}")
-    
-    if es_file.exists():
-        try:
-            es_df = pd.read_csv(es_file)
-            es_df['category'] = 'ES'
-        except Exception as e:
-            st.warning(f"Error loading ES data: {e}")
-    
-    if cx_ai_file.exists():
-        try:
-            cx_ai_df = pd.read_csv(cx_ai_file)
-            cx_ai_df['category'] = 'CX AI'
-        except Exception as e:
-            st.warning(f"Error loading CX AI data: {e}")
-    
-    return ccaas_df, es_df, cx_ai_df
+    try:
+        conn = connect()
+        rows = query_rows(conn, date_from=date_str, date_to=date_str)
+        conn.close()
+    except Exception as e:
+        st.warning(f"Error loading news data: {e}")
+        rows = []
+    
+    # One row per article, labelled with every vertical that captured it
+    return merge_verticals(pd.DataFrame(rows))
 
 
 def load_news_data_by_period(period='last_24h'):
-    """Load news data from CSV files based on time period.
+    """Load news data from the materialized view of a time period.
     
     Args:
         period: 'last_24h', 'this_week', 'this_month', or 'all_time'
     
     Returns:
-        Tuple of (ccaas_df, es_df, cx_ai_df) DataFrames
+        DataFrame with one row per article (categories / engagements per vertical)
     """
-    base_path = Path(".")
-    now = datetime.datetime.now(datetime.timezone.utc)
-    
-    # Determine date range based on period
-    if period == 'last_24h':
-        # Only today's files
-        date_str = datetime.date.today().isoformat()
-        date_range = [date_str]
-    elif period == 'this_week':
-        # Last 7 days
-        date_range = []
-        for i in range(7):
-            date = datetime.date.today() - datetime.timedelta(days=i)
-            date_range.append(date.isoformat())
-    elif period == 'this_month':
-        # Last 30 days
-        date_range = []
-        for i in range(30):
-            date = datetime.date.today() - datetime.timedelta(days=i)
-            date_range.append(date.isoformat())
-    else:  # all_time
-        # All available dates
-        date_range = get_available_dates()
-    
-    # Load all CSV files for the date range
-    ccaas_dfs = []
-    es_dfs = []
-    cx_ai_dfs = []
-    
-    for date_str in date_range:
-        ccaas_file = base_path / f"ccaas_news_{date_str}.csv"
-        es_file = base_path / f"es_news_{date_str}.csv"
-        cx_ai_file = base_path / f"cx_ai_news_{date_str}.csv"
-        
-        if ccaas_file.exists():
-            try:
-                df = pd.read_csv(ccaas_file)
-                df['category'] = 'CCaaS'
-                ccaas_dfs.append(df)
-            except Exception as e:
-                pass
-        
-        if es_file.exists():
-            try:
-                df = pd.read_csv(es_file)
-                df['category'] = 'ES'
-                es_dfs.append(df)
-            except Exception as e:
-                pass
-        
-        if cx_ai_file.exists():
-            try:
-                df = pd.read_csv(cx_ai_file)
-                df['category'] = 'CX AI'
-                cx_ai_dfs.append(df)
-            except Exception as e:
-                pass
-    
-    # Combine all DataFrames
-    if ccaas_dfs:
-        ccaas_df = pd.concat(ccaas_dfs, ignore_index=True)
-    else:
-        ccaas_df = pd.DataFrame()
-    
-    if es_dfs:
-        es_df = pd.concat(es_dfs, ignore_index=True)
-    else:
-        es_df = pd.DataFrame()
-    
-    if cx_ai_dfs:
-        cx_ai_df = pd.concat(cx_ai_dfs, ignore_index=True)
-    else:
-        cx_ai_df = pd.DataFrame()
-    
-    # Filter by published date based on period
-    if period == 'last_24h':
-        cutoff = now - datetime.timedelta(hours=24)
-    elif period == 'this_week':
-        cutoff = now - datetime.timedelta(days=7)
-    elif period == 'this_month':
-        cutoff = now - datetime.timedelta(days=30)
-    else:  # all_time
-        cutoff = None
-    
-    def filter_by_date(df):
-        if df.empty or cutoff is None:
-            return df
-        
-        # Try to parse published date column
-        date_cols = ['published_dt', 'published', 'date']
-        date_col = None
-        for col in date_cols:
-            if col in df.columns:
-                date_col = col
-                break
-        
-        if date_col is None:
-            # If no date column, keep all rows (fallback to file date)
-            return df
-        
-        filtered_rows = []
-        for idx, row in df.iterrows():
-            pub_date = row[date_col]
-            if pd.isna(pub_date) or pub_date == '':
-                # Keep articles without dates
-                filtered_rows.append(idx)
-                continue
-            
-            try:
-                # Try to parse the date
-                if isinstance(pub_date, str):
-                    if 'T' in pub_date:
-                        pub_dt = datetime.datetime.fromisoformat(pub_date.replace('Z', '+00:00'))
-                    else:
-                        pub_dt = datetime.datetime.strptime(pub_date, '%Y-%m-%d')
-                        pub_dt = pub_dt.replace(tzinfo=datetime.timezone.utc)
-                else:
-                    pub_dt = pd.to_datetime(pub_date)
-                    if pub_dt.tzinfo is None:
-                        pub_dt = pub_dt.replace(tzinfo=datetime.timezone.utc)
-                
-                # Normalize to UTC
-                if pub_dt.tzinfo is None:
-                    pub_dt = pub_dt.replace(tzinfo=datetime.timezone.utc)
-                else:
-                    pub_dt = pub_dt.astimezone(datetime.timezone.utc)
-                
-                if pub_dt >= cutoff:
-                    filtered_rows.append(idx)
-            except:
-                # If date parsing fails, keep the article
-                filtered_rows.append(idx)
-        
-        return df.loc[filtered_rows] if filtered_rows else pd.DataFrame()
-    
-    ccaas_df = filter_by_date(ccaas_df)
-    es_df = filter_by_date(es_df)
-    cx_ai_df = filter_by_date(cx_ai_df)
-    
-    # Deduplicate by URL
-    if not ccaas_df.empty:
-        ccaas_df = ccaas_df.drop_duplicates(subset='url', keep='first')
-    if not es_df.empty:
-        es_df = es_df.drop_duplicates(subset='url', keep='first')
-    if not cx_ai_df.empty:
-        cx_ai_df = cx_ai_df.drop_duplicates(subset='url', keep='first')
-    
-    return ccaas_df, es_df, cx_ai_df
+    try:
+        # Rebuilt only when a daily file changed or the date rolled over
+        return load_view(period, view_signature(load_manifest()))
+    except Exception as e:
+        st.warning(f"Error loading news data: {e}")
+        return pd.DataFrame()
 
 
 def get_available_dates():
-    """Get list of available dates from CSV files."""
-    base_path = Path(".")
-    ccaas_files = glob.glob(str(base_path / "ccaas_news_*.csv"))
-    es_files = glob.glob(str(base_path / "es_news_*.csv"))
-    cx_ai_files = glob.glob(str(base_path / "cx_ai_news_*.csv"))
-    
-    dates = set()
-    for file in ccaas_files + es_files + cx_ai_files:
-        try:
-            # Extract date from filename: ccaas_news_YYYY-MM-DD.csv or cx_ai_news_YYYY-MM-DD.csv
-            parts = file.split("_")
-            date_str = parts[-1].replace(".csv", "")
-            datetime.datetime.strptime(date_str, "%Y-%m-%d")
-            dates.add(date_str)
-        except:
-            continue
-    
-    return sorted(dates, reverse=True)
+    """Get list of scrape dates with a daily file, from the manifest."""
+    return load_manifest()["dates"]
 
 
 def get_total_news_count():
-    """Get total count of all news articles collected historically (deduplicated by URL)."""
-    base_path = Path(".")
-    ccaas_files = glob.glob(str(base_path / "ccaas_news_*.csv"))
-    es_files = glob.glob(str(base_path / "es_news_*.csv"))
-    cx_ai_files = glob.glob(str(base_path / "cx_ai_news_*.csv"))
-    
-    all_urls = set()
-    
-    for file in ccaas_files + es_files + cx_ai_files:
-        try:
-            df = pd.read_csv(file)
-            if 'url' in df.columns:
-                all_urls.update(df['url'].dropna().astype(str))
-        except Exception as e:
-            # Skip files that can't be read
-            continue
-    
-    return len(all_urls)
+    """Get total count of all news articles collected historically (deduplicated by canonical URL)."""
+    return load_manifest()["total_articles"]
 
 
 def safe_str(value, default=''):
@@ -896,70 +763,11 @@ def safe_str(value, default=''):
 # AI IN CS ECOSYSTEM DETECTION
 # ============================
 
-# AI CS Ecosystem vendors by layer (from Q4 2025 Ecosystem Map)
-AI_CS_ECOSYSTEM_VENDORS = {
-    # CS Platforms (Helpdesks/CRMs)
-    'CS Platforms': ['Zendesk', 'Salesforce', 'Microsoft', 'HubSpot', 'Freshworks', 
-                     'ServiceNow', 'Intercom', 'Gorgias'],
-    # CC Platforms
-    'CCaaS': ['Genesys', 'NICE', 'Five9', 'RingCentral', '8x8', '8x8'],
-    'CPaaS': ['Twilio', 'Vonage', 'Infobip'],
-    # AI Agents (Autonomous)
-    'AI Agents': ['Sierra', 'Ada', 'Crescendo', 'Decagon', 'Forethought', 'PolyAI', 'ASAPP'],
-    # Conversational AI Agent Builders
-    'Conversational AI': ['Kore.ai', 'Yellow.ai', 'Cognigy', 'Capacity', 'Replicant', 'Parloa'],
-    # Agent Assist & Workforce Intel
-    'Agent Assist': ['Cresta', 'Uniphore', 'Observe.AI', 'Gong', 'Assembled', 'Calabrio'],
-    # Knowledge Management Platforms
-    'Knowledge Management': ['Guru', 'Document360', 'eGain', 'Confluence', 'KMS Lighthouse', 'Shelf', 'Notion'],
-    # AI Infrastructure Providers
-    'AI Infrastructure': ['OpenAI', 'Gemini', 'LLaMA', 'AWS', 'Microsoft Azure', 'Google Cloud', 
-                          'Google Cloud Platform', 'Databricks', 'Snowflake']
-}
-
-# Strategic movement keywords
-STRATEGIC_MOVEMENT_KEYWORDS = [
-    'acquisition', 'acquired', 'merger', 'partnership', 'partners with', 'partnered',
-    'announces', 'launches', 'releases', 'unveils', 'introduces', 'rolls out',
-    'investment', 'funding', 'raises', 'strategic', 'alliance', 'strategic partnership',
-    'integration', 'collaboration', 'joint venture', 'teams up', 'joins forces'
-]
-
-# AI-related keywords
-AI_KEYWORDS = [
-    'ai', 'artificial intelligence', 'machine learning', 'llm', 'gpt', 'chatgpt',
-    'agentic', 'copilot', 'autonomous', 'generative ai', 'genai', 'neural',
-    'deep learning', 'natural language', 'nlp', 'conversational ai', 'voice ai',
-    'ai agent', 'ai chatbot', 'ai assistant', 'ai-powered', 'ai-driven'
-]
-
-
-def is_ai_cs_strategic_news(article):
-    """
-    Detecta si un artículo es relevante para AI en Customer Service:
-    1. Menciona vendors del ecosistema AI CS
-    2. Incluye keywords de movimientos estratégicos
-    3. Está relacionado con AI
-    """
-    title = safe_str(article.get('title', ''), '')
-    summary = safe_str(article.get('summary', ''), '')
-    hook = safe_str(article.get('hook', ''), '')
-    
-    # Combine all text for analysis
-    text = f"{title} {summary} {hook}".lower()
-    
-    # Check for ecosystem vendors (case-insensitive)
-    all_vendors = [v for vendors in AI_CS_ECOSYSTEM_VENDORS.values() for v in vendors]
-    mentions_vendor = any(vendor.lower() in text for vendor in all_vendors)
-    
-    # Check for strategic movement keywords
-    has_strategic_keyword = any(keyword.lower() in text for keyword in STRATEGIC_MOVEMENT_KEYWORDS)
-    
-    # Check for AI keywords
-    is_ai_related = any(keyword.lower() in text for keyword in AI_KEYWORDS)
-    
-    # Must be: (vendor OR strategic) AND AI-related
-    return (mentions_vendor or has_strategic_keyword) and is_ai_related
+# Vocabularies (AI_CS_ECOSYSTEM_VENDORS, STRATEGIC_MOVEMENT_KEYWORDS,
+# AI_KEYWORDS) and the matcher live in news_tags.py: rows are tagged once
+# when they are written (news_tags.ai_cs_tags), and filter_ai_cs_news reads
+# the ecosystem_vendors / strategic_move / ai_related columns instead of
+# rescanning the text.
 
 
 def filter_ai_cs_news(df, cx_ai_df=None):
@@ -968,49 +776,26 @@ def filter_ai_cs_news(df, cx_ai_df=None):
     - Si existe cx_ai_df (pipeline dedicado), usarlo directamente
     - Si no, filtrar df por keywords/vendors o is_ai_cs_relevant
     - Incluye todos los engagement levels (HIGH, MEDIUM, LOW)
-    - Deduplica por URL para evitar duplicados
+    - Las filas ya son una por artículo (merge_verticals), sin duplicados por URL
     """
     # Si tenemos el pipeline dedicado de CX AI, usarlo directamente
     if cx_ai_df is not None and not cx_ai_df.empty:
         # El pipeline ya filtra solo artículos relevantes, incluir todos los engagement levels
-        filtered = cx_ai_df  # No filtrar por engagement, incluir todos
-        # Deduplicar por URL (por si acaso)
-        if 'url' in filtered.columns:
-            filtered = filtered.drop_duplicates(subset='url', keep='first')
-        return filtered
+        return cx_ai_df  # No filtrar por engagement, incluir todos
     
     # Fallback: filtrar desde otros pipelines
     if df.empty:
         return df
     
-    # Si el CSV tiene la columna is_ai_cs_relevant, usarla primero
-    if 'is_ai_cs_relevant' in df.columns:
-        # Normalize is_ai_cs_relevant: handle string "True"/"False", boolean, or NaN
-        def normalize_is_ai_cs_relevant(value):
-            if pd.isna(value):
-                return False
-            if isinstance(value, bool):
-                return value
-            if isinstance(value, str):
-                return value.lower() in ("true", "1", "yes")
-            return bool(value)
-        
-        # Usar la columna si existe, pero también aplicar detección como fallback
-        ai_filtered = df[df.apply(lambda row: 
-            normalize_is_ai_cs_relevant(row.get('is_ai_cs_relevant', False)) or is_ai_cs_strategic_news(row.to_dict()), 
-            axis=1)]
-    else:
-        # Fallback: detección por keywords/vendors
-        # Convert Series to dict for is_ai_cs_strategic_news function
-        ai_filtered = df[df.apply(lambda row: is_ai_cs_strategic_news(row.to_dict()), axis=1)]
+    # Columnas tipadas (bool) y tags guardados al escribir la fila:
+    # is_ai_cs_relevant OR ((vendor OR strategic) AND AI)
+    vendor = df['ecosystem_vendors'].fillna('') != ''
+    strategic = vendor | df['strategic_move']
+    ai_filtered = df[df['is_ai_cs_relevant'] | (strategic & df['ai_related'])]
     
     # Incluir todos los engagement levels (HIGH, MEDIUM, LOW)
     # No filtrar por engagement aquí, mostrar todos
     
-    # CRITICAL: Deduplicar por URL para evitar duplicados del mismo artículo en CCaaS y ES
-    if 'url' in ai_filtered.columns:
-        ai_filtered = ai_filtered.drop_duplicates(subset='url', keep='first')
-    
     return ai_filtered
 
 
@@ -1021,10 +806,19 @@ def engagement_badge(engagement):
         return '<span class="engagement-high">HIGH</span>'
     elif engagement == "MEDIUM":
         return '<span class="engagement-medium">MEDIUM</span>'
+    elif engagement == "PENDING":
+        # Pipeline hit its LLM deadline before analyzing this article
+        return '<span class="engagement-pending">PENDING</span>'
     else:
         return '<span class="engagement-low">LOW</span>'
 
 
+def highlight_html(text):
+    """Escape a search-highlighted field and turn its match markers into <mark> tags."""
+    escaped = text.strip().replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    return escaped.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+
+
 def render_news_card(article, card_id):
     """Render a single news article card with Slack post button."""
     engagement_html = engagement_badge(article.get('engagement', 'LOW'))
@@ -1036,37 +830,48 @@ def render_news_card(article, card_id):
     source = safe_str(article.get('source', 'Unknown'), 'Unknown')
     published = article.get('published', '')
     category = safe_str(article.get('category', ''), '')
+    # Every vertical that captured the article (search results: just one)
+    categories = article.get('categories') or ((category,) if category else ())
+    engagements = article.get('engagements') or {}
     
     # If summary is empty, provide a helpful message
     # Only show this if it's a valid article (has a proper title and URL)
     if not summary or summary.strip() == '':
         # Check if this looks like a valid article (not a category page)
         if title and len(title) > 20 and url and url != '#' and '/category/' not in url.lower():
-            summary = f"Summary not available. Click 'Read Article →' to view the full article from {source}."
+            if str(article.get('engagement', '')).upper() == 'PENDING':
+                summary = f"Analysis pending (the pipeline ran out of time before analyzing this article). Click 'Read Article →' to view it on {source}."
+            else:
+                summary = f"Summary not available. Click 'Read Article →' to view the full article from {source}."
         else:
             # This looks like a category page or invalid article, skip rendering
             return
     
-    # Format published date
+    # Format published date (UTC datetime, None / NaT if unknown)
     pub_display = ''
-    if published and pd.notna(published) and published != '':
-        try:
-            if 'T' in str(published):
-                dt = datetime.datetime.fromisoformat(str(published).replace('Z', '+00:00'))
-                pub_display = dt.strftime('%b %d, %Y at %I:%M %p')
-            else:
-                pub_display = str(published)
-        except:
-            pub_display = str(published)
+    if isinstance(published, datetime.datetime) and pd.notna(published):
+        pub_display = published.strftime('%b %d, %Y at %I:%M %p')
     
-    # Category badge
-    category_class = "category-ccaas" if category == "CCaaS" else "category-es"
+    # Category badges, with each vertical's engagement on hover
+    category_badges = ''
+    for c in categories:
+        category_class = "category-ccaas" if c == "CCaaS" else "category-es"
+        tooltip = f' title="{c}: {engagements[c]}"' if c in engagements else ''
+        category_badges += f'<span class="category-badge {category_class}"{tooltip}>{c}</span>'
     
     # Escape HTML in title and summary for display
     title_escaped = title.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
     summary_escaped = summary.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
     hook_escaped = hook.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;') if hook else ''
     
+    # Search results: show the matched words highlighted
+    if article.get('title_hl'):
+        title_escaped = highlight_html(article['title_hl'])
+    if article.get('summary_hl') and safe_str(article.get('summary', ''), ''):
+        summary_escaped = highlight_html(article['summary_hl'])
+    if hook and article.get('hook_hl'):
+        hook_escaped = highlight_html(article['hook_hl'])
+    
     # Render card with HTML
     card_html = f"""
     <div class="news-card" id="card-{card_id}">
@@ -1075,7 +880,7 @@ def render_news_card(article, card_id):
                 <div class="news-title">{title_escaped}</div>
             </div>
             <div style="display: flex; gap: 0.75rem; align-items: center; flex-wrap: wrap;">
-                <span class="category-badge {category_class}">{category}</span>
+                {category_badges}
                 <div>{engagement_html}</div>
             </div>
         </div>
@@ -1098,13 +903,64 @@ def sort_by_engagement(df):
     if df is None or df.empty:
         return df
     
-    engagement_order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
-    df['engagement_order'] = df['engagement'].map(engagement_order).fillna(2)
+    engagement_order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2, 'PENDING': 3}
+    # assign() copies, so the cached period view is never modified
+    df = df.assign(engagement_order=df['engagement'].astype(str).map(engagement_order).fillna(2))
     df = df.sort_values('engagement_order').drop('engagement_order', axis=1)
     return df
 
 
+def render_search_results(search_text, engagement_filter):
+    """Ranked full-text search results with vertical / scrape-date filters."""
+    dates = get_available_dates()
+    col1, col2 = st.columns(2)
+    with col1:
+        verticals = st.multiselect(
+            "Vertical",
+            options=list(VERTICALS),
+            default=list(VERTICALS),
+            format_func=lambda v: VERTICALS[v]
+        )
+    with col2:
+        date_range = ()
+        if dates:
+            first = datetime.date.fromisoformat(dates[-1])
+            last = datetime.date.fromisoformat(dates[0])
+            date_range = st.date_input("Scraped between", value=(first, last), min_value=first, max_value=last)
+    
+    # The range picker returns a single date while the second one is being picked
+    date_from = date_to = None
+    if isinstance(date_range, (tuple, list)) and len(date_range) == 2:
+        date_from, date_to = (d.isoformat() for d in date_range)
+    
+    started = time.perf_counter()
+    try:
+        conn = connect()
+        rows = search_rows(conn, search_text, verticals=verticals or None,
+                           engagements=engagement_filter or None,
+                           date_from=date_from, date_to=date_to)
+        conn.close()
+    except Exception as e:
+        st.warning(f"Error searching the news store: {e}")
+        rows = []
+    elapsed = (time.perf_counter() - started) * 1000
+    
+    if not rows:
+        st.info("No articles match this search. Try fewer words, or widen the filters.")
+        return
+    
+    st.markdown(f"### {len(rows)} results")
+    st.markdown(f"<div style='font-size: 0.875rem; color: #6b7280; margin-bottom: 1rem;'>Best matches first, across all collected news ({elapsed:.0f} ms)</div>", unsafe_allow_html=True)
+    st.markdown("---")
+    for i, row in enumerate(rows):
+        row['category'] = VERTICALS.get(row.pop('vertical'), '')
+        render_news_card(row, f"search-{i}")
+
+
 def main():
+    # Pick up daily CSVs the store has not seen yet
+    sync_store()
+    
     # Sidebar for date selection - MUST be first
     with st.sidebar:
         # Compact header with total count
@@ -1116,6 +972,16 @@ def main():
         </div>
         """, unsafe_allow_html=True)
         
+        # Full-text search over titles, summaries and hooks
+        st.markdown("""
+        <div style='font-size: 0.75rem; color: #6b7280; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.5rem; margin-top: 0.5rem;'>Search</div>
+        """, unsafe_allow_html=True)
+        search_text = st.text_input(
+            "Search news:",
+            placeholder='Vendor, product or "exact phrase"',
+            label_visibility="collapsed"
+        )
+        
         # Time period selection
         st.markdown("""
         <div style='font-size: 0.75rem; color: #6b7280; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.5rem; margin-top: 0.5rem;'>Time Period</div>
@@ -1156,7 +1022,7 @@ def main():
                 )
             else:
                 selected_date = datetime.date.today().isoformat()
-                st.warning("No CSV files found.")
+                st.warning("No news data found.")
         else:
             selected_date = None  # Not used for period-based loading
         
@@ -1167,6 +1033,7 @@ def main():
         show_high = st.checkbox("High Relevance", value=True)
         show_medium = st.checkbox("Medium Relevance", value=True)
         show_low = st.checkbox("Low Relevance", value=True)
+        show_pending = st.checkbox("Pending Analysis", value=True)
         
         # Compact data updates info
         st.markdown("""
@@ -1192,6 +1059,22 @@ def main():
     st.markdown('<div class="main-header">News Radar</div>', unsafe_allow_html=True)
     st.markdown('<div class="sub-header">Your morning briefing for CCaaS & Employee Service news</div>', unsafe_allow_html=True)
     
+    # Engagement levels to show (sidebar relevance filters)
+    engagement_filter = []
+    if show_high:
+        engagement_filter.append('HIGH')
+    if show_medium:
+        engagement_filter.append('MEDIUM')
+    if show_low:
+        engagement_filter.append('LOW')
+    if show_pending:
+        engagement_filter.append('PENDING')
+    
+    # A search replaces the period view
+    if search_text.strip():
+        render_search_results(search_text, engagement_filter)
+        return
+    
     # Update info text based on time period
     period_text = {
         'last_24h': 'Compilation of relevant news from the last 24 hours',
@@ -1201,20 +1084,19 @@ def main():
     }
     st.markdown(f'<div class="info-text">{period_text[time_period]}</div>', unsafe_allow_html=True)
     
-    # Load data based on time period
+    # Load data based on time period: one row per article, labelled with
+    # every vertical that captured it (categories / engagements)
     if time_period == 'last_24h':
-        ccaas_df, es_df, cx_ai_df = load_news_data(selected_date)
+        articles_df = load_news_data(selected_date)
     else:
-        ccaas_df, es_df, cx_ai_df = load_news_data_by_period(time_period)
+        articles_df = load_news_data_by_period(time_period)
     
-    # Combine dataframes (excluding cx_ai_df - it's handled separately for CX AI tab)
-    all_news = []
-    if ccaas_df is not None and isinstance(ccaas_df, pd.DataFrame) and not ccaas_df.empty:
-        all_news.append(ccaas_df)
-    if es_df is not None and isinstance(es_df, pd.DataFrame) and not es_df.empty:
-        all_news.append(es_df)
+    # All News: CCaaS and ES articles, each once (CX AI has its own tab)
+    all_news_df = articles_df
+    if not all_news_df.empty:
+        all_news_df = all_news_df[all_news_df['categories'].map(lambda c: 'CCaaS' in c or 'ES' in c)]
     
-    if not all_news:
+    if all_news_df.empty:
         if time_period == 'last_24h' and selected_date:
             st.error(f"❌ No news data found for {datetime.datetime.strptime(selected_date, '%Y-%m-%d').strftime('%B %d, %Y')}")
         else:
@@ -1224,42 +1106,30 @@ def main():
                 'all_time': 'all time'
             }
             st.error(f"❌ No news data found for {period_display.get(time_period, 'the selected period')}")
-        st.info("💡 Make sure you've run the news pipelines to generate CSV files.")
+        st.info("💡 Make sure you've run the news pipelines to generate news data.")
         return
     
-    combined_df = pd.concat(all_news, ignore_index=True)
-    
-    # Apply engagement filters
-    engagement_filter = []
-    if show_high:
-        engagement_filter.append('HIGH')
-    if show_medium:
-        engagement_filter.append('MEDIUM')
-    if show_low:
-        engagement_filter.append('LOW')
-    
+    # Apply engagement filters (the article's best CCaaS / ES analysis)
     if engagement_filter:
-        combined_df = combined_df[combined_df['engagement'].isin(engagement_filter)]
+        all_news_df = all_news_df[all_news_df['engagement'].isin(engagement_filter)]
     
     # Sort by engagement
-    combined_df = sort_by_engagement(combined_df)
+    all_news_df = sort_by_engagement(all_news_df)
     
     # Calculate filtered DataFrames for each tab (before tabs are created)
-    # All News tab uses combined_df as-is
-    all_news_df = combined_df.copy()
-    
     # CX AI tab
-    ai_cs_filtered = filter_ai_cs_news(combined_df, cx_ai_df)
+    ai_cs_filtered = filter_ai_cs_news(all_news_df, analysis_for(articles_df, 'CX AI'))
     if not ai_cs_filtered.empty:
         ai_cs_filtered = sort_by_engagement(ai_cs_filtered)
     
-    # CCaaS tab
-    ccaas_filtered = combined_df[combined_df['category'] == 'CCaaS'] if 'category' in combined_df.columns else pd.DataFrame()
+    # CCaaS / ES tabs: that vertical's own analysis
+    ccaas_filtered = analysis_for(articles_df, 'CCaaS')
+    es_filtered = analysis_for(articles_df, 'ES')
+    if engagement_filter:
+        ccaas_filtered = ccaas_filtered[ccaas_filtered['engagement'].isin(engagement_filter)]
+        es_filtered = es_filtered[es_filtered['engagement'].isin(engagement_filter)]
     if not ccaas_filtered.empty:
         ccaas_filtered = sort_by_engagement(ccaas_filtered)
-    
-    # ES tab
-    es_filtered = combined_df[combined_df['category'] == 'ES'] if 'category' in combined_df.columns else pd.DataFrame()
     if not es_filtered.empty:
         es_filtered = sort_by_engagement(es_filtered)
     
@@ -0,0 +1,237 @@
+import calendar
+import datetime
+import re
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+# ============================
+# FAST DATE PARSING
+# ============================
+
+# "Thu, 22 Jan 2026 14:05:00 +0000" (RSS pubDate, HTTP headers)
+_RFC822_RE = re.compile(r"^(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{4}\s+\d{1,2}:\d{2}")
+# "2026-01-22 14:05", "2026-01-22T14:05:00.123+00:00", "2026-01-22T14:05:00Z"
+_ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?\s*(?:Z|[+-]\d{2}:?\d{2})?)?$")
+_FRACTION_RE = re.compile(r"([.,]\d{6})\d+")
+
+# Formats seen on the sources we scrape, tried with strptime
+# (prefix regex -> formats), e.g. "January 22, 2026", "22 Jan 2026", "01/22/2026"
+_SITE_FORMATS = [
+    (re.compile(r"^[A-Za-z]{3,9}\.? \d{1,2}, \d{4}$"), ("%B %d, %Y", "%b %d, %Y", "%b. %d, %Y")),
+    (re.compile(r"^[A-Za-z]{3,9}\.? \d{1,2}, \d{4},? \d{1,2}:\d{2} ?[APap][Mm]$"),
+     ("%B %d, %Y %I:%M %p", "%b %d, %Y %I:%M %p", "%B %d, %Y, %I:%M %p", "%b %d, %Y, %I:%M %p",
+      "%B %d, %Y %I:%M%p", "%b %d, %Y %I:%M%p")),
+    (re.compile(r"^\d{1,2} [A-Za-z]{3,9} \d{4}$"), ("%d %B %Y", "%d %b %Y")),
+    (re.compile(r"^\d{1,2}/\d{1,2}/\d{4}$"), ("%m/%d/%Y",)),
+    (re.compile(r"^\d{4}/\d{2}/\d{2}$"), ("%Y/%m/%d",)),
+]
+
+
+def _fast_parse(text):
+    if _ISO_RE.match(text):
+        iso = text.replace(",", ".")
+        iso = _FRACTION_RE.sub(r"\1", iso)  # fromisoformat wants <= 6 fraction digits
+        try:
+            return datetime.datetime.fromisoformat(iso)
+        except ValueError:
+            pass
+
+    if _RFC822_RE.match(text):
+        try:
+            return parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            pass
+
+    for pattern, formats in _SITE_FORMATS:
+        if pattern.match(text):
+            for fmt in formats:
+                try:
+                    return datetime.datetime.strptime(text, fmt)
+                except ValueError:
+                    continue
+            break
+    return None
+
+
+@lru_cache(maxsize=20000)
+def _parse_date_text(text):
+    dt = _fast_parse(text)
+    if dt is not None:
+        return dt
+    # Leftovers ("Updated 3 days ago, Jan 22", odd separators...): slow path.
+    # dateutil is imported only the first time it is needed (cold start)
+    from dateutil import parser as dateparser
+    try:
+        return dateparser.parse(text)
+    except (ValueError, OverflowError, TypeError):
+        return None
+
+
+def parse_date(value):
+    """
+    Parse a date string from a feed, meta tag, JSON-LD or CSV cell.
+    ISO-8601/RFC-3339, RFC-822 and the formats our sources use are parsed
+    with compiled fast paths; dateutil only sees the leftovers. Results
+    are memoized per string. Returns datetime (naive if the text had no
+    offset) or None, never raises.
+    """
+    if isinstance(value, datetime.datetime):
+        return value
+    if not isinstance(value, str):
+        return None
+    text = value.strip()
+    if not text:
+        return None
+    return _parse_date_text(text)
+
+
+# ============================
+# EARLY DATE CHECKS
+# ============================
+
+# Meta tags are only looked for in the first part of the document (<head>);
+# JSON-LD and <time> can sit anywhere in the (already size-capped) page
+HEAD_SCAN_CHARS = 64 * 1024
+
+# /2026/01/23/ , /2026-01-23- , /20260123/ style dates in article paths
+_URL_DAY_RE = re.compile(r"/(20\d{2})[/-](0[1-9]|1[0-2])[/-](0[1-9]|[12]\d|3[01])(?=[/-]|$)")
+_URL_COMPACT_DAY_RE = re.compile(r"/(20\d{2})(0[1-9]|1[0-2])(0[1-9]|[12]\d|3[01])(?=/)")
+# /2026/01/ (month only, e.g. WordPress "/%year%/%monthnum%/%postname%/")
+_URL_MONTH_RE = re.compile(r"/(20\d{2})/(0[1-9]|1[0-2])/")
+
+
+def _meta_date_re(names):
+    # <meta property|name|itemprop="NAME" content="...">, either attribute order
+    names = "|".join(re.escape(n) for n in names)
+    return re.compile(
+        rf"""<meta\s[^>]*?(?:(?:property|name|itemprop)\s*=\s*["'](?:{names})["'][^>]*?content\s*=\s*["']([^"']+)["']"""
+        rf"""|content\s*=\s*["']([^"']+)["'][^>]*?(?:property|name|itemprop)\s*=\s*["'](?:{names})["'])""",
+        re.IGNORECASE,
+    )
+
+
+def _jsonld_date_re(key):
+    return re.compile(rf'"{key}"\s*:\s*"([^"]+)"')
+
+
+# (where to look, pattern), most specific first. Publication dates beat
+# <time> (which may belong to a sidebar or comment), which beats
+# modified / generic dates.
+_DATE_SCANS = [
+    ("page", _jsonld_date_re("datePublished")),
+    ("head", _meta_date_re(["article:published_time", "datePublished", "pubdate", "publish-date"])),
+    ("page", re.compile(r"""<time\s[^>]*?datetime\s*=\s*["']([^"']+)["']""", re.IGNORECASE)),
+    ("page", _jsonld_date_re("dateModified")),
+    ("page", _jsonld_date_re("uploadDate")),
+    ("head", _meta_date_re(["og:updated_time", "date"])),
+]
+
+
+def latest_date_from_url(url):
+    """
+    Latest publication time the URL path allows, or None.
+    /2026/01/23/slug -> end of Jan 23; /2026/01/slug -> end of January.
+    Only meant for rejecting clearly stale links before fetching them.
+    """
+    match = _URL_DAY_RE.search(url) or _URL_COMPACT_DAY_RE.search(url)
+    try:
+        if match:
+            year, month, day = (int(g) for g in match.groups())
+            day_start = datetime.datetime(year, month, day, tzinfo=datetime.timezone.utc)
+            return day_start + datetime.timedelta(days=1)
+
+        match = _URL_MONTH_RE.search(url)
+        if match:
+            year, month = (int(g) for g in match.groups())
+            last_day = calendar.monthrange(year, month)[1]
+            return datetime.datetime(year, month, last_day, tzinfo=datetime.timezone.utc) + datetime.timedelta(days=1)
+    except ValueError:
+        return None
+    return None
+
+
+def scan_html_for_date(html_text):
+    """
+    Regex scan of the raw HTML for the publication date, without building
+    a DOM: JSON-LD "datePublished", article:published_time / datePublished
+    meta tags, <time datetime="...">, then modified / generic dates.
+    Returns datetime or None (callers fall back to the BeautifulSoup walk).
+    """
+    if not html_text:
+        return None
+    head = html_text[:HEAD_SCAN_CHARS]
+    end = head.find("</head>")
+    if end == -1:
+        end = head.find("</HEAD>")
+    if end != -1:
+        head = head[:end]
+
+    for where, pattern in _DATE_SCANS:
+        text = head if where == "head" else html_text
+        for match in pattern.finditer(text):
+            dt = parse_date(next(g for g in match.groups() if g))
+            if dt is not None:
+                return dt
+    return None
+
+
+def is_too_old(published_dt, max_age_hours, now=None):
+    """True if a (possibly naive) datetime is older than max_age_hours. Undated -> False."""
+    if published_dt is None or max_age_hours is None:
+        return False
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+    if published_dt.tzinfo is None:
+        published_dt = published_dt.replace(tzinfo=datetime.timezone.utc)
+    age_hours = (now - published_dt).total_seconds() / 3600
+    return age_hours > max_age_hours
+
+
+# ============================
+# MICRO-BENCHMARK
+# ============================
+
+# Date strings as they appear in our feeds, pages and CSVs
+DATE_SAMPLES = [
+    "2026-01-22T14:05:00+00:00",
+    "2026-01-22T14:05:00Z",
+    "2026-01-22T14:05:00.123456789-05:00",
+    "2026-01-22 14:05:00",
+    "2026-01-22",
+    "Thu, 22 Jan 2026 14:05:00 +0000",
+    "Thu, 22 Jan 2026 14:05:00 GMT",
+    "January 22, 2026",
+    "Jan 22, 2026",
+    "Jan 22, 2026 2:05 PM",
+    "22 January 2026",
+    "01/22/2026",
+    "2026/01/22",
+    "Thursday, January 22nd 2026",
+]
+
+
+if __name__ == "__main__":
+    # python news_dates.py -> fast path vs dateutil on DATE_SAMPLES
+    import timeit
+    from dateutil import parser as dateparser
+
+    mismatches = 0
+    for sample in DATE_SAMPLES:
+        fast, slow = parse_date(sample), dateparser.parse(sample)
+        if fast != slow:
+            mismatches += 1
+            print(f"❌ {sample!r}: parse_date={fast} dateutil={slow}")
+
+    rounds = 2000
+    dateutil_s = timeit.timeit(lambda: [dateparser.parse(s) for s in DATE_SAMPLES], number=rounds)
+    cold_s = timeit.timeit(
+        lambda: (_parse_date_text.cache_clear(), [parse_date(s) for s in DATE_SAMPLES]), number=rounds
+    )
+    warm_s = timeit.timeit(lambda: [parse_date(s) for s in DATE_SAMPLES], number=rounds)
+
+    per_call = 1e6 / (rounds * len(DATE_SAMPLES))
+    print(f"dateutil.parse:        {dateutil_s * per_call:7.2f} µs/date")
+    print(f"parse_date (uncached): {cold_s * per_call:7.2f} µs/date ({dateutil_s / cold_s:.1f}x)")
+    print(f"parse_date (memoized): {warm_s * per_call:7.2f} µs/date ({dateutil_s / warm_s:.1f}x)")
+    print(f"{len(DATE_SAMPLES) - mismatches}/{len(DATE_SAMPLES)} samples agree with dateutil")
+    raise SystemExit(1 if mismatches else 0)
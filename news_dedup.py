@@ -0,0 +1,247 @@
+import datetime
+import hashlib
+import os
+import random
+import re
+
+from news_archive import daily_rows
+from news_urls import canonical_url
+
+# ============================
+# NEAR-DUPLICATE CONFIG
+# ============================
+
+# MinHash signature length = BANDS * ROWS_PER_BAND.
+# 16 bands x 4 rows puts the LSH "S-curve" midpoint around Jaccard ~0.5.
+BANDS = 16
+ROWS_PER_BAND = 4
+NUM_PERM = BANDS * ROWS_PER_BAND
+
+# Estimated Jaccard similarity needed to call two articles the same story
+RUN_THRESHOLD = 0.5      # title + snippet, within one run
+HISTORY_THRESHOLD = 0.6  # title only, against previous days (story_id only)
+
+# How many days of previous CSVs to compare against
+HISTORY_DAYS = int(os.getenv("DEDUP_HISTORY_DAYS", "14"))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures are comparable between runs
+_rng = random.Random(1337)
+_PERMUTATIONS = [
+    (_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1))
+    for _ in range(NUM_PERM)
+]
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+# ============================
+# SHINGLES + MINHASH
+# ============================
+
+def shingles(text, k=3):
+    """Set of k-word shingles from lowercased text."""
+    words = _WORD_RE.findall(str(text).lower())
+    if not words:
+        return set()
+    if len(words) <= k:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def _stable_hash(value):
+    # Python's hash() is salted per process; we need hashes that are
+    # stable across runs so history lookups keep working
+    return int.from_bytes(
+        hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+def minhash(shingle_set):
+    """MinHash signature (tuple of NUM_PERM ints) for a set of shingles."""
+    if not shingle_set:
+        return None
+    hashes = [_stable_hash(s) for s in shingle_set]
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimated_jaccard(sig_a, sig_b):
+    """Fraction of matching MinHash slots ~= Jaccard similarity."""
+    same = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+    return same / NUM_PERM
+
+
+def story_id_for_url(url):
+    """Default story id for an article that starts its own story."""
+    key = canonical_url(str(url))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=6).hexdigest()
+
+
+# ============================
+# LSH INDEX
+# ============================
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH banding index. Lookups only compare against items
+    sharing at least one band bucket, so they stay sub-linear in the
+    number of indexed articles.
+    """
+
+    def __init__(self, threshold=RUN_THRESHOLD):
+        self.threshold = threshold
+        self.signatures = {}
+        self.buckets = [{} for _ in range(BANDS)]
+
+    def _band_keys(self, signature):
+        for band in range(BANDS):
+            start = band * ROWS_PER_BAND
+            yield band, signature[start:start + ROWS_PER_BAND]
+
+    def add(self, key, signature):
+        if signature is None:
+            return
+        self.signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self.buckets[band].setdefault(band_key, []).append(key)
+
+    def query(self, signature):
+        """Return the most similar indexed key above threshold, or None."""
+        if signature is None:
+            return None
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self.buckets[band].get(band_key, ()))
+
+        best_key, best_sim = None, self.threshold
+        for key in candidates:
+            sim = estimated_jaccard(signature, self.signatures[key])
+            if sim >= best_sim:
+                best_key, best_sim = key, sim
+        return best_key
+
+
+# ============================
+# HISTORY
+# ============================
+
+def load_history(file_prefix, days=HISTORY_DAYS, exclude_date=None):
+    """
+    Build a title index over previous daily CSVs and archives (e.g. "ccaas_news").
+    Returns (index, rows_by_story_id, rows_by_url). The title index only
+    links follow-up coverage to the earlier story_id; a stored analysis is
+    reused only for the same canonical URL (rows_by_url, the most recent
+    usable analysis), since a follow-up ("X completes acquisition of Y")
+    needs its own summary. Rows of exclude_date (today: an earlier run of
+    the same day) are left out of the title index but still go into
+    rows_by_url, so a rerun does not analyze the same URLs again.
+    """
+    index = NearDuplicateIndex(threshold=HISTORY_THRESHOLD)
+    rows_by_story = {}
+    rows_by_url = {}
+
+    today = datetime.date.today()
+    cutoff = today - datetime.timedelta(days=days)
+
+    for date_str, row in daily_rows(file_prefix, since=cutoff):
+        if not row.get("title"):
+            continue
+        if _history_analysis(row):
+            rows_by_url[canonical_url(row.get("url", ""))] = row
+        if date_str == exclude_date:
+            continue
+        story_id = row.get("story_id") or story_id_for_url(row.get("url", ""))
+        if story_id in rows_by_story:
+            continue
+        rows_by_story[story_id] = row
+        index.add(story_id, minhash(shingles(row["title"], k=2)))
+
+    return index, rows_by_story, rows_by_url
+
+
+def _history_analysis(row):
+    """Turn a stored CSV row back into an LLM-style result (or None)."""
+    summary = (row.get("summary") or "").strip()
+    engagement = (row.get("engagement") or "").upper()
+    if not summary or engagement not in {"HIGH", "MEDIUM", "LOW"}:
+        # Failed or PENDING analysis: better to analyze again
+        return None
+    return {
+        "summary": summary,
+        "engagement": engagement,
+        "hook": (row.get("hook") or "").strip(),
+        "is_ai_cs_relevant": row["is_ai_cs_relevant"],
+    }
+
+
+# ============================
+# GROUPING
+# ============================
+
+def group_near_duplicates(articles, file_prefix=None):
+    """
+    Assign a story_id to every Article (in place) and mark copies:
+      - duplicate_of: url of the representative analyzed this run
+      - history_analysis: analysis of the same URL from a previous
+        day or an earlier run today (copies of such a representative get it too)
+    Articles should already be in priority order, so the first copy seen
+    (the most promising one) becomes the representative.
+    Returns the number of articles that should NOT need an LLM call; the
+    pipelines count the reuses that actually happen.
+    """
+    # Keyed by the representative's canonical URL: two representatives can
+    # share a story_id (both follow-ups of the same earlier story)
+    run_index = NearDuplicateIndex(threshold=RUN_THRESHOLD)
+    representatives = {}
+
+    history_index, history_by_url = None, {}
+    if file_prefix:
+        history_index, _, history_by_url = load_history(
+            file_prefix, exclude_date=datetime.date.today().isoformat()
+        )
+
+    skipped = 0
+
+    for art in articles:
+        text = f"{art.title} {art.snippet}"
+        signature = minhash(shingles(text, k=3))
+
+        # 1) Syndicated copy of a story already seen in this run
+        match = run_index.query(signature)
+        if match is not None:
+            representative = representatives[match]
+            art.story_id = representative.story_id
+            art.duplicate_of = representative.url
+            art.history_analysis = representative.history_analysis
+            skipped += 1
+            continue
+
+        key = canonical_url(art.url)
+
+        # 2) Same URL analyzed on a previous day or an earlier run today: reuse that analysis
+        story_id = None
+        history_row = history_by_url.get(key)
+        if history_row is not None:
+            art.history_analysis = _history_analysis(history_row)
+            story_id = history_row.get("story_id") or None
+            skipped += 1
+
+        # 3) Follow-up / re-post of a story from a previous day: same story_id
+        if story_id is None and history_index is not None:
+            title_sig = minhash(shingles(art.title, k=2))
+            story_id = history_index.query(title_sig)
+
+        # 4) New story
+        if story_id is None:
+            story_id = story_id_for_url(art.url)
+
+        art.story_id = story_id
+        representatives[key] = art
+        run_index.add(key, signature)
+
+    return skipped
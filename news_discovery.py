@@ -0,0 +1,195 @@
+import html
+import re
+import xml.etree.ElementTree as ET
+
+
+from news_urls import canonical_url
+from news_dates import is_too_old, parse_date
+from news_fetch import fetch_bytes, FEED_MAX_BYTES
+
+# ============================
+# FEED / SITEMAP DISCOVERY
+# ============================
+
+# XML namespaces used by RSS extensions, Atom and (news) sitemaps
+NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "content": "http://purl.org/rss/1.0/modules/content/",
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "sm": "http://www.sitemaps.org/schemas/sitemap/0.9",
+    "news": "http://www.google.com/schemas/sitemap-news/0.9",
+}
+
+# Child sitemaps to follow from a sitemap index (newest first)
+MAX_CHILD_SITEMAPS = 3
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+# WordPress appends "The post <title> appeared first on <site>." to descriptions
+_WP_FOOTER_RE = re.compile(r"The post .{0,300}? appeared first on .{0,100}?\.?$")
+
+
+def _text(el, path):
+    if el is None:
+        return ""
+    found = el.find(path, NS)
+    if found is None or found.text is None:
+        return ""
+    return found.text.strip()
+
+
+def _clean_html(text):
+    """Strip tags / entities from a feed description."""
+    text = html.unescape(_TAG_RE.sub(" ", text or ""))
+    text = _WS_RE.sub(" ", text).strip()
+    return _WP_FOOTER_RE.sub("", text).strip()
+
+
+def _entry(url, title="", published_dt=None, snippet=""):
+    return {
+        "url": url.strip(),
+        "title": _clean_html(title),
+        "published_dt": published_dt,
+        "snippet": snippet,
+    }
+
+
+def parse_rss(root):
+    entries = []
+    for item in root.iter("item"):
+        link = _text(item, "link") or _text(item, "guid")
+        if not link.startswith("http"):
+            continue
+        description = _clean_html(_text(item, "description"))
+        if len(description) < 100:
+            # Some feeds only put the full body in content:encoded
+            description = _clean_html(_text(item, "content:encoded")) or description
+        published = _text(item, "pubDate") or _text(item, "dc:date")
+        entries.append(_entry(link, _text(item, "title"), parse_date(published), description))
+    return entries
+
+
+def parse_atom(root):
+    entries = []
+    for item in root.findall("atom:entry", NS):
+        link = ""
+        for link_el in item.findall("atom:link", NS):
+            if link_el.get("rel", "alternate") == "alternate" and link_el.get("href"):
+                link = link_el.get("href")
+                break
+        if not link.startswith("http"):
+            continue
+        summary = _clean_html(_text(item, "atom:summary") or _text(item, "atom:content"))
+        published = _text(item, "atom:published") or _text(item, "atom:updated")
+        entries.append(_entry(link, _text(item, "atom:title"), parse_date(published), summary))
+    return entries
+
+
+def parse_sitemap(root):
+    entries = []
+    for url_el in root.findall("sm:url", NS):
+        loc = _text(url_el, "sm:loc")
+        if not loc.startswith("http"):
+            continue
+        news = url_el.find("news:news", NS)
+        published = _text(news, "news:publication_date") or _text(url_el, "sm:lastmod")
+        entries.append(_entry(loc, _text(news, "news:title"), parse_date(published)))
+    return entries
+
+
+def fetch_xml(feed_url, headers=None, timeout=10, deadline=None):
+    # Whole document is needed to parse it: oversized feeds are rejected
+    # (FetchTooLarge) rather than truncated
+    raw, _ = fetch_bytes(
+        feed_url, headers=headers, timeout=timeout,
+        max_bytes=FEED_MAX_BYTES, deadline=deadline,
+    )
+    return ET.fromstring(raw)
+
+
+def fetch_feed_entries(feed_url, headers=None, timeout=10, max_age_hours=None,
+                       deadline=None, _depth=0):
+    """
+    Fetch one RSS / Atom feed or (news) sitemap and return entry dicts:
+    {"url", "title", "published_dt", "snippet"} (title/date/snippet may be empty).
+    Sitemap indexes are followed for their newest children only.
+    """
+    root = fetch_xml(feed_url, headers=headers, timeout=timeout, deadline=deadline)
+    tag = root.tag.split("}")[-1].lower()
+
+    if tag == "rss":
+        return parse_rss(root)
+    if tag == "feed":
+        return parse_atom(root)
+    if tag == "urlset":
+        return parse_sitemap(root)
+    if tag == "sitemapindex" and _depth == 0:
+        children = []
+        for sm in root.findall("sm:sitemap", NS):
+            loc = _text(sm, "sm:loc")
+            lastmod = parse_date(_text(sm, "sm:lastmod"))
+            if loc and not is_too_old(lastmod, max_age_hours):
+                children.append((lastmod, loc))
+        # Newest first; undated children last
+        children.sort(key=lambda c: c[0].timestamp() if c[0] else float("-inf"), reverse=True)
+        entries = []
+        for _, loc in children[:MAX_CHILD_SITEMAPS]:
+            try:
+                entries.extend(fetch_feed_entries(loc, headers, timeout, max_age_hours, deadline, _depth + 1))
+            except Exception as e:
+                print(f"   ⚠️ Could not read child sitemap {loc}: {type(e).__name__}")
+        return entries
+
+    print(f"   ⚠️ Unknown feed format <{tag}> at {feed_url}")
+    return []
+
+
+def discover_from_feeds(source_name, feed_urls, max_age_hours, headers=None, timeout=10,
+                        deadline=None):
+    """
+    Discover recent articles for a source from its feeds / sitemaps.
+    Entries older than max_age_hours are dropped here, before any article
+    fetch. Returns None when the source has no feed or every feed failed, so
+    the caller can fall back to HTML link scraping ([] means "feed worked,
+    nothing recent"). Every fetch is capped at FEED_MAX_BYTES and bounded
+    by `deadline` (news_fetch.Deadline) when given.
+    """
+    if not feed_urls:
+        return None
+    if isinstance(feed_urls, str):
+        feed_urls = [feed_urls]
+
+    entries = []
+    seen_keys = set()
+    stale = 0
+    feed_ok = False
+
+    for feed_url in feed_urls:
+        if deadline is not None and deadline.expired():
+            break
+        try:
+            feed_entries = fetch_feed_entries(
+                feed_url, headers=headers, timeout=timeout,
+                max_age_hours=max_age_hours, deadline=deadline,
+            )
+        except Exception as e:
+            print(f"   ⚠️ Feed unavailable for {source_name} ({feed_url}): {type(e).__name__}")
+            continue
+        if not feed_entries:
+            continue
+        feed_ok = True
+
+        for entry in feed_entries:
+            key = canonical_url(entry["url"])
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+            if is_too_old(entry["published_dt"], max_age_hours):
+                stale += 1
+                continue
+            entries.append(entry)
+
+    if not feed_ok:
+        return None
+    print(f"   📡 {source_name}: {len(entries)} recent feed entries ({stale} older than {max_age_hours}h skipped)")
+    return entries
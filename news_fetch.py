@@ -0,0 +1,427 @@
+import os
+import re
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import get_encoding_from_headers
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# ============================
+# FETCH LIMITS
+# ============================
+
+# Stop reading an article after this many bytes, even if we have not
+# seen everything we want (title, first paragraphs) yet
+ARTICLE_MAX_BYTES = int(os.getenv("ARTICLE_MAX_BYTES", str(200 * 1024)))
+
+# Landing pages and feeds/sitemaps are read whole, up to these caps
+INDEX_MAX_BYTES = int(os.getenv("INDEX_MAX_BYTES", str(2 * 1024 * 1024)))
+FEED_MAX_BYTES = int(os.getenv("FEED_MAX_BYTES", str(5 * 1024 * 1024)))
+
+# Total wall-clock time a single request may take (connect + all reads).
+# requests' own timeout only bounds each socket read, so a server that
+# trickles bytes could otherwise hold a fetch for minutes.
+FETCH_DEADLINE_SECONDS = float(os.getenv("FETCH_DEADLINE_SECONDS", "20"))
+
+# Wall-clock budget for the whole scraping stage of one run_pipeline().
+# When it expires, the in-flight fetch is cancelled and the pipeline
+# moves on with the articles it already has. 0 disables the limit.
+CRAWL_DEADLINE_SECONDS = float(os.getenv("CRAWL_DEADLINE_SECONDS", "600"))
+
+# Total wall-clock time one LLM API call may take (post_with_deadline), for
+# the same reason: its timeout only bounds each read of the answer.
+LLM_CALL_DEADLINE_SECONDS = float(os.getenv("LLM_CALL_DEADLINE_SECONDS", "90"))
+
+CHUNK_SIZE = 16 * 1024
+
+# Running totals for this process (per-source yield telemetry reads deltas)
+_totals = {"requests": 0, "bytes": 0}
+
+
+class FetchDeadlineExceeded(requests.exceptions.Timeout):
+    """A fetch ran past its wall-clock deadline and was cancelled."""
+
+
+class FetchTooLarge(requests.exceptions.RequestException):
+    """A response was larger than the byte cap for its kind of page."""
+
+
+class Deadline:
+    """Absolute wall-clock deadline (None / 0 seconds = no limit)."""
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds if seconds and seconds > 0 else None
+
+    def remaining(self):
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+
+def crawl_deadline():
+    """Deadline for the scraping stage of one pipeline run."""
+    return Deadline(CRAWL_DEADLINE_SECONDS)
+
+
+def fetch_totals():
+    """Requests made and body bytes read so far by this process."""
+    return dict(_totals)
+
+
+def _request_budget(deadline):
+    """Seconds this request may take: per-fetch cap, clipped by the run deadline."""
+    budget = FETCH_DEADLINE_SECONDS if FETCH_DEADLINE_SECONDS > 0 else None
+    remaining = deadline.remaining() if deadline is not None else None
+    if remaining is not None:
+        budget = remaining if budget is None else min(budget, remaining)
+    return budget
+
+
+# ============================
+# CANCELLABLE CONNECTIONS
+# ============================
+
+# A read blocked on a socket only returns early if that socket is shut
+# down; closing the response does not wake it up. The connections used by
+# fetch_bytes record their socket in the fetch's state before the status
+# line is read, so the watchdog can cut the header phase short as well.
+_local = threading.local()
+
+
+class _TrackedConnection:
+    def request(self, *args, **kwargs):
+        result = super().request(*args, **kwargs)
+        state = getattr(_local, "state", None)
+        if state is not None and self.sock is not None:
+            state["sockets"].append(self.sock)
+        return result
+
+
+class _TrackedHTTPConnection(_TrackedConnection, HTTPConnection):
+    pass
+
+
+class _TrackedHTTPSConnection(_TrackedConnection, HTTPSConnection):
+    pass
+
+
+class _TrackedHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _TrackedHTTPConnection
+
+
+class _TrackedHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _TrackedHTTPSConnection
+
+
+class _TrackedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TrackedHTTPPool, "https": _TrackedHTTPSPool}
+
+
+_session = requests.Session()
+_session.mount("http://", _TrackedAdapter())
+_session.mount("https://", _TrackedAdapter())
+
+
+def _response_socket(response):
+    # requests Response -> urllib3 HTTPResponse -> http.client.HTTPResponse
+    # -> buffered socket file -> SocketIO -> the socket itself
+    fp = getattr(getattr(response, "raw", None), "_fp", None)
+    raw = getattr(getattr(fp, "fp", None), "raw", None)
+    return getattr(raw, "_sock", None)
+
+
+def _abort(state):
+    state["expired"].set()
+    sockets = list(state["sockets"])
+    if state["response"] is not None:
+        sockets.append(_response_socket(state["response"]))
+    for sock in sockets:
+        if sock is None:
+            continue
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+# ============================
+# CAPPED STREAMING FETCH
+# ============================
+
+def fetch_bytes(url, headers=None, timeout=10, max_bytes=INDEX_MAX_BYTES,
+                deadline=None, stop=None, truncate=False):
+    """
+    GET `url` with a hard wall-clock limit and a byte cap.
+    - the request is cancelled once FETCH_DEADLINE_SECONDS (or the
+      remaining time of `deadline`, whichever is sooner) has passed
+    - bodies over max_bytes raise FetchTooLarge, or are cut at max_bytes
+      when truncate=True (fine for HTML, useless for XML)
+    - stop(lowered_bytes_so_far) -> True ends the download early
+    Returns (raw_bytes, response); the connection is already closed.
+    """
+    budget = _request_budget(deadline)
+    if budget is not None and budget <= 0:
+        raise FetchDeadlineExceeded(f"No time left to fetch {url}")
+
+    read_timeout = timeout if budget is None else min(timeout, budget)
+    started = time.monotonic()
+    _totals["requests"] += 1
+
+    state = {"sockets": [], "response": None, "expired": threading.Event()}
+    watchdog = None
+    if budget is not None:
+        watchdog = threading.Timer(budget, _abort, args=(state,))
+        watchdog.daemon = True
+        watchdog.start()
+
+    def expired():
+        return budget is not None and (state["expired"].is_set() or time.monotonic() - started >= budget)
+
+    response = None
+    size = 0
+    _local.state = state
+    try:
+        response = _session.get(url, headers=headers, timeout=read_timeout, stream=True)
+        state["response"] = response
+        response.raise_for_status()
+
+        declared = response.headers.get("content-length", "")
+        if declared.isdigit() and int(declared) > max_bytes and not truncate:
+            raise FetchTooLarge(f"{url} is {int(declared)} bytes (cap {max_bytes})")
+
+        chunks = []
+        lowered = b""
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if expired():
+                break
+            if not chunk:
+                continue
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > max_bytes:
+                if not truncate:
+                    raise FetchTooLarge(f"{url} exceeded {max_bytes} bytes")
+                break
+            if stop is not None:
+                lowered += chunk.lower()
+                if stop(lowered):
+                    break
+        # A shut-down socket can also look like a (short) end of body
+        if expired():
+            raise FetchDeadlineExceeded(f"Fetch of {url} cancelled after {budget:.0f}s")
+    except (requests.exceptions.RequestException, OSError, AttributeError):
+        if expired():
+            raise FetchDeadlineExceeded(f"Fetch of {url} cancelled after {budget:.0f}s")
+        raise
+    finally:
+        _local.state = None
+        if watchdog is not None:
+            watchdog.cancel()
+        if response is not None:
+            response.close()
+        _totals["bytes"] += size
+
+    return b"".join(chunks)[:max_bytes], response
+
+
+def post_with_deadline(url, headers=None, data=None, timeout=45, seconds=None):
+    """
+    POST to `url` (the LLM gateway) with a hard wall-clock limit, like
+    fetch_bytes: `seconds` (default LLM_CALL_DEADLINE_SECONDS, 0 = none)
+    covers connect, headers and the whole body. Returns the response with
+    its body read; raises FetchDeadlineExceeded (a requests Timeout) when
+    the call is cancelled.
+    """
+    budget = LLM_CALL_DEADLINE_SECONDS if seconds is None else seconds
+    if not budget or budget <= 0:
+        budget = None
+
+    state = {"sockets": [], "response": None, "expired": threading.Event()}
+    watchdog = None
+    if budget is not None:
+        watchdog = threading.Timer(budget, _abort, args=(state,))
+        watchdog.daemon = True
+        watchdog.start()
+
+    _local.state = state
+    try:
+        response = _session.post(url, headers=headers, data=data, timeout=timeout)
+    except (requests.exceptions.RequestException, OSError, AttributeError):
+        if state["expired"].is_set():
+            raise FetchDeadlineExceeded(f"Call to {url} cancelled after {budget:.0f}s")
+        raise
+    finally:
+        _local.state = None
+        if watchdog is not None:
+            watchdog.cancel()
+    # A shut-down socket can also look like a (short) end of body
+    if state["expired"].is_set():
+        raise FetchDeadlineExceeded(f"Call to {url} cancelled after {budget:.0f}s")
+    return response
+
+
+def decode_html(raw, response):
+    # Only trust an explicit charset; requests' ISO-8859-1 default for
+    # text/* would mangle the (mostly UTF-8) news sites we read
+    content_type = response.headers.get("content-type", "")
+    encoding = get_encoding_from_headers(response.headers) if "charset" in content_type.lower() else None
+    try:
+        return raw.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        return raw.decode("utf-8", errors="replace")
+
+
+def fetch_html(url, headers=None, timeout=10, max_bytes=INDEX_MAX_BYTES, deadline=None):
+    """Landing page fetch: whole page up to max_bytes, hard time limit."""
+    raw, response = fetch_bytes(
+        url, headers=headers, timeout=timeout, max_bytes=max_bytes,
+        deadline=deadline, truncate=True,
+    )
+    return decode_html(raw, response)
+
+
+# ============================
+# HTML PARSING
+# ============================
+
+def parse_html(html):
+    """
+    BeautifulSoup tree (stdlib html.parser) for a fetched page. bs4 is
+    imported on first use, so runs that have nothing to fetch (no source
+    due yet) start without it.
+    """
+    import warnings
+    from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
+
+    # Some "pages" are really RSS/XML; html.parser copes, skip the warning
+    warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+    return BeautifulSoup(html, "html.parser")
+
+
+# ============================
+# STREAMING ARTICLE FETCH
+# ============================
+
+_TAG_NAME_RE = re.compile(r"^[a-z][a-z0-9]*$")
+
+
+def _closing_tag(selector):
+    """b"</tag>" for a bare tag-name selector; None for CSS we cannot spot in raw bytes."""
+    selector = (selector or "").strip().lower()
+    return f"</{selector}>".encode("ascii") if _TAG_NAME_RE.match(selector) else None
+
+
+def _needed_parts(need_title, min_paragraphs, title_selectors, body_selector, date_selector):
+    """
+    stop(buffer) for fetch_bytes that is True once the (lowercased) partial
+    document contains what extract_articles reads with these selectors:
+    </head> (date metadata), the closing tag of the first title selector
+    and `min_paragraphs` closing tags of the body selector. None (read the
+    page up to max_bytes) when a selector is not a bare tag name or a
+    date_selector is set, since those elements can be anywhere.
+    """
+    if date_selector:
+        return None
+    title_end = _closing_tag(title_selectors[0]) if need_title and title_selectors else None
+    body_end = _closing_tag(body_selector)
+    if (need_title and title_selectors and title_end is None) or body_end is None:
+        return None
+
+    def stop(buffer):
+        if b"</head>" not in buffer:
+            return False
+        if title_end is not None and title_end not in buffer:
+            return False
+        return buffer.count(body_end) >= min_paragraphs
+
+    return stop
+
+
+def fetch_article_html(url, headers=None, timeout=10, need_title=True,
+                       min_paragraphs=3, max_bytes=ARTICLE_MAX_BYTES, deadline=None,
+                       title_selectors=("h1",), body_selector="p", date_selector=None):
+    """
+    Stream an article page and stop as soon as the parts we use have
+    arrived (head metadata, headline, first paragraphs, as found by the
+    source profile's selectors) or max_bytes is reached, then close the
+    connection. Returns the (possibly partial) HTML as text; BeautifulSoup
+    copes fine with the truncated tail.
+    Raises requests.exceptions.HTTPError for 4xx/5xx responses and
+    FetchDeadlineExceeded when the page takes too long.
+    """
+    raw, response = fetch_bytes(
+        url, headers=headers, timeout=timeout, max_bytes=max_bytes,
+        deadline=deadline, truncate=True,
+        stop=_needed_parts(need_title, min_paragraphs, title_selectors, body_selector, date_selector),
+    )
+    return decode_html(raw, response)
+
+if __name__ == "__main__":
+    # python news_fetch.py -> check the hard deadline against a local server
+    # that trickles 8 bytes every 0.5 s, in the body and in the headers
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Trickle(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self.do_GET()
+
+        def do_GET(self):
+            try:
+                if self.path == "/slow-headers":
+                    self.wfile.write(b"HTTP/1.1 200 OK\r\n")
+                    for _ in range(60):  # http.client stops at 100 headers
+                        self.wfile.write(b"X-Pad: 1\r\n")
+                        self.wfile.flush()
+                        time.sleep(0.5)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", "800")
+                self.end_headers()
+                for _ in range(100):
+                    self.wfile.write(b"<i>..</i>")
+                    self.wfile.flush()
+                    time.sleep(0.5)
+            except OSError:
+                pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Trickle)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    FETCH_DEADLINE_SECONDS = LLM_CALL_DEADLINE_SECONDS = 2
+    checks = [
+        ("fetch_bytes", lambda: fetch_bytes(f"{base}/body")),
+        ("fetch_article_html", lambda: fetch_article_html(f"{base}/body")),
+        ("headers", lambda: fetch_bytes(f"{base}/slow-headers")),
+        ("crawl deadline", lambda: fetch_bytes(f"{base}/body", deadline=Deadline(1))),
+        ("post_with_deadline", lambda: post_with_deadline(f"{base}/body", data=b"{}")),
+    ]
+    failed = 0
+    for name, fetch in checks:
+        started = time.monotonic()
+        try:
+            fetch()
+            outcome = "returned"
+        except FetchDeadlineExceeded:
+            outcome = "cancelled"
+        elapsed = time.monotonic() - started
+        ok = outcome == "cancelled" and elapsed < FETCH_DEADLINE_SECONDS + 1
+        failed += not ok
+        print(f"{'✅' if ok else '❌'} {name}: {outcome} after {elapsed:.1f}s")
+    server.shutdown()
+    raise SystemExit(1 if failed else 0)
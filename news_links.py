@@ -0,0 +1,336 @@
+import datetime
+import json
+import math
+import os
+import random
+import re
+from urllib.parse import urlsplit
+
+# ============================
+# LINK RANKING CONFIG
+# ============================
+
+# Every fetched landing-page link is logged with its outcome; a small
+# per-source logistic regression is trained on that log and used to rank
+# (and skip) the links of the next runs.
+LINK_LOG_FILE = os.getenv("LINK_LOG_FILE", "link_outcomes.jsonl")
+LINK_MODEL_FILE = os.getenv("LINK_MODEL_FILE", "link_model.json")
+
+# Links scoring below this estimated P(real article) are not fetched
+LINK_SCORE_THRESHOLD = float(os.getenv("LINK_SCORE_THRESHOLD", "0.2"))
+
+# A source needs this many logged fetches (with both outcomes) before its
+# links are ranked; until then they are fetched in page order
+MIN_TRAINING_LINKS = 40
+
+# Most recent log rows used per source
+MAX_TRAINING_LINKS = 5000
+
+# Below-threshold links still fetched per run (after the ranked ones) so a
+# site redesign cannot lock a source out for good
+EXPLORE_LINKS = int(os.getenv("LINK_EXPLORE_LINKS", "2"))
+
+# Fetch outcomes logged by extract_articles
+POSITIVE_OUTCOMES = {"article"}
+NEGATIVE_OUTCOMES = {"no_title", "no_paragraphs", "short_title", "generic_title", "short_snippet", "stale"}
+# Anything else (HTTP / network errors) says nothing about the link itself
+
+EPOCHS = 30
+LEARNING_RATE = 0.1
+L2 = 1e-3
+
+_DATE_PATH_RE = re.compile(r"/20\d{2}[/-]?(0[1-9]|1[0-2])(?:[/-]?\d{2})?(?=/|-|$)")
+_NAV_ANCHORS = {"more", "read more", "next", "previous", "login", "log in", "subscribe",
+                "sign up", "register", "contact", "about", "home", "see all", "view all"}
+
+
+# ============================
+# FEATURES
+# ============================
+
+def _bucket(value, edges):
+    for i, edge in enumerate(edges):
+        if value < edge:
+            return i
+    return len(edges)
+
+
+def link_features(url, anchor="", position=0.0):
+    """
+    Sparse features for one landing-page link: URL path shape (depth,
+    section, slug length, dates / numeric ids), anchor text and relative
+    position on the page (0 = top).
+    """
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.split("/") if s]
+    slug = segments[-1] if segments else ""
+    slug_words = [w for w in re.split(r"[-_]", slug) if w]
+    digits = sum(c.isdigit() for c in slug)
+    anchor = " ".join(str(anchor or "").split())
+    anchor_words = len(anchor.split())
+
+    features = {
+        f"depth={min(len(segments), 6)}": 1.0,
+        f"slug_len={_bucket(len(slug), (10, 20, 40, 70))}": 1.0,
+        f"slug_words={_bucket(len(slug_words), (2, 4, 7, 11))}": 1.0,
+        f"anchor_words={_bucket(anchor_words, (1, 4, 8, 16))}": 1.0,
+        f"pos={min(int(float(position or 0) * 5), 4)}": 1.0,
+        "digit_ratio": digits / len(slug) if slug else 0.0,
+    }
+    if segments:
+        features[f"section={segments[0].lower()}"] = 1.0
+    if _DATE_PATH_RE.search(parts.path):
+        features["date_in_path"] = 1.0
+    if any(s.isdigit() and len(s) >= 5 for s in segments):
+        features["numeric_id"] = 1.0
+    if parts.query:
+        features["has_query"] = 1.0
+    if "." in slug:
+        features[f"ext={slug.rsplit('.', 1)[-1].lower()[:5]}"] = 1.0
+    if slug != slug.lower():
+        features["slug_upper"] = 1.0
+    if anchor.lower() in _NAV_ANCHORS:
+        features["anchor_nav"] = 1.0
+    return features
+
+
+# ============================
+# OUTCOME LOG
+# ============================
+
+def log_link_outcomes(source_name, outcomes, path=None):
+    """
+    Append (candidate, outcome) pairs for fetched landing-page links to the
+    JSONL log and print this run's fetch hit rate for the source.
+    Feed entries (no "position") are not logged: they are always articles.
+    """
+    rows = []
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    for candidate, outcome in outcomes:
+        if "position" not in candidate:
+            continue
+        rows.append({
+            "ts": now,
+            "source": source_name,
+            "url": candidate["url"],
+            "anchor": candidate.get("anchor", ""),
+            "position": round(candidate.get("position", 0.0), 4),
+            "score": candidate.get("score"),
+            "outcome": outcome,
+        })
+    if not rows:
+        return
+
+    labeled = [r for r in rows if r["outcome"] in POSITIVE_OUTCOMES | NEGATIVE_OUTCOMES]
+    if labeled:
+        hits = sum(1 for r in labeled if r["outcome"] in POSITIVE_OUTCOMES)
+        print(f"   🎯 {source_name}: {hits}/{len(labeled)} fetched links were articles "
+              f"({hits / len(labeled):.0%} hit rate)")
+
+    try:
+        with open(path or LINK_LOG_FILE, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+    except OSError as e:
+        print(f"   ⚠️ Could not write link log: {e}")
+
+
+def read_link_log(path=None):
+    """Labeled log rows grouped by source: {source: [(features, label, ts), ...]}."""
+    by_source = {}
+    try:
+        with open(path or LINK_LOG_FILE, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                outcome = row.get("outcome")
+                if outcome in POSITIVE_OUTCOMES:
+                    label = 1
+                elif outcome in NEGATIVE_OUTCOMES:
+                    label = 0
+                else:
+                    continue
+                features = link_features(row["url"], row.get("anchor", ""), row.get("position", 0.0))
+                by_source.setdefault(row["source"], []).append((features, label, row.get("ts", "")))
+    except FileNotFoundError:
+        return {}
+    return by_source
+
+
+# ============================
+# LOGISTIC REGRESSION
+# ============================
+
+def _sigmoid(z):
+    if z < -30:
+        return 0.0
+    if z > 30:
+        return 1.0
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def score_link(model, features):
+    """Estimated probability that the link is a real, usable article."""
+    weights = model["weights"]
+    z = model["bias"] + sum(weights.get(name, 0.0) * value for name, value in features.items())
+    return _sigmoid(z)
+
+
+def train_model(samples, epochs=EPOCHS, seed=1337):
+    """
+    Plain SGD logistic regression (L2) on [(features, label), ...].
+    Returns {"bias", "weights", "samples", "positive_rate"} (JSON-safe).
+    """
+    model = {"bias": 0.0, "weights": {}}
+    weights = model["weights"]
+    order = list(range(len(samples)))
+    rng = random.Random(seed)
+
+    for epoch in range(epochs):
+        rng.shuffle(order)
+        lr = LEARNING_RATE / (1 + 0.1 * epoch)
+        for i in order:
+            features, label = samples[i]
+            error = score_link(model, features) - label
+            model["bias"] -= lr * error
+            for name, value in features.items():
+                w = weights.get(name, 0.0)
+                weights[name] = w - lr * (error * value + L2 * w)
+
+    model["weights"] = {k: round(v, 5) for k, v in weights.items() if abs(v) > 1e-4}
+    model["bias"] = round(model["bias"], 5)
+    model["samples"] = len(samples)
+    model["positive_rate"] = round(sum(label for _, label in samples) / len(samples), 4)
+    return model
+
+
+def _trainable(samples):
+    labels = {label for _, label in samples}
+    return len(samples) >= MIN_TRAINING_LINKS and labels == {0, 1}
+
+
+def train_link_models(log_path=None, model_path=None):
+    """Retrain every source with enough history and save the models as JSON."""
+    models = {}
+    for source, rows in read_link_log(log_path).items():
+        rows = sorted(rows, key=lambda r: r[2])[-MAX_TRAINING_LINKS:]
+        samples = [(features, label) for features, label, _ in rows]
+        if _trainable(samples):
+            models[source] = train_model(samples)
+
+    payload = {
+        "trained_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "sources": models,
+    }
+    try:
+        with open(model_path or LINK_MODEL_FILE, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=1, sort_keys=True)
+    except OSError as e:
+        print(f"⚠️ Could not save link model: {e}")
+    return models
+
+
+_models = None
+
+
+def load_link_models():
+    """Per-source models; retrained (once per process) when the log is newer."""
+    global _models
+    if _models is not None:
+        return _models
+
+    log_mtime = os.path.getmtime(LINK_LOG_FILE) if os.path.exists(LINK_LOG_FILE) else None
+    model_mtime = os.path.getmtime(LINK_MODEL_FILE) if os.path.exists(LINK_MODEL_FILE) else None
+
+    if log_mtime is not None and (model_mtime is None or log_mtime > model_mtime):
+        _models = train_link_models()
+    elif model_mtime is not None:
+        try:
+            with open(LINK_MODEL_FILE, encoding="utf-8") as f:
+                _models = json.load(f).get("sources", {})
+        except (OSError, ValueError):
+            _models = {}
+    else:
+        _models = {}
+    return _models
+
+
+# ============================
+# RANKING
+# ============================
+
+def rank_links(source_name, candidates, threshold=None):
+    """
+    Order landing-page candidates ({"url", "anchor", "position"}) by the
+    source's model score and drop those below the threshold (keeping
+    EXPLORE_LINKS of them at the end). Without a trained model for the
+    source the page order is returned unchanged.
+    """
+    model = load_link_models().get(source_name)
+    if not model or not candidates:
+        return candidates
+    if threshold is None:
+        threshold = LINK_SCORE_THRESHOLD
+
+    for candidate in candidates:
+        features = link_features(candidate["url"], candidate.get("anchor", ""), candidate.get("position", 0.0))
+        candidate["score"] = round(score_link(model, features), 4)
+
+    ranked = sorted(candidates, key=lambda c: c["score"], reverse=True)
+    kept = [c for c in ranked if c["score"] >= threshold]
+    skipped = ranked[len(kept):]
+
+    explore = random.sample(skipped, min(EXPLORE_LINKS, len(skipped)))
+    if skipped:
+        print(f"   🧮 {source_name}: {len(skipped)} low-score links skipped "
+              f"(< {threshold:.2f}, {len(explore)} fetched anyway to keep learning)")
+    return kept + explore
+
+
+# ============================
+# OFFLINE EVALUATION
+# ============================
+
+def evaluate(log_path=None, holdout=0.3, threshold=None):
+    """
+    Per source: train on the oldest runs, replay the newest `holdout`
+    fraction and compare the fetch hit rate of fetching every link
+    (before) with fetching only links above the threshold (after).
+    """
+    if threshold is None:
+        threshold = LINK_SCORE_THRESHOLD
+    report = {}
+    for source, rows in sorted(read_link_log(log_path).items()):
+        rows = sorted(rows, key=lambda r: r[2])
+        split = int(len(rows) * (1 - holdout))
+        train = [(f, label) for f, label, _ in rows[:split]]
+        test = [(f, label) for f, label, _ in rows[split:]]
+        if not test or not _trainable(train):
+            continue
+        model = train_model(train)
+        kept = [label for f, label in test if score_link(model, f) >= threshold]
+        positives = sum(label for _, label in test)
+        report[source] = {
+            "links": len(test),
+            "hit_rate_before": positives / len(test),
+            "fetched_after": len(kept),
+            "hit_rate_after": sum(kept) / len(kept) if kept else 0.0,
+            "articles_kept": sum(kept) / positives if positives else 1.0,
+        }
+    return report
+
+
+if __name__ == "__main__":
+    # python news_links.py -> retrain models and report hit rate before/after
+    results = evaluate()
+    if not results:
+        print(f"Not enough labeled links in {LINK_LOG_FILE} yet "
+              f"(need {MIN_TRAINING_LINKS}+ per source with both outcomes)")
+    for source, r in results.items():
+        print(f"{source:22} fetches {r['links']:4} -> {r['fetched_after']:4} | "
+              f"hit rate {r['hit_rate_before']:.0%} -> {r['hit_rate_after']:.0%} | "
+              f"articles kept {r['articles_kept']:.0%}")
+    models = train_link_models()
+    print(f"Saved models for {len(models)} source(s) to {LINK_MODEL_FILE}")
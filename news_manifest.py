@@ -0,0 +1,171 @@
+import csv
+import hashlib
+import json
+import os
+
+from news_records import read_daily_csv
+from news_store import news_file_sort_key, parse_archive_filename, parse_daily_filename
+from news_urls import canonical_url
+
+# ============================
+# MANIFEST CONFIG
+# ============================
+
+# Index of the daily CSVs (and monthly archives, whose entry has the month
+# and the dates it holds instead of a date): per file its vertical, date, row count,
+# published range, URL set digest, size and mtime, plus the list of dates
+# and the total article count. The pipelines update it when they write a
+# file; the dashboard answers "available dates" / "total collected" from it
+# and only re-reads files whose size or mtime no longer match.
+MANIFEST_FILE = os.getenv("NEWS_MANIFEST_FILE", "news_manifest.json")
+
+
+def _empty_manifest():
+    # counted_signature: manifest_signature when total_articles was last
+    # synced with the URL counter
+    return {"files": {}, "dates": [], "total_articles": 0, "dir_mtime": None, "counted_signature": None}
+
+
+def load_manifest(path=None):
+    try:
+        with open(path or MANIFEST_FILE, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return _empty_manifest()
+    for key, value in _empty_manifest().items():
+        manifest.setdefault(key, value)
+    return manifest
+
+
+def save_manifest(manifest, path=None):
+    path = path or MANIFEST_FILE
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ Could not save {path}: {e}")
+
+
+def manifest_signature(manifest):
+    """Changes whenever a daily file or archive is added, removed or rewritten."""
+    digest = hashlib.sha1()
+    for name, entry in sorted(manifest["files"].items()):
+        digest.update(f"{name}:{entry.get('size')}:{entry.get('mtime')}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+# ============================
+# ENTRIES
+# ============================
+
+def file_entry(csv_path, rows):
+    """
+    Manifest entry for a daily CSV or monthly archive and its rows (NewsRow.as_dict
+    or read_daily_csv row dicts).
+    """
+    daily = parse_daily_filename(csv_path)
+    if daily:
+        vertical, date_str = daily
+        period = {"date": date_str, "dates": [date_str]}
+    else:
+        vertical, month = parse_archive_filename(csv_path)
+        period = {"month": month, "dates": sorted({row.get("date_scraped") for row in rows if row.get("date_scraped")})}
+    keys, published = set(), []
+    for row in rows:
+        url = str(row.get("url") or "").strip()
+        if url:
+            keys.add(canonical_url(url))
+        if row.get("published") is not None:
+            published.append(row["published"])
+    stat = os.stat(csv_path)
+    return {
+        "vertical": vertical,
+        **period,
+        "rows": len(rows),
+        "min_published": min(published).isoformat(timespec="seconds") if published else None,
+        "max_published": max(published).isoformat(timespec="seconds") if published else None,
+        "url_digest": hashlib.sha1("\n".join(sorted(keys)).encode("utf-8")).hexdigest()[:16],
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+    }
+
+
+def _update_dates(manifest):
+    dates = {d for e in manifest["files"].values() for d in e.get("dates") or [e["date"]]}
+    manifest["dates"] = sorted(dates, reverse=True)
+
+
+def record_daily_file(csv_path, rows, total_articles=None, path=None):
+    """
+    Pipelines: register the daily CSV just written (rows already in memory,
+    so nothing is re-read). total_articles: distinct articles collected so
+    far, if the caller knows it.
+    """
+    manifest = load_manifest(path)
+    try:
+        manifest["files"][os.path.basename(csv_path)] = file_entry(csv_path, rows)
+    except OSError as e:
+        print(f"⚠️ Could not index {csv_path}: {e}")
+        return
+    _update_dates(manifest)
+    if total_articles is not None:
+        manifest["total_articles"] = total_articles
+    save_manifest(manifest, path)
+
+
+# ============================
+# VERIFY / REBUILD
+# ============================
+
+def _matches(entry, stat):
+    return entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime
+
+
+def refresh_manifest(directory=".", path=None):
+    """
+    Check the manifest against the directory and rebuild stale entries.
+    Listed files are only stat()ed; the directory is listed again only when
+    its own mtime changed (files added, removed or replaced by a git pull).
+    Returns (manifest, changed_paths), archives first; removed files are
+    dropped and not in changed_paths. The manifest is saved if anything changed; callers that
+    update total_articles from changed_paths save it again.
+    """
+    manifest = load_manifest(path)
+    files = manifest["files"]
+    changed = []
+    dirty = False
+
+    dir_mtime = os.stat(directory).st_mtime
+    if manifest["dir_mtime"] != dir_mtime:
+        names = [n for n in os.listdir(directory) if parse_daily_filename(n) or parse_archive_filename(n)]
+        for name in set(files) - set(names):
+            del files[name]
+        for name in names:
+            files.setdefault(name, {})
+        manifest["dir_mtime"] = dir_mtime
+        dirty = True
+
+    for name in list(files):
+        csv_path = os.path.join(directory, name)
+        try:
+            stat = os.stat(csv_path)
+        except FileNotFoundError:
+            del files[name]
+            dirty = True
+            continue
+        if _matches(files[name], stat):
+            continue
+        try:
+            files[name] = file_entry(csv_path, read_daily_csv(csv_path))
+            changed.append(csv_path)
+        except (OSError, ValueError, csv.Error) as e:
+            print(f"⚠️ Could not index {csv_path}: {e}")
+            del files[name]
+        dirty = True
+
+    if dirty:
+        _update_dates(manifest)
+        save_manifest(manifest, path)
+    return manifest, sorted(changed, key=news_file_sort_key)
@@ -0,0 +1,223 @@
+import datetime
+import os
+
+from news_store import VERTICALS, connect, parse_archive_filename, parse_daily_filename
+
+# ============================
+# PARQUET CONFIG
+# ============================
+
+# Columnar copy of the article store for the analytical dashboard views
+# ("All Collected News", trends): hive-partitioned by vertical and month,
+# one file per partition, e.g.
+#   news_parquet/vertical=es_news/month=2026-01/data.parquet
+# pyarrow is optional (streamlit already depends on it); without it the
+# dashboard keeps querying SQLite.
+PARQUET_DIR = os.getenv("NEWS_PARQUET_DIR", "news_parquet")
+
+# Columns the dashboard cards, filters and dedup read
+DASHBOARD_COLUMNS = [
+    "date_scraped", "source", "title", "url", "url_key", "published", "story_id",
+    "summary", "engagement", "hook", "is_ai_cs_relevant", "category",
+    "ecosystem_vendors", "ecosystem_layers", "strategic_move", "ai_related",
+]
+
+_arrow = None
+
+
+def arrow():
+    """(pyarrow, pyarrow.dataset, pyarrow.parquet), or None if not installed."""
+    global _arrow
+    if _arrow is None:
+        try:
+            import pyarrow
+            import pyarrow.dataset
+            import pyarrow.parquet
+            _arrow = (pyarrow, pyarrow.dataset, pyarrow.parquet)
+        except ImportError:
+            _arrow = False
+    return _arrow or None
+
+
+def _schema(pa):
+    return pa.schema([
+        ("date_scraped", pa.date32()),
+        ("source", pa.dictionary(pa.int16(), pa.string())),
+        ("title", pa.string()),
+        ("url", pa.string()),
+        ("url_key", pa.string()),
+        ("published", pa.timestamp("s", tz="UTC")),
+        ("story_id", pa.string()),
+        ("vendors_hit", pa.string()),
+        ("keywords_hit", pa.string()),
+        ("summary", pa.string()),
+        ("engagement", pa.dictionary(pa.int8(), pa.string())),
+        ("hook", pa.string()),
+        ("is_ai_cs_relevant", pa.bool_()),
+        ("category", pa.dictionary(pa.int8(), pa.string())),
+        ("ecosystem_vendors", pa.string()),
+        ("ecosystem_layers", pa.dictionary(pa.int16(), pa.string())),
+        ("strategic_move", pa.bool_()),
+        ("ai_related", pa.bool_()),
+    ])
+
+
+def _marker_path(directory=None):
+    # Manifest signature + column names of the last refresh_from_store
+    return os.path.join(directory or PARQUET_DIR, "_refreshed")
+
+
+def _read_marker(directory=None):
+    try:
+        with open(_marker_path(directory), encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _write_marker(marker, directory=None):
+    try:
+        os.makedirs(directory or PARQUET_DIR, exist_ok=True)
+        with open(_marker_path(directory), "w", encoding="utf-8") as f:
+            f.write(marker)
+    except OSError as e:
+        print(f"⚠️ Could not save {_marker_path(directory)}: {e}")
+
+
+def month_path(vertical, month, directory=None):
+    return os.path.join(directory or PARQUET_DIR, f"vertical={vertical}", f"month={month}", "data.parquet")
+
+
+# ============================
+# WRITING
+# ============================
+
+def write_month(conn, vertical, month, directory=None):
+    """Rewrite one vertical/month partition file ("YYYY-MM") from the SQLite store."""
+    pa, _, pq = arrow()
+    rows = conn.execute("""
+        SELECT an.date_scraped, ar.source, ar.title, ar.url, ar.url_key, ar.published,
+               an.story_id, an.vendors_hit, an.keywords_hit, an.summary, an.engagement,
+               an.hook, an.is_ai_cs_relevant, an.ecosystem_vendors, an.ecosystem_layers,
+               an.strategic_move, an.ai_related
+        FROM analyses an JOIN articles ar ON ar.url_key = an.url_key
+        WHERE an.vertical = ? AND an.date_scraped >= ? AND an.date_scraped < ?
+        ORDER BY an.date_scraped, an.rowid
+    """, (vertical, f"{month}-01", f"{month}-32")).fetchall()
+
+    columns = {name: [] for name in _schema(pa).names}
+    for r in rows:
+        row = dict(r)
+        row["date_scraped"] = datetime.date.fromisoformat(row["date_scraped"])
+        row["published"] = datetime.datetime.fromisoformat(row["published"]) if row["published"] else None
+        for name in ("is_ai_cs_relevant", "strategic_move", "ai_related"):
+            row[name] = bool(row[name])
+        row["category"] = VERTICALS[vertical]
+        for name in columns:
+            columns[name].append(row[name])
+
+    path = month_path(vertical, month, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Dot-prefixed temp name: ignored by dataset discovery until renamed
+    tmp = os.path.join(os.path.dirname(path), ".data.parquet.tmp")
+    pq.write_table(pa.table(columns, schema=_schema(pa)), tmp)
+    os.replace(tmp, path)
+    return len(rows)
+
+
+def refresh_from_store(conn=None, directory=None, signature=None):
+    """
+    Rewrite the partitions holding a day whose daily CSV or monthly archive
+    (as recorded by the store's imported_files) is newer than the partition
+    file, or whose file was written with other columns. Returns the number
+    of files written, or 0 when pyarrow is not installed.
+    signature: news_manifest.manifest_signature of the daily files. When it
+    (and the columns) match the last refresh, nothing is checked at all, so
+    a dashboard rerun with no new files costs one small file read.
+    """
+    modules = arrow()
+    if modules is None:
+        return 0
+    pa, _, pq = modules
+    columns = _schema(pa).names
+    marker = f"{signature}:{','.join(columns)}" if signature else None
+    if marker is not None and _read_marker(directory) == marker:
+        return 0
+    own = conn is None
+    conn = conn or connect()
+    newest = {}  # (vertical, month) -> newest CSV mtime
+    for path, mtime in conn.execute("SELECT path, mtime FROM imported_files").fetchall():
+        parsed = parse_daily_filename(path) or parse_archive_filename(path)
+        if parsed:
+            key = (parsed[0], parsed[1][:7])
+            newest[key] = max(newest.get(key, 0), mtime)
+
+    written = 0
+    for (vertical, month), mtime in sorted(newest.items()):
+        target = month_path(vertical, month, directory)
+        if (os.path.exists(target) and os.path.getmtime(target) >= mtime
+                and pq.read_schema(target).names == columns):
+            continue
+        write_month(conn, vertical, month, directory)
+        written += 1
+    if own:
+        conn.close()
+    if marker is not None:
+        _write_marker(marker, directory)
+    return written
+
+
+# ============================
+# READING
+# ============================
+
+def read_frame(columns=DASHBOARD_COLUMNS, date_from=None, published_since=None,
+               verticals=None, directory=None):
+    """
+    Typed pandas DataFrame (plus a "vertical" column) with only `columns`,
+    reading only the month partitions that can match date_from; None when
+    pyarrow or the dataset is missing.
+    - date_from: "YYYY-MM-DD" lower bound on date_scraped
+    - published_since: datetime; undated articles are always kept
+    """
+    modules = arrow()
+    directory = directory or PARQUET_DIR
+    if modules is None or not os.path.isdir(directory):
+        return None
+    pa, ds, _ = modules
+
+    dataset = ds.dataset(directory, format="parquet", partitioning="hive")
+    filters = []
+    if verticals:
+        filters.append(ds.field("vertical").isin(list(verticals)))
+    if date_from:
+        # Partition pruning on month, then the exact bound inside the files
+        filters.append(ds.field("month") >= date_from[:7])
+        filters.append(ds.field("date_scraped") >= datetime.date.fromisoformat(date_from))
+    if published_since is not None:
+        since = pa.scalar(published_since.astimezone(datetime.timezone.utc), pa.timestamp("s", tz="UTC"))
+        filters.append(ds.field("published").is_null() | (ds.field("published") >= since))
+
+    expression = None
+    for f in filters:
+        expression = f if expression is None else expression & f
+    table = dataset.to_table(columns=list(columns) + ["vertical"], filter=expression)
+    return table.to_pandas()
+
+
+if __name__ == "__main__":
+    # python news_parquet.py -> (re)build the Parquet copy of the store
+    import time
+
+    if arrow() is None:
+        raise SystemExit("pyarrow is not installed")
+    conn = connect()
+    print(f"Wrote {refresh_from_store(conn)} partition file(s) to {PARQUET_DIR}")
+    conn.close()
+
+    started = time.perf_counter()
+    df = read_frame()
+    elapsed = (time.perf_counter() - started) * 1000
+    if df is not None:
+        print(f"Read {len(df)} rows x {len(df.columns)} columns in {elapsed:.1f} ms, "
+              f"{df.memory_usage(deep=True).sum() / 1024:.0f} KB in memory")
@@ -0,0 +1,135 @@
+import datetime
+import os
+import time
+
+from news_tags import TermMatcher
+
+# ============================
+# PRIORITY CONFIG
+# ============================
+
+# Terms that usually mean a story ends up HIGH in the LLM rubric
+# (analyst reports, M&A, big partnerships, hyperscaler moves)
+HIGH_SIGNAL_KEYWORDS = [
+    "gartner", "magic quadrant", "forrester", "idc", "marketscape",
+    "everest", "omdia", "isg", "frost & sullivan",
+    "acquire", "acquires", "acquisition", "acquired", "merger",
+    "partnership", "partners with", "strategic", "billion", "funding",
+    "raises", "launches", "unveils", "agentic", "ai agent", "voice ai",
+    "aws", "azure", "google cloud", "oracle", "openai",
+]
+
+# Vendors that tend to produce market-moving CX / CCaaS news
+PRIORITY_VENDORS = [
+    "zendesk", "salesforce", "microsoft", "hubspot", "freshworks",
+    "servicenow", "intercom", "genesys", "nice", "five9", "ringcentral",
+    "8x8", "twilio", "vonage", "talkdesk", "sierra", "decagon", "cresta",
+    "cognigy", "parloa", "polyai", "asapp", "uniphore", "amazon connect",
+]
+
+# Whole-word matchers ("isg" not in "misguided", "nice" not in "niche")
+HIGH_SIGNAL_MATCHER = TermMatcher(HIGH_SIGNAL_KEYWORDS)
+PRIORITY_VENDOR_MATCHER = TermMatcher(PRIORITY_VENDORS)
+
+# Articles older than this get no recency bonus
+RECENCY_WINDOW_HOURS = 48
+
+# Wall-clock budget (seconds) for the LLM stage of a run; articles not
+# analyzed in time are saved as PENDING. Each call is also capped on its
+# own (news_fetch.LLM_CALL_DEADLINE_SECONDS), so the stage ends at most one
+# call after this. 0 means "no deadline" (analyze everything).
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "1800") or 0)
+
+# Engagement value written for articles we ran out of time to analyze
+PENDING_ENGAGEMENT = "PENDING"
+
+
+# ============================
+# SCORING
+# ============================
+
+def priority_score(article, now=None, source_weights=None,
+                   vendors=None, keywords=None):
+    """
+    Cheap pre-LLM score: higher means "analyze sooner".
+    Combines recency (published_dt), a per-source weight and
+    vendor / keyword hits in title + snippet (vendors / keywords are
+    news_tags.TermMatcher vocabularies, matched as whole words).
+    """
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+    source_weights = source_weights or {}
+    vendors = PRIORITY_VENDOR_MATCHER if vendors is None else vendors
+    keywords = HIGH_SIGNAL_MATCHER if keywords is None else keywords
+
+    score = 0.0
+
+    # 1) Recency: up to 3 points, linearly decaying over the window.
+    #    Undated articles get a neutral middle value.
+    pub_dt = article.published_dt
+    # (pandas NaT is a datetime subclass but never equals itself)
+    if isinstance(pub_dt, datetime.datetime) and pub_dt == pub_dt:
+        if pub_dt.tzinfo is None:
+            pub_dt = pub_dt.replace(tzinfo=datetime.timezone.utc)
+        age_hours = max(0.0, (now - pub_dt).total_seconds() / 3600)
+        score += 3.0 * max(0.0, 1 - age_hours / RECENCY_WINDOW_HOURS)
+    else:
+        score += 1.0
+
+    # 2) Source weight (defaults to 1.0)
+    score += source_weights.get(article.source, 1.0)
+
+    # 3) Vendor / keyword hits (title counts double)
+    title_vendors = vendors.find(article.title)
+    score += 1.0 * len(title_vendors)
+    score += 0.5 * len(vendors.find(article.snippet) - title_vendors)
+
+    title_keywords = keywords.find(article.title)
+    score += 1.5 * len(title_keywords)
+    score += 0.75 * len(keywords.find(article.snippet) - title_keywords)
+
+    return score
+
+
+def order_by_priority(articles, source_weights=None, vendors=None, keywords=None):
+    """Return articles sorted by priority_score, highest first (stable)."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return sorted(
+        articles,
+        key=lambda art: priority_score(
+            art, now=now, source_weights=source_weights,
+            vendors=vendors, keywords=keywords,
+        ),
+        reverse=True,
+    )
+
+
+# ============================
+# DEADLINE
+# ============================
+
+def llm_deadline(seconds=None):
+    """
+    Return an absolute time.monotonic() deadline for the LLM stage,
+    or None when no deadline is configured.
+    """
+    if seconds is None:
+        seconds = LLM_DEADLINE_SECONDS
+    if not seconds or seconds <= 0:
+        return None
+    return time.monotonic() + seconds
+
+
+def deadline_passed(deadline):
+    """True once a deadline from llm_deadline() has been reached."""
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def pending_analysis():
+    """Placeholder LLM result for articles skipped by the deadline."""
+    return {
+        "summary": "",
+        "engagement": PENDING_ENGAGEMENT,
+        "hook": "",
+        "is_ai_cs_relevant": False,
+    }
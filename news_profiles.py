@@ -0,0 +1,139 @@
+import json
+import os
+import re
+from urllib.parse import urlparse
+
+from news_dates import parse_date
+
+# ============================
+# EXTRACTION PROFILES
+# ============================
+
+# Per-source overrides of the link filters and content selectors. Each
+# pipeline passes its own defaults (its historical heuristics); a source
+# entry in this file replaces individual settings for that source.
+PROFILES_FILE = os.getenv("SOURCE_PROFILES_FILE", "source_profiles.json")
+
+# Every setting a profile understands, with the value used when neither the
+# pipeline defaults nor the source override set it
+BASE_SETTINGS = {
+    "include_url": [],               # regexes; if any, the URL must match one
+    "exclude_url": [],               # regexes; a match rejects the URL
+    "min_depth": 2,                  # path segments, e.g. /section/slug = 2
+    "max_depth": None,
+    "min_slug_length": 0,            # last path segment
+    "reject_upper_slug": False,      # ALL-CAPS slug = category landing page
+    "title_selectors": ["h1", "h2"], # CSS, first one that matches wins
+    "body_selector": "p",            # CSS for the snippet paragraphs
+    "date_selector": None,           # CSS; datetime / content attribute or text
+    "paragraphs": 3,
+    "snippet_chars": 500,
+}
+
+_TAG_NAME_RE = re.compile(r"^[a-z][a-z0-9]*$")
+
+
+class ExtractionProfile:
+    """Compiled link filters and content selectors for one source."""
+
+    def __init__(self, name, settings):
+        self.name = name
+        self.settings = settings
+        self.include = [re.compile(p, re.IGNORECASE) for p in settings["include_url"]]
+        self.exclude = [re.compile(p, re.IGNORECASE) for p in settings["exclude_url"]]
+        self.min_depth = settings["min_depth"]
+        self.max_depth = settings["max_depth"]
+        self.min_slug_length = settings["min_slug_length"]
+        self.reject_upper_slug = settings["reject_upper_slug"]
+        self.title_selectors = list(settings["title_selectors"])
+        self.body_selector = settings["body_selector"]
+        self.date_selector = settings["date_selector"]
+        self.paragraphs = settings["paragraphs"]
+        self.snippet_chars = settings["snippet_chars"]
+
+    def accepts_url(self, url):
+        """Apply include/exclude patterns and path-shape rules to a link."""
+        if self.include and not any(p.search(url) for p in self.include):
+            return False
+        if any(p.search(url) for p in self.exclude):
+            return False
+
+        segments = [s for s in urlparse(url).path.split("/") if s]
+        if len(segments) < self.min_depth:
+            return False
+        if self.max_depth is not None and len(segments) > self.max_depth:
+            return False
+        slug = segments[-1] if segments else ""
+        if len(slug) < self.min_slug_length:
+            return False
+        if self.reject_upper_slug and slug.isupper():
+            return False
+        return True
+
+    @staticmethod
+    def _select(soup, selector, limit=None):
+        # Bare tag names go through find/find_all, which skip the CSS engine
+        if _TAG_NAME_RE.match(selector):
+            return soup.find_all(selector, limit=limit)
+        return soup.select(selector, limit=limit)
+
+    def find_title(self, soup):
+        for selector in self.title_selectors:
+            found = self._select(soup, selector, limit=1)
+            if found:
+                return found[0]
+        return None
+
+    def find_paragraphs(self, soup):
+        return self._select(soup, self.body_selector, limit=self.paragraphs)
+
+    def snippet(self, paragraphs):
+        return " ".join(p.get_text(strip=True) for p in paragraphs)[:self.snippet_chars]
+
+    def find_date(self, soup):
+        """Date from the profile's date_selector, or None (no selector / no match)."""
+        if not self.date_selector:
+            return None
+        found = self._select(soup, self.date_selector, limit=1)
+        if not found:
+            return None
+        tag = found[0]
+        return parse_date(tag.get("datetime") or tag.get("content") or tag.get_text(strip=True))
+
+
+_file_cache = {}
+_profile_cache = {}
+
+
+def _load_overrides(path):
+    if path not in _file_cache:
+        try:
+            with open(path, encoding="utf-8") as f:
+                _file_cache[path] = json.load(f).get("sources", {})
+        except FileNotFoundError:
+            _file_cache[path] = {}
+        except ValueError as e:
+            print(f"⚠️ Ignoring invalid {path}: {e}")
+            _file_cache[path] = {}
+    return _file_cache[path]
+
+
+def source_profile(source_name, defaults, path=None):
+    """
+    Profile for a source: BASE_SETTINGS, then the pipeline's `defaults`,
+    then the source's entry in PROFILES_FILE. Built (and its regexes
+    compiled) once per source and defaults dict.
+    """
+    path = path or PROFILES_FILE
+    key = (source_name, id(defaults), path)
+    profile = _profile_cache.get(key)
+    if profile is None:
+        settings = dict(BASE_SETTINGS)
+        settings.update(defaults)
+        override = _load_overrides(path).get(source_name, {})
+        unknown = set(override) - set(BASE_SETTINGS)
+        if unknown:
+            print(f"⚠️ Unknown profile settings for {source_name}: {', '.join(sorted(unknown))}")
+        settings.update({k: v for k, v in override.items() if k in BASE_SETTINGS})
+        profile = _profile_cache[key] = ExtractionProfile(source_name, settings)
+    return profile
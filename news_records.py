@@ -0,0 +1,252 @@
+import csv
+import datetime
+import glob
+import gzip
+import io
+import os
+import sys
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from news_dates import parse_date
+from news_tags import TAG_COLUMNS, ai_cs_tags
+
+# ============================
+# PIPELINE RECORDS
+# ============================
+
+# Articles flow scrape -> filter -> prioritize -> dedup -> LLM -> CSV as these
+# slotted records instead of dicts / DataFrame rows. Saved rows leave the
+# pipeline as plain dicts (NewsRow.as_dict), the same shape read_daily_csv
+# returns, so the CSV / store / manifest / counter writers take one kind of row.
+
+
+@dataclass(slots=True)
+class Article:
+    """A scraped article on its way to the LLM."""
+    source: str
+    title: str
+    url: str
+    snippet: str = ""
+    published_dt: Optional[datetime.datetime] = None
+    # Set by news_dedup.group_near_duplicates
+    story_id: str = ""
+    duplicate_of: Optional[str] = None
+    history_analysis: Optional[dict] = None
+
+    def __post_init__(self):
+        # A run has thousands of articles but only a dozen sources
+        self.source = sys.intern(self.source)
+
+
+@dataclass(slots=True)
+class Analysis:
+    """LLM verdict for one article (or a reused / PENDING placeholder)."""
+    summary: str = ""
+    engagement: str = "LOW"
+    hook: str = ""
+    is_ai_cs_relevant: bool = False
+
+    @classmethod
+    def from_dict(cls, result):
+        """From the JSON dict the LLM (or pending_analysis / history) returns."""
+        return cls(
+            summary=result.get("summary", ""),
+            engagement=result.get("engagement", "LOW"),
+            hook=result.get("hook", ""),
+            is_ai_cs_relevant=result.get("is_ai_cs_relevant", False),
+        )
+
+
+@dataclass(slots=True)
+class NewsRow:
+    """One line of a daily <prefix>_YYYY-MM-DD.csv."""
+    date_scraped: str
+    source: str
+    title: str
+    url: str
+    published: Optional[datetime.datetime] = None  # UTC, None if unknown
+    story_id: str = ""
+    vendors_hit: str = ""
+    keywords_hit: str = ""
+    summary: str = ""
+    engagement: str = "LOW"
+    hook: str = ""
+    is_ai_cs_relevant: bool = False
+    # news_tags.ai_cs_tags, computed once when the row is built
+    ecosystem_vendors: str = ""
+    ecosystem_layers: str = ""
+    strategic_move: bool = False
+    ai_related: bool = False
+    schema_version: int = 0  # set to SCHEMA_VERSION
+
+    def __post_init__(self):
+        self.source = sys.intern(self.source)
+        self.schema_version = self.schema_version or SCHEMA_VERSION
+
+    @classmethod
+    def build(cls, article, analysis, **extra):
+        """CSV row for an analyzed article, stamped with today's date and tagged."""
+        pub_dt = article.published_dt
+        tags = ai_cs_tags(article.title, analysis.summary, analysis.hook)
+        return cls(
+            date_scraped=datetime.date.today().isoformat(),
+            source=article.source,
+            title=article.title,
+            url=article.url,
+            published=to_utc(pub_dt),
+            story_id=article.story_id,
+            summary=analysis.summary,
+            engagement=analysis.engagement,
+            hook=analysis.hook,
+            is_ai_cs_relevant=analysis.is_ai_cs_relevant,
+            **tags,
+            **extra,
+        )
+
+    def as_dict(self):
+        """Row dict for write_rows / save_daily_rows / the manifest and counter."""
+        return asdict(self)
+
+
+# ============================
+# CSV SCHEMA
+# ============================
+
+# Version of the daily CSV layout, written in every row:
+#   1  files without the column: free-form published dates (any offset or
+#      none), "True"/"False"/missing booleans, no tag columns
+#   2  published as UTC ISO-8601 ("2026-01-27T09:30:00+00:00") or empty
+#      for unknown, booleans as True/False, tag columns, schema_version
+# read_daily_csv() returns typed rows for either; `python news_records.py`
+# rewrites version 1 files in place.
+SCHEMA_VERSION = 2
+
+# Column order of the daily CSVs
+CSV_COLUMNS = [
+    "date_scraped", "source", "title", "url", "published", "story_id",
+    "summary", "engagement", "hook", "is_ai_cs_relevant",
+] + TAG_COLUMNS + ["schema_version"]
+# es_news_*.csv: vendor / keyword hits come right after story_id
+ES_CSV_COLUMNS = CSV_COLUMNS[:6] + ["vendors_hit", "keywords_hit"] + CSV_COLUMNS[6:]
+
+
+# ============================
+# CSV OUTPUT
+# ============================
+
+BOOL_COLUMNS = ("is_ai_cs_relevant", "strategic_move", "ai_related")
+
+
+def to_utc(dt):
+    """Aware UTC datetime (second precision), or None. Naive values are taken as UTC."""
+    if not isinstance(dt, datetime.datetime) or dt != dt:  # NaT never equals itself
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.astimezone(datetime.timezone.utc).replace(microsecond=0)
+
+
+def _format(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(timespec="seconds")
+    return value
+
+
+def open_csv(path, mode="r"):
+    """
+    Text handle on a daily CSV, or on a gzip-compressed one (monthly
+    archives, *.gz). Archives are written with a zero gzip timestamp so the
+    same rows always give the same bytes.
+    """
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.GzipFile(path, mode + "b", mtime=0), encoding="utf-8", newline="")
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def write_rows(filename, rows, columns=CSV_COLUMNS):
+    """
+    Write row dicts (NewsRow.as_dict or read_daily_csv rows) to a daily
+    CSV (gzip-compressed if filename ends in .gz) in the current schema.
+    Missing columns and None are written empty.
+    """
+    with open_csv(filename, "w") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([_format(row.get(col)) for col in columns])
+
+
+def _typed(raw, version):
+    row = dict(raw)
+    if version >= 2:
+        published = row.get("published")
+        row["published"] = datetime.datetime.fromisoformat(published) if published else None
+        for col in BOOL_COLUMNS:
+            row[col] = row.get(col) == "True"
+    else:
+        # Version 1: whatever the pipeline wrote at the time
+        row["published"] = to_utc(parse_date(row.get("published") or ""))
+        row["is_ai_cs_relevant"] = str(row.get("is_ai_cs_relevant") or "").strip().lower() in ("true", "1", "yes")
+        if not row.get("ai_related"):
+            row.update(ai_cs_tags(row.get("title"), row.get("summary"), row.get("hook")))
+        else:
+            for col in ("strategic_move", "ai_related"):
+                row[col] = row[col] == "True"
+    row["schema_version"] = SCHEMA_VERSION
+    return row
+
+
+def read_daily_csv(path):
+    """
+    Rows of a daily CSV as dicts with typed values, whatever its schema
+    version: published is an aware UTC datetime or None, BOOL_COLUMNS are
+    bools, tag columns are filled in. Monthly archives (.csv.gz) read the same.
+    """
+    with open_csv(path) as f:
+        rows = []
+        for raw in csv.DictReader(f):
+            version = int(raw.get("schema_version") or 1)
+            rows.append(_typed(raw, version))
+    return rows
+
+
+# ============================
+# MIGRATION
+# ============================
+
+def migrate_daily_csv(path):
+    """
+    Rewrite a daily CSV in the current schema (no-op if it already is).
+    Returns True if the file was rewritten.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        header = reader.fieldnames or []
+        first = next(reader, None)
+    if first is not None and int(first.get("schema_version") or 1) >= SCHEMA_VERSION:
+        return False
+    if first is None and "schema_version" in header:
+        return False
+    columns = ES_CSV_COLUMNS if "vendors_hit" in header else CSV_COLUMNS
+    rows = read_daily_csv(path)
+    tmp = f"{path}.tmp"
+    write_rows(tmp, rows, columns)
+    os.replace(tmp, path)
+    return True
+
+
+if __name__ == "__main__":
+    # python news_records.py [files...] -> migrate daily CSVs (default: all here) to SCHEMA_VERSION
+    paths = sys.argv[1:] or sorted(glob.glob("*_news_*.csv"))
+    migrated = 0
+    for path in paths:
+        try:
+            if migrate_daily_csv(path):
+                migrated += 1
+                print(f"✅ {path}")
+        except (OSError, ValueError, csv.Error) as e:
+            print(f"⚠️ Could not migrate {path}: {e}")
+    print(f"Migrated {migrated} of {len(paths)} file(s) to schema version {SCHEMA_VERSION}")
@@ -0,0 +1,169 @@
+import datetime
+import json
+import os
+
+from news_archive import daily_rows
+from news_dates import parse_date
+from news_records import read_daily_csv
+from news_urls import canonical_url
+
+# ============================
+# POLLING SCHEDULE CONFIG
+# ============================
+
+# Per-source poll state (last poll, interval, estimated rate), per pipeline
+SCHEDULE_FILE = os.getenv("SCHEDULE_FILE", "poll_schedule.json")
+
+# Interval bounds. The pipelines also cap the interval at half their
+# MAX_AGE_HOURS so a quiet source is polled before its articles leave the window.
+POLL_MIN_HOURS = float(os.getenv("POLL_MIN_HOURS", "2"))
+POLL_MAX_HOURS = float(os.getenv("POLL_MAX_HOURS", "48"))
+
+# Poll when a source has (on average) published this many new articles
+POLL_TARGET_ARTICLES = float(os.getenv("POLL_TARGET_ARTICLES", "3"))
+
+# Days of saved CSVs used to estimate publication rates
+RATE_HISTORY_DAYS = 14
+
+# Cron jitter: a source is due slightly before its interval has fully passed
+DUE_SLACK = 0.9
+
+# POLL_ALL=1 ignores the schedule and polls every source (manual runs)
+POLL_ALL = os.getenv("POLL_ALL", "").lower() in ("1", "true", "yes")
+
+
+# ============================
+# PUBLICATION RATES
+# ============================
+
+def estimate_publication_rates(file_prefix, days=RATE_HISTORY_DAYS, now=None):
+    """
+    Articles per hour for each source, from the `published` timestamps of
+    distinct articles in the last `days` of daily CSVs / archives (e.g. "es_news").
+    The observed span runs from the oldest file used to now.
+    """
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+    cutoff = now - datetime.timedelta(days=days)
+
+    seen = {}  # source -> set of canonical URLs
+    oldest = None
+    for date_str, row in daily_rows(file_prefix, since=cutoff.date()):
+        file_date = datetime.datetime.fromisoformat(date_str).replace(tzinfo=datetime.timezone.utc)
+        if file_date < cutoff:
+            continue
+        oldest = file_date if oldest is None else min(oldest, file_date)
+
+        published = row["published"]
+        if published is None or published < cutoff:
+            continue
+        seen.setdefault(row.get("source", ""), set()).add(canonical_url(row.get("url", "")))
+
+    if oldest is None:
+        return {}
+    span_hours = max(24.0, (now - oldest).total_seconds() / 3600)
+    return {source: len(urls) / span_hours for source, urls in seen.items()}
+
+
+def poll_interval_hours(rate, min_hours=POLL_MIN_HOURS, max_hours=POLL_MAX_HOURS):
+    """Hours between polls: long enough to expect POLL_TARGET_ARTICLES new stories."""
+    if not rate:
+        return max_hours
+    return max(min_hours, min(max_hours, POLL_TARGET_ARTICLES / rate))
+
+
+# ============================
+# SCHEDULE STATE
+# ============================
+
+def load_schedule(path=None):
+    try:
+        with open(path or SCHEDULE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_schedule(schedule, path=None):
+    path = path or SCHEDULE_FILE
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(schedule, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ Could not save poll schedule: {e}")
+
+
+def due_sources(file_prefix, sources, max_interval_hours=None, now=None):
+    """
+    Decide which of a pipeline's sources (state keyed by its CSV prefix,
+    e.g. "ccaas_news") to poll this run.
+    Returns (due_source_names, schedule); pass the schedule to mark_polled
+    with the sources that were actually reached.
+    """
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+    max_hours = POLL_MAX_HOURS if max_interval_hours is None else min(POLL_MAX_HOURS, max_interval_hours)
+    min_hours = min(POLL_MIN_HOURS, max_hours)
+
+    schedule = load_schedule()
+    state = schedule.setdefault(file_prefix, {})
+    rates = estimate_publication_rates(file_prefix, now=now)
+
+    due, waiting = [], []
+    for source in sources:
+        entry = state.setdefault(source, {})
+        rate = rates.get(source, 0.0)
+        interval = poll_interval_hours(rate, min_hours, max_hours)
+        entry["rate_per_day"] = round(rate * 24, 2)
+        entry["interval_hours"] = round(interval, 2)
+
+        last = parse_date(entry.get("last_polled") or "")
+        if last is None or POLL_ALL:
+            due.append(source)
+            continue
+        next_poll = last + datetime.timedelta(hours=interval * DUE_SLACK)
+        if now >= next_poll:
+            due.append(source)
+        else:
+            waiting.append((source, (next_poll - now).total_seconds() / 3600))
+
+    if waiting:
+        later = ", ".join(f"{s} in {h:.0f}h" for s, h in sorted(waiting, key=lambda w: w[1]))
+        print(f"🗓️ Polling {len(due)}/{len(due) + len(waiting)} sources this run (next: {later})")
+    return due, schedule
+
+
+def mark_polled(schedule, file_prefix, sources, now=None):
+    """
+    Record a successful poll of `sources` and persist the schedule. Only pass
+    sources whose feed or landing page was fetched: the others keep their
+    last poll time and are due again on the next run.
+    """
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+    state = schedule.setdefault(file_prefix, {})
+    for source in sources:
+        state.setdefault(source, {})["last_polled"] = now.isoformat(timespec="seconds")
+    save_schedule(schedule)
+
+
+# ============================
+# PARTIAL RUNS
+# ============================
+
+def carried_over_rows(filename, new_rows):
+    """
+    Rows an earlier run already saved to today's CSV that this run did not
+    produce again (by canonical URL): with per-source schedules a run may
+    poll only some sources, and must not wipe what was found this morning.
+    """
+    if not os.path.exists(filename):
+        return []
+    new_keys = {canonical_url(row.get("url", "")) for row in new_rows}
+    try:
+        return [row for row in read_daily_csv(filename) if canonical_url(row.get("url", "")) not in new_keys]
+    except Exception as e:
+        print(f"⚠️ Could not read {filename} to keep earlier rows: {e}")
+        return []
@@ -0,0 +1,560 @@
+import argparse
+import csv
+import datetime
+import glob
+import os
+import re
+import sqlite3
+
+from news_records import (
+    BOOL_COLUMNS, CSV_COLUMNS, ES_CSV_COLUMNS, SCHEMA_VERSION, read_daily_csv, to_utc, write_rows,
+)
+from news_tags import ai_cs_tags
+from news_urls import canonical_url
+
+# ============================
+# ARTICLE STORE CONFIG
+# ============================
+
+# Embedded SQLite store the dashboard queries. The daily CSVs stay the
+# exchange format (they are what gets pushed to GitHub); the pipelines write
+# each day's rows here too, and CSVs that arrive another way (git pull on
+# Streamlit Cloud) are imported by sync_csv_files().
+STORE_FILE = os.getenv("NEWS_STORE_FILE", "news_radar.db")
+
+# Pipeline file prefix -> dashboard category label
+VERTICALS = {
+    "ccaas_news": "CCaaS",
+    "es_news": "ES",
+    "cx_ai_news": "CX AI",
+}
+
+COLUMNS_BY_VERTICAL = {
+    "ccaas_news": CSV_COLUMNS,
+    "es_news": ES_CSV_COLUMNS,
+    "cx_ai_news": CSV_COLUMNS,
+}
+
+_DAILY_FILE_RE = re.compile(r"^(%s)_(\d{4}-\d{2}-\d{2})\.csv$" % "|".join(VERTICALS))
+# Closed months compacted by news_archive: <prefix>_YYYY-MM.csv.gz
+_ARCHIVE_FILE_RE = re.compile(r"^(%s)_(\d{4}-\d{2})\.csv\.gz$" % "|".join(VERTICALS))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url_key     TEXT PRIMARY KEY,   -- news_urls.canonical_url
+    url         TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    published   TEXT,               -- UTC ISO-8601, NULL if unknown
+    first_seen  TEXT NOT NULL       -- first date_scraped
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    url_key           TEXT NOT NULL REFERENCES articles(url_key),
+    vertical          TEXT NOT NULL,  -- pipeline prefix, e.g. "ccaas_news"
+    date_scraped      TEXT NOT NULL,  -- date of the daily file
+    story_id          TEXT,
+    vendors_hit       TEXT,
+    keywords_hit      TEXT,
+    summary           TEXT,
+    engagement        TEXT,
+    hook              TEXT,
+    is_ai_cs_relevant INTEGER,
+    ecosystem_vendors TEXT,           -- news_tags.ai_cs_tags
+    ecosystem_layers  TEXT,
+    strategic_move    INTEGER,
+    ai_related        INTEGER,
+    PRIMARY KEY (url_key, vertical, date_scraped)
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published);
+CREATE INDEX IF NOT EXISTS idx_analyses_date ON analyses(date_scraped);
+CREATE INDEX IF NOT EXISTS idx_analyses_vertical_date ON analyses(vertical, date_scraped);
+CREATE INDEX IF NOT EXISTS idx_analyses_engagement ON analyses(engagement);
+CREATE TABLE IF NOT EXISTS imported_files (
+    path   TEXT PRIMARY KEY,
+    mtime  REAL NOT NULL,
+    rows   INTEGER NOT NULL
+);
+"""
+
+# Full-text index over title / summary / hook, one entry per analyses row
+# (same rowid), kept in step by triggers so every write path updates it.
+# Needs an SQLite built with FTS5; without it the store works minus search.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts USING fts5(
+    title, summary, hook,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS analyses_fts_insert AFTER INSERT ON analyses BEGIN
+    INSERT INTO analyses_fts (rowid, title, summary, hook)
+    VALUES (new.rowid, (SELECT title FROM articles WHERE url_key = new.url_key), new.summary, new.hook);
+END;
+CREATE TRIGGER IF NOT EXISTS analyses_fts_delete AFTER DELETE ON analyses BEGIN
+    DELETE FROM analyses_fts WHERE rowid = old.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_title AFTER UPDATE OF title ON articles
+WHEN new.title IS NOT old.title BEGIN
+    UPDATE analyses_fts SET title = new.title
+    WHERE rowid IN (SELECT rowid FROM analyses WHERE url_key = new.url_key);
+END;
+"""
+
+# Markers search_rows() puts around matched words (control characters, so
+# they survive HTML escaping and cannot clash with article text)
+HIGHLIGHT_START, HIGHLIGHT_END = "\x02", "\x03"
+
+SEARCH_LIMIT = 100
+
+
+# ============================
+# CONNECTION
+# ============================
+
+def connect(path=None):
+    """Open (and create if needed) the store in WAL mode."""
+    conn = sqlite3.connect(path or STORE_FILE, timeout=30)
+    conn.row_factory = sqlite3.Row
+    # WAL: the dashboard can read while a pipeline is writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # INSERT OR REPLACE must fire the delete trigger of the row it replaces
+    conn.execute("PRAGMA recursive_triggers=ON")
+    conn.executescript(SCHEMA)
+    _add_tag_columns(conn)
+    try:
+        created = not has_search(conn)
+        conn.executescript(SEARCH_SCHEMA)
+        if created:
+            rebuild_search_index(conn)
+    except sqlite3.OperationalError:
+        pass  # no FTS5 in this SQLite build
+    return conn
+
+
+# Columns added to analyses after the first release: name -> SQL type
+_ADDED_COLUMNS = {
+    "ecosystem_vendors": "TEXT",
+    "ecosystem_layers": "TEXT",
+    "strategic_move": "INTEGER",
+    "ai_related": "INTEGER",
+}
+
+
+def _add_tag_columns(conn):
+    """Add the tag columns to a store created before them, and tag its rows once."""
+    existing = {r["name"] for r in conn.execute("PRAGMA table_info(analyses)")}
+    missing = [c for c in _ADDED_COLUMNS if c not in existing]
+    if not missing:
+        return
+    with conn:
+        for column in missing:
+            conn.execute(f"ALTER TABLE analyses ADD COLUMN {column} {_ADDED_COLUMNS[column]}")
+        rows = conn.execute("""
+            SELECT an.rowid, ar.title, an.summary, an.hook
+            FROM analyses an JOIN articles ar ON ar.url_key = an.url_key
+        """).fetchall()
+        conn.executemany(
+            "UPDATE analyses SET ecosystem_vendors = ?, ecosystem_layers = ?, strategic_move = ?, ai_related = ? "
+            "WHERE rowid = ?",
+            [(*_tag_values(ai_cs_tags(r["title"], r["summary"], r["hook"])), r["rowid"]) for r in rows],
+        )
+
+
+def _tag_values(tags):
+    return (tags["ecosystem_vendors"], tags["ecosystem_layers"],
+            int(tags["strategic_move"]), int(tags["ai_related"]))
+
+
+def has_search(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'analyses_fts'").fetchone() is not None
+
+
+def rebuild_search_index(conn):
+    """Repopulate the full-text index from the store (first use on an existing store)."""
+    with conn:
+        conn.execute("DELETE FROM analyses_fts")
+        conn.execute("""
+            INSERT INTO analyses_fts (rowid, title, summary, hook)
+            SELECT an.rowid, ar.title, an.summary, an.hook
+            FROM analyses an JOIN articles ar ON ar.url_key = an.url_key
+        """)
+
+
+# ============================
+# WRITING
+# ============================
+
+def replace_day(conn, vertical, date_str, rows):
+    """
+    Replace the analyses of one vertical for one day with `rows` (row
+    dicts from NewsRow.as_dict or news_records.read_daily_csv, i.e. typed and tagged),
+    upserting their articles. Returns the number of rows stored.
+    """
+    conn.execute("DELETE FROM analyses WHERE vertical = ? AND date_scraped = ?", (vertical, date_str))
+    stored = 0
+    for row in rows:
+        url = str(row.get("url") or "").strip()
+        if not url:
+            continue
+        key = canonical_url(url)
+        published = to_utc(row.get("published"))
+        conn.execute(
+            """
+            INSERT INTO articles (url_key, url, title, source, published, first_seen)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url_key) DO UPDATE SET
+                title = excluded.title,
+                source = excluded.source,
+                published = COALESCE(excluded.published, articles.published),
+                first_seen = MIN(articles.first_seen, excluded.first_seen)
+            """,
+            (key, url, str(row.get("title") or ""), str(row.get("source") or ""),
+             published.isoformat() if published else None, date_str),
+        )
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO analyses (
+                url_key, vertical, date_scraped, story_id, vendors_hit, keywords_hit,
+                summary, engagement, hook, is_ai_cs_relevant,
+                ecosystem_vendors, ecosystem_layers, strategic_move, ai_related
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (key, vertical, date_str, row.get("story_id") or None,
+             row.get("vendors_hit") or None, row.get("keywords_hit") or None,
+             row.get("summary") or "", row.get("engagement") or "LOW",
+             row.get("hook") or "", int(row.get("is_ai_cs_relevant")),
+             *_tag_values(row)),
+        )
+        stored += 1
+    return stored
+
+
+def replace_month(conn, vertical, month, rows):
+    """
+    Replace the analyses of one vertical for a whole month ("YYYY-MM")
+    with the rows of its archive, day by day. Returns the number of rows
+    stored.
+    """
+    conn.execute(
+        "DELETE FROM analyses WHERE vertical = ? AND date_scraped BETWEEN ? AND ?",
+        (vertical, f"{month}-01", f"{month}-31"),
+    )
+    by_date = {}
+    for row in rows:
+        by_date.setdefault(row.get("date_scraped") or f"{month}-01", []).append(row)
+    return sum(replace_day(conn, vertical, date_str, day_rows) for date_str, day_rows in sorted(by_date.items()))
+
+
+def _mark_imported(conn, path, rows):
+    conn.execute(
+        "INSERT OR REPLACE INTO imported_files (path, mtime, rows) VALUES (?, ?, ?)",
+        (os.path.abspath(path), os.path.getmtime(path), rows),
+    )
+
+
+def save_daily_rows(vertical, date_str, rows, csv_path=None):
+    """
+    Pipelines: store the rows just written to today's CSV (including rows
+    carried over from earlier runs) and record the CSV as imported.
+    A store failure never fails the run; the CSV is still there.
+    """
+    try:
+        conn = connect()
+        with conn:
+            stored = replace_day(conn, vertical, date_str, rows)
+            if csv_path and os.path.exists(csv_path):
+                _mark_imported(conn, csv_path, stored)
+        conn.close()
+        print(f"🗄️ Stored {stored} rows in {STORE_FILE}")
+    except sqlite3.Error as e:
+        print(f"⚠️ Could not update {STORE_FILE}: {e}")
+
+
+def parse_daily_filename(path):
+    """(vertical, "YYYY-MM-DD") for a daily <prefix>_YYYY-MM-DD.csv, else None."""
+    match = _DAILY_FILE_RE.match(os.path.basename(path))
+    return match.groups() if match else None
+
+
+def parse_archive_filename(path):
+    """(vertical, "YYYY-MM") for a monthly <prefix>_YYYY-MM.csv.gz, else None."""
+    match = _ARCHIVE_FILE_RE.match(os.path.basename(path))
+    return match.groups() if match else None
+
+
+def news_file_sort_key(path):
+    """Archives first, so a daily file of an archived month is applied on top of it."""
+    return (not parse_archive_filename(path), os.path.basename(path))
+
+
+def import_csv(conn, path):
+    """
+    Load one daily CSV (vertical and date from its filename), or a monthly
+    archive (replaces the whole month of that vertical).
+    """
+    daily, archive = parse_daily_filename(path), parse_archive_filename(path)
+    if not daily and not archive:
+        raise ValueError(f"Not a daily news file: {path}")
+    rows = read_daily_csv(path)
+    with conn:
+        if daily:
+            stored = replace_day(conn, *daily, rows)
+        else:
+            stored = replace_month(conn, *archive, rows)
+        _mark_imported(conn, path, stored)
+    return stored
+
+
+def sync_csv_files(directory=".", conn=None):
+    """
+    Import daily CSVs and monthly archives that are new or changed (by
+    mtime) since the last import. Returns the number of files imported.
+    """
+    own = conn is None
+    conn = conn or connect()
+    known = {r["path"]: r["mtime"] for r in conn.execute("SELECT path, mtime FROM imported_files")}
+    imported = 0
+    paths = glob.glob(os.path.join(directory, "*_news_*.csv")) + glob.glob(os.path.join(directory, "*_news_*.csv.gz"))
+    for path in sorted(paths, key=news_file_sort_key):
+        if not parse_daily_filename(path) and not parse_archive_filename(path):
+            continue
+        if known.get(os.path.abspath(path)) == os.path.getmtime(path):
+            continue
+        try:
+            import_csv(conn, path)
+            imported += 1
+        except (OSError, csv.Error, sqlite3.Error) as e:
+            print(f"⚠️ Could not import {path}: {e}")
+    if own:
+        conn.close()
+    return imported
+
+
+# ============================
+# QUERIES
+# ============================
+
+_ROW_COLUMNS = """
+    an.date_scraped, ar.source, ar.title, ar.url, ar.published, an.story_id,
+    an.vendors_hit, an.keywords_hit, an.summary, an.engagement, an.hook,
+    an.is_ai_cs_relevant, an.ecosystem_vendors, an.ecosystem_layers,
+    an.strategic_move, an.ai_related, an.vertical
+"""
+
+
+def _typed_row(r):
+    """Store row -> dict typed like news_records.read_daily_csv rows."""
+    row = dict(r)
+    for col in BOOL_COLUMNS:
+        row[col] = bool(row[col])
+    row["published"] = datetime.datetime.fromisoformat(row["published"]) if row["published"] else None
+    row["schema_version"] = SCHEMA_VERSION
+    return row
+
+
+def query_rows(conn, vertical=None, date_from=None, date_to=None, published_since=None):
+    """
+    Analyzed rows as dicts, newest scrape first, one per canonical URL and
+    vertical (the most recent day's analysis wins).
+    - date_from / date_to: inclusive date_scraped bounds ("YYYY-MM-DD")
+    - published_since: datetime; undated articles are always kept
+    """
+    where, params = [], []
+    if vertical:
+        where.append("an.vertical = ?")
+        params.append(vertical)
+    if date_from:
+        where.append("an.date_scraped >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("an.date_scraped <= ?")
+        params.append(date_to)
+    if published_since is not None:
+        where.append("(ar.published IS NULL OR ar.published >= ?)")
+        params.append(published_since.astimezone(datetime.timezone.utc).isoformat(timespec="seconds"))
+
+    sql = f"""
+        SELECT * FROM (
+            SELECT {_ROW_COLUMNS}, an.rowid AS seq,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY an.vertical, an.url_key ORDER BY an.date_scraped DESC
+                   ) AS copy
+            FROM analyses an JOIN articles ar ON ar.url_key = an.url_key
+            {"WHERE " + " AND ".join(where) if where else ""}
+        ) WHERE copy = 1
+        ORDER BY date_scraped DESC, vertical, seq
+    """
+    rows = []
+    for r in conn.execute(sql, params):
+        row = _typed_row(r)
+        del row["copy"], row["seq"]
+        rows.append(row)
+    return rows
+
+
+_SEARCH_TERM_RE = re.compile(r'"([^"]+)"|([^\s"]+)')
+
+
+def _search_terms(text):
+    """Typed search text -> list of terms, each a list of words (phrase if > 1)."""
+    terms = []
+    for phrase, word in _SEARCH_TERM_RE.findall(text):
+        if phrase:
+            words = re.findall(r"\w+", phrase)
+            if words:
+                terms.append(words)
+        else:
+            terms.extend([part] for part in re.findall(r"\w+", word))
+    return terms
+
+
+def _match_query(terms):
+    """
+    FTS5 query: every term must match, phrases as a phrase, words of 3+
+    characters as a prefix ("genesys" finds "Genesys'"; "a" only "a").
+    Built from \w+ tokens only, so never a syntax error.
+    """
+    parts = []
+    for t in terms:
+        if len(t) > 1:
+            parts.append('"%s"' % " ".join(t))
+        else:
+            parts.append(f'"{t[0]}"*' if len(t[0]) >= 3 else f'"{t[0]}"')
+    return " ".join(parts)
+
+
+def _stem(word):
+    # Rough match for the porter tokenizer: "partnerships" should also
+    # highlight "partnership"
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.lower().endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def _highlighter(terms):
+    patterns = []
+    for t in terms:
+        if len(t) == 1 and len(t[0]) < 3:
+            patterns.append(re.escape(t[0]) + r"\b")
+        else:
+            patterns.append(r"\W+".join(re.escape(_stem(w)) for w in t) + r"\w*")
+    return re.compile(r"\b(?:%s)" % "|".join(patterns), re.IGNORECASE)
+
+
+def search_rows(conn, text, verticals=None, engagements=None, date_from=None, date_to=None,
+                limit=SEARCH_LIMIT):
+    """
+    Full-text search over title, summary and hook, best match first (BM25,
+    title weighted highest), one row per canonical URL and vertical (the
+    most recent analysis). Rows are query_rows() dicts plus title_hl /
+    summary_hl / hook_hl with matched words wrapped in HIGHLIGHT_START /
+    HIGHLIGHT_END.
+    - verticals / engagements: lists to keep, None = all
+    - date_from / date_to: inclusive date_scraped bounds ("YYYY-MM-DD")
+    """
+    terms = _search_terms(text)
+    if not terms or not has_search(conn):
+        return []
+    where, params = ["analyses_fts MATCH ?"], [_match_query(terms)]
+    if verticals:
+        where.append("an.vertical IN (%s)" % ",".join("?" * len(verticals)))
+        params.extend(verticals)
+    if engagements:
+        where.append("an.engagement IN (%s)" % ",".join("?" * len(engagements)))
+        params.extend(engagements)
+    if date_from:
+        where.append("an.date_scraped >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("an.date_scraped <= ?")
+        params.append(date_to)
+    # Only the most recent analysis of each URL per vertical (PK lookup)
+    newer = "newer.url_key = an.url_key AND newer.vertical = an.vertical AND newer.date_scraped > an.date_scraped"
+    if date_to:
+        newer += " AND newer.date_scraped <= ?"
+        params.append(date_to)
+    where.append(f"NOT EXISTS (SELECT 1 FROM analyses newer WHERE {newer})")
+
+    sql = f"""
+        SELECT {_ROW_COLUMNS}
+        FROM analyses_fts
+        JOIN analyses an ON an.rowid = analyses_fts.rowid
+        JOIN articles ar ON ar.url_key = an.url_key
+        WHERE {" AND ".join(where)}
+        ORDER BY bm25(analyses_fts, 10.0, 3.0, 1.0)
+        LIMIT ?
+    """
+    # Highlighting in Python: FTS5 highlight() would be evaluated for every
+    # match before the LIMIT, not just for the rows returned
+    mark = _highlighter(terms)
+    rows = []
+    for r in conn.execute(sql, [*params, limit]):
+        row = _typed_row(r)
+        for col in ("title", "summary", "hook"):
+            row[f"{col}_hl"] = mark.sub(lambda m: HIGHLIGHT_START + m.group(0) + HIGHLIGHT_END, row[col] or "")
+        rows.append(row)
+    return rows
+
+
+def total_articles(conn):
+    """Distinct articles (canonical URLs) ever collected."""
+    return conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+
+# ============================
+# EXPORT
+# ============================
+
+def export_csvs(conn, directory):
+    """Write the store back out as daily <prefix>_YYYY-MM-DD.csv files."""
+    os.makedirs(directory, exist_ok=True)
+    written = 0
+    days = conn.execute("SELECT DISTINCT vertical, date_scraped FROM analyses ORDER BY 1, 2").fetchall()
+    for vertical, date_str in days:
+        columns = COLUMNS_BY_VERTICAL.get(vertical, CSV_COLUMNS)
+        rows = conn.execute(f"""
+            SELECT {_ROW_COLUMNS} FROM analyses an JOIN articles ar ON ar.url_key = an.url_key
+            WHERE an.vertical = ? AND an.date_scraped = ?
+            ORDER BY an.rowid
+        """, (vertical, date_str)).fetchall()
+        path = os.path.join(directory, f"{vertical}_{date_str}.csv")
+        write_rows(path, [_typed_row(r) for r in rows], columns)
+        written += 1
+    return written
+
+
+if __name__ == "__main__":
+    # python news_store.py import [files...]  -> load daily CSVs / archives (default: all changed ones)
+    # python news_store.py export DIR         -> write the store back out as daily CSVs
+    # python news_store.py search "TEXT"      -> full-text search, with timing
+    parser = argparse.ArgumentParser(description="Import / export the news article store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import")
+    imp.add_argument("files", nargs="*")
+    exp = sub.add_parser("export")
+    exp.add_argument("directory")
+    find = sub.add_parser("search")
+    find.add_argument("text")
+    args = parser.parse_args()
+
+    conn = connect()
+    if args.command == "import":
+        if args.files:
+            for path in args.files:
+                print(f"{path}: {import_csv(conn, path)} rows")
+        else:
+            print(f"Imported {sync_csv_files(conn=conn)} changed file(s)")
+        print(f"{total_articles(conn)} articles in {STORE_FILE}")
+    elif args.command == "export":
+        print(f"Exported {export_csvs(conn, args.directory)} daily files to {args.directory}")
+    else:
+        import time
+        started = time.perf_counter()
+        rows = search_rows(conn, args.text)
+        elapsed = (time.perf_counter() - started) * 1000
+        for row in rows[:20]:
+            title = row["title_hl"].replace(HIGHLIGHT_START, "[").replace(HIGHLIGHT_END, "]")
+            print(f"{row['date_scraped']}  {row['vertical']:<10} {row['engagement']:<7} {title}")
+        print(f"{len(rows)} result(s) in {elapsed:.1f} ms")
+    conn.close()
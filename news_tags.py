@@ -0,0 +1,122 @@
+import re
+
+# ============================
+# AI IN CS ECOSYSTEM VOCABULARY
+# ============================
+
+# AI CS Ecosystem vendors by layer (from Q4 2025 Ecosystem Map)
+AI_CS_ECOSYSTEM_VENDORS = {
+    # CS Platforms (Helpdesks/CRMs)
+    'CS Platforms': ['Zendesk', 'Salesforce', 'Microsoft', 'HubSpot', 'Freshworks',
+                     'ServiceNow', 'Intercom', 'Gorgias'],
+    # CC Platforms
+    'CCaaS': ['Genesys', 'NICE', 'Five9', 'RingCentral', '8x8'],
+    'CPaaS': ['Twilio', 'Vonage', 'Infobip'],
+    # AI Agents (Autonomous)
+    'AI Agents': ['Sierra', 'Ada', 'Crescendo', 'Decagon', 'Forethought', 'PolyAI', 'ASAPP'],
+    # Conversational AI Agent Builders
+    'Conversational AI': ['Kore.ai', 'Yellow.ai', 'Cognigy', 'Capacity', 'Replicant', 'Parloa'],
+    # Agent Assist & Workforce Intel
+    'Agent Assist': ['Cresta', 'Uniphore', 'Observe.AI', 'Gong', 'Assembled', 'Calabrio'],
+    # Knowledge Management Platforms
+    'Knowledge Management': ['Guru', 'Document360', 'eGain', 'Confluence', 'KMS Lighthouse', 'Shelf', 'Notion'],
+    # AI Infrastructure Providers
+    'AI Infrastructure': ['OpenAI', 'Gemini', 'LLaMA', 'AWS', 'Microsoft Azure', 'Google Cloud',
+                          'Google Cloud Platform', 'Databricks', 'Snowflake']
+}
+
+# Strategic movement keywords
+STRATEGIC_MOVEMENT_KEYWORDS = [
+    'acquisition', 'acquired', 'merger', 'partnership', 'partners with', 'partnered',
+    'announces', 'launches', 'releases', 'unveils', 'introduces', 'rolls out',
+    'investment', 'funding', 'raises', 'strategic', 'alliance', 'strategic partnership',
+    'integration', 'collaboration', 'joint venture', 'teams up', 'joins forces'
+]
+
+# AI-related keywords
+AI_KEYWORDS = [
+    'ai', 'artificial intelligence', 'machine learning', 'llm', 'gpt', 'chatgpt',
+    'agentic', 'copilot', 'autonomous', 'generative ai', 'genai', 'neural',
+    'deep learning', 'natural language', 'nlp', 'conversational ai', 'voice ai',
+    'ai agent', 'ai chatbot', 'ai assistant', 'ai-powered', 'ai-driven'
+]
+
+# Columns every daily CSV / store row carries, filled by ai_cs_tags()
+TAG_COLUMNS = ["ecosystem_vendors", "ecosystem_layers", "strategic_move", "ai_related"]
+
+
+# ============================
+# MATCHER
+# ============================
+
+class TermMatcher:
+    """
+    Finds every term of a vocabulary in a text in one pass of a single
+    compiled regex. Terms match case-insensitively as whole words ("ai" not
+    in "said", "sap" not in "sapphire"); spaces in a term match any run of
+    whitespace.
+    """
+
+    def __init__(self, terms):
+        # terms: list of terms, or {label: [terms]} (e.g. ecosystem layer)
+        groups = terms.items() if isinstance(terms, dict) else [(None, terms)]
+        self.names = {}   # lower-case term -> term as written in the vocabulary
+        self.labels = {}  # lower-case term -> labels
+        for label, group in groups:
+            for term in group:
+                key = term.lower()
+                self.names.setdefault(key, term)
+                if label is not None:
+                    self.labels.setdefault(key, set()).add(label)
+
+        # Longest first, so "bmc helix" wins over "bmc" at the same position
+        ordered = sorted(self.names, key=len, reverse=True)
+        alternatives = "|".join(r"\s+".join(map(re.escape, t.split())) for t in ordered)
+        self.pattern = re.compile(r"(?<!\w)(?:%s)(?!\w)" % alternatives, re.IGNORECASE)
+
+        # A match also implies the shorter terms inside it ("bmc helix" ->
+        # "bmc"), as an Aho-Corasick scan reporting overlaps would
+        self.implied = {
+            t: {s for s in self.names if s != t and re.search(r"(?<!\w)%s(?!\w)" % re.escape(s), t)}
+            for t in self.names
+        }
+
+    def find(self, text):
+        """Set of vocabulary terms (lower-case) found in text."""
+        found = set()
+        for match in self.pattern.finditer(text or ""):
+            key = " ".join(match.group(0).lower().split())
+            found.add(key)
+            found.update(self.implied.get(key, ()))
+        return found
+
+    def display(self, found):
+        """Found terms as written in the vocabulary, sorted."""
+        return sorted(self.names[t] for t in found)
+
+    def labels_for(self, found):
+        return sorted({label for t in found for label in self.labels.get(t, ())})
+
+
+ECOSYSTEM_MATCHER = TermMatcher(AI_CS_ECOSYSTEM_VENDORS)
+STRATEGIC_MATCHER = TermMatcher(STRATEGIC_MOVEMENT_KEYWORDS)
+AI_MATCHER = TermMatcher(AI_KEYWORDS)
+
+
+# ============================
+# TAGGING
+# ============================
+
+def ai_cs_tags(*texts):
+    """
+    Ecosystem vendors and layers, strategic-move and AI flags for an
+    article's text (title, summary, hook), as the TAG_COLUMNS values.
+    """
+    text = " ".join(t for t in texts if t)
+    vendors = ECOSYSTEM_MATCHER.find(text)
+    return {
+        "ecosystem_vendors": ", ".join(ECOSYSTEM_MATCHER.display(vendors)),
+        "ecosystem_layers": ", ".join(ECOSYSTEM_MATCHER.labels_for(vendors)),
+        "strategic_move": bool(STRATEGIC_MATCHER.pattern.search(text)),
+        "ai_related": bool(AI_MATCHER.pattern.search(text)),
+    }
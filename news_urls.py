@@ -0,0 +1,211 @@
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# ============================
+# CANONICALIZATION RULES
+# ============================
+
+# Query parameters dropped on every site: click ids and analytics keys of
+# the big ad / email / analytics platforms, which never identify an article.
+# Generic names (source, src, ref, tid, output, share, campaign, ...) can be
+# real parameters elsewhere, so they are only dropped per domain (drop_params).
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_gl",
+    "ref_src", "cmpid", "mkt_tok", "hsenc", "_hsenc", "_hsmi", "hsctatracking",
+    "amp", "__twitter_impression", "s_kwcid",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_", "oly_")
+
+# Per-domain rules (keys are hosts without "www.")
+#   drop_query: the site never uses the query string to identify an article
+#   keep_params: only these parameters are kept (everything else dropped)
+#   drop_params: site-specific share / referral parameters to drop as well
+#   lowercase_path: paths are case-insensitive on this site
+DOMAIN_RULES = {
+    "cxtoday.com": {"drop_query": True},
+    "nojitter.com": {"drop_query": True},
+    "techtarget.com": {"drop_query": True},
+    "cmswire.com": {"drop_query": True},
+    "customerthink.com": {"keep_params": {"p"}},
+    "venturebeat.com": {"drop_query": True},
+    "techcrunch.com": {"drop_query": True},
+    "zdnet.com": {"drop_query": True},
+    "informationweek.com": {"drop_query": True},
+    "diginomica.com": {"drop_query": True},
+    "techrepublic.com": {"drop_query": True},
+    "siliconangle.com": {"drop_query": True},
+    "martechseries.com": {"drop_query": True},
+    "joshbersin.com": {"keep_params": {"p"}},
+    "cio.com": {"drop_query": True},
+    "hrexecutive.com": {"drop_query": True},
+    "itsm.tools": {"keep_params": {"p"}},
+}
+
+_MULTI_SLASH_RE = re.compile(r"/{2,}")
+
+
+# ============================
+# CANONICAL URL
+# ============================
+
+def _domain_rules(host):
+    # Match "news.example.com" against "example.com" rules as well
+    parts = host.split(".")
+    for i in range(len(parts) - 1):
+        rules = DOMAIN_RULES.get(".".join(parts[i:]))
+        if rules is not None:
+            return rules
+    return {}
+
+
+def _is_tracking_param(name, rules):
+    name = name.lower()
+    return (name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+            or name in rules.get("drop_params", ()))
+
+
+@lru_cache(maxsize=50000)
+def canonical_url(url):
+    """
+    Canonical key for an article URL, used for dedup and cache keys:
+      - https scheme, lowercase host, no "www." / "amp." / "m." prefix, no default port
+      - no fragment, no tracking parameters, remaining params sorted
+      - AMP variants (/amp, /amp/, ?amp=1, .amp) collapsed to the normal page
+      - no trailing slash, no duplicate slashes
+    Per-domain rules in DOMAIN_RULES can drop the query string entirely or
+    more parameters.
+    Returns the input unchanged (stripped) if it is not an http(s) URL.
+    """
+    if not isinstance(url, str):
+        return url
+    url = url.strip()
+    if not url:
+        return url
+
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        return url
+
+    host = (parts.hostname or "").lower().rstrip(".")
+    for prefix in ("www.", "amp.", "m."):
+        if host.startswith(prefix) and host.count(".") >= 2:
+            host = host[len(prefix):]
+            break
+
+    port = parts.port if parts.port not in (None, 80, 443) else None
+    netloc = f"{host}:{port}" if port else host
+
+    rules = _domain_rules(host)
+
+    # Path: collapse slashes, strip AMP markers and trailing slash
+    path = _MULTI_SLASH_RE.sub("/", parts.path or "/")
+    if path.endswith(".amp"):
+        path = path[:-len(".amp")]
+    segments = [s for s in path.split("/") if s]
+    if segments and segments[-1].lower() == "amp":
+        segments = segments[:-1]
+    if segments and segments[0].lower() == "amp":
+        segments = segments[1:]
+    path = "/" + "/".join(segments) if segments else ""
+    if rules.get("lowercase_path"):
+        path = path.lower()
+
+    # Query: drop tracking params, apply per-domain rules, sort the rest
+    query = ""
+    if parts.query and not rules.get("drop_query"):
+        keep = rules.get("keep_params")
+        params = [
+            (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if not _is_tracking_param(k, rules) and (keep is None or k in keep)
+        ]
+        query = urlencode(sorted(params))
+
+    return urlunsplit(("https", netloc, path, query, ""))
+
+
+def unique_by_url(items):
+    """Keep the first record (Article / NewsRow) per canonical URL."""
+    seen = set()
+    unique = []
+    for item in items:
+        key = canonical_url(item.url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
+
+
+# ============================
+# URL VARIANT CORPUS
+# ============================
+
+# (variant seen in the wild, expected canonical key)
+# Run `python news_urls.py` to check the rules against it.
+URL_VARIANT_CORPUS = [
+    # CXToday: trailing slash, tracking params, fragments, http / no-www
+    ("https://www.cxtoday.com/contact-center/nationwide-selects-aws-and-amazon-connect-to-personalise-cx-for-17-million-members/",
+     "https://cxtoday.com/contact-center/nationwide-selects-aws-and-amazon-connect-to-personalise-cx-for-17-million-members"),
+    ("http://cxtoday.com/contact-center/nationwide-selects-aws-and-amazon-connect-to-personalise-cx-for-17-million-members",
+     "https://cxtoday.com/contact-center/nationwide-selects-aws-and-amazon-connect-to-personalise-cx-for-17-million-members"),
+    ("https://www.cxtoday.com/contact-center/nationwide-selects-aws-and-amazon-connect-to-personalise-cx-for-17-million-members/?utm_source=linkedin&utm_medium=social#respond",
+     "https://cxtoday.com/contact-center/nationwide-selects-aws-and-amazon-connect-to-personalise-cx-for-17-million-members"),
+    ("https://www.cxtoday.com/contact-center/nationwide-selects-aws-and-amazon-connect-to-personalise-cx-for-17-million-members/amp/",
+     "https://cxtoday.com/contact-center/nationwide-selects-aws-and-amazon-connect-to-personalise-cx-for-17-million-members"),
+    ("https://WWW.CXTODAY.COM//contact-center//nationwide-selects-aws-and-amazon-connect-to-personalise-cx-for-17-million-members/#comments",
+     "https://cxtoday.com/contact-center/nationwide-selects-aws-and-amazon-connect-to-personalise-cx-for-17-million-members"),
+    # TechTarget: case-sensitive path is preserved, query dropped
+    ("https://www.techtarget.com/searchcustomerexperience/resources/Customer-experience-management?vgnextfmt=print",
+     "https://techtarget.com/searchcustomerexperience/resources/Customer-experience-management"),
+    ("https://www.techtarget.com/searchcustomerexperience/news/366637012/Genesys-adds-agentic-AI/",
+     "https://techtarget.com/searchcustomerexperience/news/366637012/Genesys-adds-agentic-AI"),
+    # NoJitter
+    ("https://www.nojitter.com/contact-centers/ccaas/five9-launches-genius-ai?_hsenc=abc&_hsmi=123",
+     "https://nojitter.com/contact-centers/ccaas/five9-launches-genius-ai"),
+    # SiliconAngle AMP variants
+    ("https://siliconangle.com/2026/01/22/servicenow-earnings-ai-agents/amp/",
+     "https://siliconangle.com/2026/01/22/servicenow-earnings-ai-agents"),
+    ("https://amp.siliconangle.com/2026/01/22/servicenow-earnings-ai-agents/",
+     "https://siliconangle.com/2026/01/22/servicenow-earnings-ai-agents"),
+    # VentureBeat / TechCrunch share links
+    ("https://venturebeat.com/ai/zendesk-resolution-platform/?ref=rss&utm_campaign=feed",
+     "https://venturebeat.com/ai/zendesk-resolution-platform"),
+    ("https://techcrunch.com/2026/01/21/sierra-raises-funding/?guccounter=1",
+     "https://techcrunch.com/2026/01/21/sierra-raises-funding"),
+    # WordPress short links keep ?p=, tracking still dropped
+    ("https://customerthink.com/?p=312345&utm_source=newsletter",
+     "https://customerthink.com?p=312345"),
+    ("https://itsm.tools/itsm/ai-in-itsm-2026/?p=998&replytocom=12",
+     "https://itsm.tools/itsm/ai-in-itsm-2026?p=998"),
+    # MarTechSeries mobile host, default port
+    ("https://m.martechseries.com:443/predictive-ai/ai-platforms-machine-learning/amperity-introduces-the-first-enterprise-customer-data-agent/",
+     "https://martechseries.com/predictive-ai/ai-platforms-machine-learning/amperity-introduces-the-first-enterprise-customer-data-agent"),
+    # Unknown domain: generic rules only, remaining params sorted
+    ("https://example.org/story?id=7&page=2&utm_term=x",
+     "https://example.org/story?id=7&page=2"),
+    ("https://example.org/story?page=2&id=7",
+     "https://example.org/story?id=7&page=2"),
+    # Unknown domain: generic parameter names are not assumed to be tracking
+    ("https://example.org/view?src=report-2026.pdf&fbclid=abc",
+     "https://example.org/view?src=report-2026.pdf"),
+    ("https://example.org/thread?tid=4411&output=print",
+     "https://example.org/thread?output=print&tid=4411"),
+    # Not a web URL: returned unchanged
+    ("mailto:news@cxtoday.com", "mailto:news@cxtoday.com"),
+]
+
+
+if __name__ == "__main__":
+    failures = 0
+    for variant, expected in URL_VARIANT_CORPUS:
+        got = canonical_url(variant)
+        if got != expected:
+            failures += 1
+            print(f"❌ {variant}\n   expected: {expected}\n   got:      {got}")
+    print(f"{len(URL_VARIANT_CORPUS) - failures}/{len(URL_VARIANT_CORPUS)} URL variants canonicalized as expected")
+    raise SystemExit(1 if failures else 0)
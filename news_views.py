@@ -0,0 +1,211 @@
+import datetime
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+
+from news_parquet import DASHBOARD_COLUMNS, read_frame
+from news_store import VERTICALS, connect, query_rows
+from news_urls import canonical_url
+
+# ============================
+# PERIOD VIEWS CONFIG
+# ============================
+
+# Materialized "This Week" / "This Month" / "All Collected News" frames:
+# one row per canonical article (see merge_verticals), newest first. A view is
+# rebuilt only when the set of daily files changes (manifest mtimes) or the
+# date rolls over; otherwise switching period is a dict lookup (same
+# process) or a single pickle load (new process / other session).
+VIEWS_DIR = os.getenv("NEWS_VIEWS_DIR", "news_views")
+
+# Period -> (days of scrape dates, hours of published cutoff)
+PERIODS = {
+    "last_24h": (1, 24),
+    "this_week": (7, 7 * 24),
+    "this_month": (30, 30 * 24),
+    "all_time": (None, None),
+}
+
+# Bump when build_view returns a differently shaped frame
+VIEW_FORMAT = 3
+
+_views = {}  # period -> (signature, DataFrame)
+
+
+def view_signature(manifest, today=None):
+    """
+    Changes whenever a daily file is added, removed or rewritten, the date
+    changes, or the dashboard reads other columns.
+    """
+    today = today or datetime.date.today()
+    digest = hashlib.sha1(f"{today.isoformat()}:{VIEW_FORMAT}".encode("utf-8"))
+    digest.update(",".join(DASHBOARD_COLUMNS).encode("utf-8"))
+    for name, entry in sorted(manifest["files"].items()):
+        digest.update(f"\n{name}:{entry.get('mtime')}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+# ============================
+# MERGED ARTICLES
+# ============================
+
+ENGAGEMENT_RANK = {"HIGH": 0, "MEDIUM": 1, "LOW": 2, "PENDING": 3}
+
+# Verticals whose analyses All News shows; CX AI articles have their own tab
+ALL_NEWS_VERTICALS = ("ccaas_news", "es_news")
+
+# Fields of one vertical's analysis, kept per category for the vertical tabs
+ANALYSIS_FIELDS = ["engagement", "summary", "hook", "is_ai_cs_relevant"]
+
+
+def dedupe_stories(df):
+    """Keep one row per story_id (syndicated copies / follow-ups of the same story)."""
+    if df is None or df.empty or "story_id" not in df.columns:
+        return df
+    # Rows from older files have no story_id; never collapse those
+    duplicated = df["story_id"].notna() & df.duplicated(subset="story_id", keep="first")
+    return df[~duplicated]
+
+
+def merge_verticals(df):
+    """
+    One row per canonical article from rows with a "vertical" column (one
+    per URL and vertical, newest first). The row carries the fields of the
+    article's best-rated CCaaS / ES analysis (ties go to the VERTICALS
+    order; CX AI only if no other vertical has it), which is what All News
+    shows, plus:
+    - categories:  tuple of category labels, in VERTICALS order
+    - engagements: {category: engagement of that vertical's analysis}
+    - analyses:    {category: ANALYSIS_FIELDS of that vertical's analysis},
+                   which the vertical tabs show (see analysis_for)
+    Near-duplicate coverage is collapsed within each vertical first.
+    """
+    if df.empty:
+        return df.assign(categories=None, engagements=None, analyses=None)
+
+    order = {vertical: i for i, vertical in enumerate(VERTICALS)}
+    df = pd.concat([dedupe_stories(df[df["vertical"] == vertical]) for vertical in VERTICALS])
+    if "url_key" not in df.columns:
+        df = df.assign(url_key=df["url"].map(canonical_url))
+    df = df.assign(
+        category=df["vertical"].map(VERTICALS),
+        _other=~df["vertical"].isin(ALL_NEWS_VERTICALS),
+        _order=df["vertical"].map(order),
+        _rank=df["engagement"].astype(str).map(ENGAGEMENT_RANK).fillna(2),
+        _analysis=[dict(zip(ANALYSIS_FIELDS, values)) for values in zip(*(df[f] for f in ANALYSIS_FIELDS))],
+    )
+
+    by_article = df.sort_values("_order", kind="stable").groupby("url_key", sort=False)
+    labels = pd.DataFrame({
+        "categories": by_article["category"].agg(tuple),
+        "analyses": by_article["_analysis"].agg(tuple),
+    })
+    labels["analyses"] = [dict(zip(c, a)) for c, a in zip(labels["categories"], labels["analyses"])]
+    labels["engagements"] = [{c: a["engagement"] for c, a in analyses.items()} for analyses in labels["analyses"]]
+
+    best = df.sort_values(["_other", "_rank", "_order"], kind="stable").drop_duplicates(subset="url_key")
+    best = best.sort_index(kind="stable").drop(columns=["vertical", "_other", "_order", "_rank", "_analysis"])
+    merged = best.join(labels, on="url_key").drop(columns="url_key")
+    return merged.reset_index(drop=True)
+
+
+def analysis_for(df, category):
+    """
+    Articles of a merged frame labelled with `category`, showing that
+    vertical's own analysis (engagement, summary, hook, relevance).
+    """
+    if df.empty:
+        return df
+    part = df[df["categories"].map(lambda c: category in c)]
+    fields = pd.DataFrame([a[category] for a in part["analyses"]], index=part.index, columns=ANALYSIS_FIELDS)
+    return part.assign(category=category, **{f: fields[f] for f in ANALYSIS_FIELDS})
+
+
+# ============================
+# BUILDING
+# ============================
+
+def build_view(period, today=None):
+    """
+    Query the period from the Parquet copy (or the SQLite store without
+    pyarrow). The published cutoff is taken at build time, so the view is a
+    superset of what the period shows later the same day; published is a
+    UTC datetime column (NaT if unknown) so load_view can cut it exactly.
+    """
+    days, hours = PERIODS[period]
+    today = today or datetime.date.today()
+    date_from = (today - datetime.timedelta(days=days - 1)).isoformat() if days else None
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=hours) if hours else None
+
+    df = None
+    try:
+        df = read_frame(date_from=date_from, published_since=cutoff)
+    except Exception as e:
+        print(f"⚠️ Parquet read failed, using the SQLite store: {e}")
+
+    if df is not None:
+        # One row per canonical URL per vertical (most recent analysis)
+        df = df.sort_values("date_scraped", ascending=False, kind="stable")
+        df = df.drop_duplicates(subset=["vertical", "url_key"]).reset_index(drop=True)
+    else:
+        conn = connect()
+        # One row per canonical URL per vertical (most recent analysis)
+        df = pd.DataFrame(query_rows(conn, date_from=date_from, published_since=cutoff))
+        conn.close()
+
+    if not df.empty:
+        df["published"] = pd.to_datetime(df["published"], utc=True)
+    return merge_verticals(df)
+
+
+def _view_path(period, directory=None):
+    return os.path.join(directory or VIEWS_DIR, f"{period}.pkl")
+
+
+def _read_view(path):
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def _write_view(path, saved):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(saved, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ Could not save {path}: {e}")
+
+
+# ============================
+# LOADING
+# ============================
+
+def load_view(period, signature, directory=None):
+    """
+    Merged DataFrame for a period (see merge_verticals), cut at the exact
+    published cutoff for now. Served from memory, then from VIEWS_DIR, and
+    rebuilt only when the stored signature no longer matches.
+    """
+    cached = _views.get(period)
+    if cached is None or cached[0] != signature:
+        path = _view_path(period, directory)
+        saved = _read_view(path)
+        if not isinstance(saved, dict) or saved.get("signature") != signature:
+            saved = {"signature": signature, "frame": build_view(period)}
+            _write_view(path, saved)
+            print(f"🗂️ Rebuilt the {period} view ({len(saved['frame'])} rows)")
+        cached = _views[period] = (signature, saved["frame"])
+
+    df = cached[1]
+    hours = PERIODS[period][1]
+    if hours and not df.empty:
+        cutoff = pd.Timestamp.now(tz="UTC") - pd.Timedelta(hours=hours)
+        df = df[df["published"].isna() | (df["published"] >= cutoff)]
+    return df
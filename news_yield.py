@@ -0,0 +1,210 @@
+import datetime
+import json
+import os
+
+# ============================
+# SOURCE YIELD CONFIG
+# ============================
+
+# One JSON line per source per pipeline run
+YIELD_STATS_FILE = os.getenv("YIELD_STATS_FILE", "source_yield.jsonl")
+
+# Recent runs per source used to estimate its yield
+YIELD_HISTORY_RUNS = int(os.getenv("YIELD_HISTORY_RUNS", "10"))
+
+# Runs of history a source needs before its budget moves away from the default
+MIN_YIELD_RUNS = 3
+
+# A source that produced nothing relevant in this many consecutive runs is
+# flagged and backed off to MIN_SOURCE_BUDGET
+ZERO_YIELD_RUNS = int(os.getenv("ZERO_YIELD_RUNS", "5"))
+
+# Per-source article budget bounds (the pipelines' MAX_ARTICLES_PER_SOURCE
+# is the default budget; the global budget is that times the source count)
+MIN_SOURCE_BUDGET = 3
+MAX_BUDGET_FACTOR = 2
+
+# A HIGH-engagement article counts this much more than a relevant one
+HIGH_BONUS = 1.0
+
+# Engagement levels that make an analyzed row count as relevant on their
+# own (LOW rows count only if the LLM flagged them is_ai_cs_relevant)
+RELEVANT_ENGAGEMENTS = {"HIGH", "MEDIUM"}
+
+
+# ============================
+# PER-RUN STATS
+# ============================
+
+def new_source_stats(source_name):
+    """Counters filled in while one source is crawled and analyzed."""
+    return {
+        "source": source_name,
+        "reached": False,    # a feed or the landing page was fetched
+        "links_found": 0,    # candidates from feeds or the landing page
+        "fetched": 0,        # article pages downloaded
+        "rejected": {},      # reason -> count
+        "articles": 0,       # passed extraction checks
+        "in_window": 0,      # survived the run's time filter
+        "relevant": 0,       # analyzed HIGH / MEDIUM, or flagged is_ai_cs_relevant
+        "high": 0,           # ... of which engagement HIGH
+        "bytes": 0,
+        "seconds": 0.0,
+    }
+
+
+def count_rejection(stats, reason):
+    if stats is not None:
+        stats["rejected"][reason] = stats["rejected"].get(reason, 0) + 1
+
+
+def count_outcomes(stats, outcomes):
+    """Fold extract_articles' (candidate, outcome) pairs into the stats."""
+    if stats is None:
+        return
+    for _, outcome in outcomes:
+        if outcome == "article":
+            stats["articles"] += 1
+        else:
+            count_rejection(stats, outcome)
+
+
+def count_in_window(stats_by_source, articles):
+    for art in articles:
+        stats = stats_by_source.get(art.source)
+        if stats is not None:
+            stats["in_window"] += 1
+
+
+def count_results(stats_by_source, rows):
+    """
+    Relevant / HIGH counts from the NewsRows a pipeline is about to save. LOW
+    rows are analyzed but not relevant (unless flagged is_ai_cs_relevant);
+    PENDING rows have no analysis yet.
+    """
+    for row in rows:
+        stats = stats_by_source.get(row.source)
+        engagement = row.engagement.upper()
+        if stats is None or engagement == "PENDING":
+            continue
+        if engagement not in RELEVANT_ENGAGEMENTS and not row.is_ai_cs_relevant:
+            continue
+        stats["relevant"] += 1
+        if engagement == "HIGH":
+            stats["high"] += 1
+
+
+# ============================
+# HISTORY
+# ============================
+
+def load_yield_history(pipeline, path=None):
+    """{source: [stats, ...]} for one pipeline, oldest run first."""
+    history = {}
+    try:
+        with open(path or YIELD_STATS_FILE, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if row.get("pipeline") == pipeline:
+                    history.setdefault(row["source"], []).append(row)
+    except FileNotFoundError:
+        return {}
+    return {source: runs[-YIELD_HISTORY_RUNS:] for source, runs in history.items()}
+
+
+def is_zero_yield(runs):
+    """True if none of the last ZERO_YIELD_RUNS runs found anything relevant."""
+    recent = runs[-ZERO_YIELD_RUNS:]
+    return len(recent) >= ZERO_YIELD_RUNS and all(r.get("relevant", 0) == 0 for r in recent)
+
+
+def _yield_rate(runs):
+    # Laplace-smoothed value per article of budget spent
+    value = sum(r.get("relevant", 0) + HIGH_BONUS * r.get("high", 0) for r in runs)
+    spent = sum(r.get("articles", 0) for r in runs)
+    return (value + 1) / (spent + 2)
+
+
+# ============================
+# BUDGET ALLOCATION
+# ============================
+
+def allocate_budgets(pipeline, sources, default_budget, total_budget=None):
+    """
+    Split a global article budget (default: default_budget per source)
+    across sources in proportion to their recent yield. Sources without
+    enough history get the average rate; zero-yield sources are flagged
+    and get MIN_SOURCE_BUDGET. Returns ({source: budget}, flagged_sources).
+    """
+    sources = list(sources)
+    if total_budget is None:
+        total_budget = int(os.getenv("GLOBAL_ARTICLE_BUDGET", "0")) or default_budget * len(sources)
+    history = load_yield_history(pipeline)
+
+    flagged = [s for s in sources if is_zero_yield(history.get(s, []))]
+    rates = {
+        s: _yield_rate(history[s])
+        for s in sources
+        if s not in flagged and len(history.get(s, [])) >= MIN_YIELD_RUNS
+    }
+    if not rates:
+        budgets = {s: default_budget for s in sources}
+        for s in flagged:
+            budgets[s] = MIN_SOURCE_BUDGET
+        return budgets, flagged
+
+    average = sum(rates.values()) / len(rates)
+    active = [s for s in sources if s not in flagged]
+    weights = {s: rates.get(s, average) for s in active}
+    remaining = total_budget - MIN_SOURCE_BUDGET * len(flagged)
+    weight_sum = sum(weights.values()) or 1.0
+
+    budgets = {s: MIN_SOURCE_BUDGET for s in flagged}
+    for s in active:
+        share = round(remaining * weights[s] / weight_sum)
+        budgets[s] = max(MIN_SOURCE_BUDGET, min(default_budget * MAX_BUDGET_FACTOR, share))
+    return budgets, flagged
+
+
+def print_budgets(budgets, flagged, default_budget):
+    changed = {s: b for s, b in budgets.items() if b != default_budget}
+    if changed:
+        print("📊 Article budgets by source yield: "
+              + ", ".join(f"{s} {b}" for s, b in sorted(changed.items(), key=lambda x: -x[1])))
+    for s in flagged:
+        print(f"🚩 {s}: nothing relevant in the last {ZERO_YIELD_RUNS} runs - backed off to {budgets[s]} articles")
+
+
+# ============================
+# RECORDING
+# ============================
+
+def record_source_yield(pipeline, stats_by_source, budgets=None, flagged=(), path=None):
+    """Append this run's per-source stats to YIELD_STATS_FILE and print a summary."""
+    if not stats_by_source:
+        return
+    now = datetime.datetime.now(datetime.timezone.utc)
+    print("\n📈 Source yield this run (found / fetched / in window / relevant / HIGH):")
+    try:
+        with open(path or YIELD_STATS_FILE, "a", encoding="utf-8") as f:
+            for source, stats in stats_by_source.items():
+                row = dict(stats)
+                row.update({
+                    "ts": now.isoformat(timespec="seconds"),
+                    "date": now.date().isoformat(),
+                    "pipeline": pipeline,
+                    "budget": (budgets or {}).get(source),
+                    "flagged": source in flagged,
+                    "seconds": round(stats["seconds"], 2),
+                })
+                f.write(json.dumps(row) + "\n")
+                rejected = ", ".join(f"{k} {v}" for k, v in sorted(row["rejected"].items()))
+                print(f"   {source:22} {stats['links_found']:3} / {stats['fetched']:3} / "
+                      f"{stats['in_window']:3} / {stats['relevant']:3} / {stats['high']:2}"
+                      f"  {stats['bytes'] / 1024:7.0f} KB {row['seconds']:6.1f}s"
+                      + (f"  rejected: {rejected}" if rejected else ""))
+    except OSError as e:
+        print(f"   ⚠️ Could not write source stats: {e}")
@@ -3,6 +3,8 @@
 # Daily News Pipeline Runner
 # This script runs both news pipelines daily
 # Set this up as a cron job to run automatically every morning
+# It is safe to run every few hours: each pipeline only polls the sources
+# that are due (see news_schedule.py) and keeps today's earlier rows
 
 cd "$(dirname "$0")"
 
@@ -34,6 +34,11 @@ echo ""
 echo "✅ Pipelines completed!"
 echo ""
 
+# Compact closed months into <prefix>_YYYY-MM.csv.gz archives (removes their daily CSVs)
+echo "🗜️ Compacting closed months..."
+$VENV_PYTHON news_archive.py
+echo ""
+
 # Get today's date for CSV files
 TODAY=$(date +%Y-%m-%d)
 CCaaS_FILE="ccaas_news_${TODAY}.csv"
@@ -73,6 +78,8 @@ fi
 echo ""
 echo "📤 Uploading results to GitHub..."
 git add "${FILES_TO_ADD[@]}" 2>/dev/null || true
+# New or updated monthly archives, and the daily CSVs they replaced
+git add --all -- '*_news_*.csv.gz' '*_news_*.csv' 2>/dev/null || true
 
 # Commit and push
 if git diff --staged --quiet; then